@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""Checkpoint bytes per step for the bundled examples, with and without retention policies.
+
+Each example is generated twice: as written, and with ``keep=N`` on every
+list field (the STATE retention directive).  Both graphs run with their mock
+nodes, and every checkpoint the saver writes is serialized to measure its
+size:
+
+    python benchmarks/bench_checkpoints.py --keep 3 --output checkpoints.json
+
+Needs langgraph installed; the generated graphs are real LangGraph graphs.
+Conditions in the mock graphs are random, so runs are seeded.
+"""
+import argparse
+import contextlib
+import io
+import json
+import random
+import statistics
+import sys
+import tempfile
+from dataclasses import replace
+from pathlib import Path
+
+try:
+    from langgraph_codegen.gen_graph import list_examples, get_example_path, parse_spec_file, type_to_reducer
+    from langgraph_codegen.project import GeneratedProject
+except ImportError:
+    sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+    from langgraph_codegen.gen_graph import list_examples, get_example_path, parse_spec_file, type_to_reducer
+    from langgraph_codegen.project import GeneratedProject
+
+from bench_fusion import import_project
+
+
+def with_keep(parsed, project, keep):
+    """``parsed`` with ``keep=keep`` on every list field that has no policy yet."""
+    policies = dict(parsed.field_policies)
+    for name, ftype in project.state_fields:
+        if type_to_reducer(ftype) == "add_to_list" and name not in policies:
+            policies[name] = {"keep": keep}
+    return replace(parsed, field_policies=policies)
+
+
+def checkpoint_sizes(project, workdir, seed=0):
+    """Run the project's graph once; return the serialized size of each checkpoint."""
+    graph_module, state_module = import_project(project, workdir)
+    graph = getattr(graph_module, project.basename)
+    saver = graph_module.checkpoint_saver
+    sizes = []
+    put = saver.put
+
+    def measuring_put(config, checkpoint, metadata, new_versions):
+        sizes.append(sum(len(saver.serde.dumps_typed(v)[1]) for v in checkpoint["channel_values"].values()))
+        return put(config, checkpoint, metadata, new_versions)
+    saver.put = measuring_put
+
+    random.seed(seed)
+    config = {"configurable": {"thread_id": "1"}, "recursion_limit": project.recursion_limit}
+    with contextlib.redirect_stdout(io.StringIO()):
+        try:
+            graph.invoke(state_module.initialize_state(), config=config)
+        except Exception as e:  # e.g. GraphRecursionError in a random loop; keep the steps so far
+            print(f"{project.basename}: {type(e).__name__}: {e}", file=sys.stderr)
+    return sizes
+
+
+def summarize(sizes):
+    return {
+        "steps": len(sizes),
+        "mean_bytes": statistics.mean(sizes) if sizes else 0,
+        "max_bytes": max(sizes, default=0),
+        "total_bytes": sum(sizes),
+    }
+
+
+def run_benchmarks(examples, keep, seed=0, progress=None):
+    results = {}
+    with tempfile.TemporaryDirectory() as workdir:
+        for name in examples:
+            parsed = parse_spec_file(get_example_path(name), keep_text=True)
+            plain = GeneratedProject(parsed, name)
+            kept = GeneratedProject(with_keep(parsed, plain, keep), f"{name}_keep")
+            results[name] = {
+                "plain": summarize(checkpoint_sizes(plain, workdir, seed)),
+                "policies": summarize(checkpoint_sizes(kept, workdir, seed)),
+            }
+            if progress:
+                progress(name, results[name])
+    return {"keep": keep, "results": results}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Checkpoint bytes per step, with and without keep= policies")
+    parser.add_argument("--keep", type=int, default=3, help="keep=N applied to every list field")
+    parser.add_argument("--examples", help="Comma-separated example names (default: all)")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for the random mock conditions")
+    parser.add_argument("-o", "--output", help="Write results JSON to this file")
+    args = parser.parse_args(argv)
+
+    def progress(name, result):
+        plain, kept = result["plain"], result["policies"]
+        print(f"{name:35s} {plain['steps']:4d} steps  mean {plain['mean_bytes']:9.0f} -> {kept['mean_bytes']:9.0f} bytes"
+              f"  max {plain['max_bytes']:8d} -> {kept['max_bytes']:8d}")
+
+    examples = args.examples.split(",") if args.examples else list_examples()
+    current = run_benchmarks(examples, args.keep, args.seed, progress=progress)
+    if args.output:
+        Path(args.output).write_text(json.dumps(current, indent=2) + "\n")
+        print(f"Wrote {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
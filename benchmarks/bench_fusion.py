@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""Checkpoint writes and latency of a linear chain, with and without --fuse-chains.
+
+Generates the same chain of cheap mock nodes twice, once plain and once with
+``fuse_chains=True``, runs each compiled graph and counts the checkpointer's
+``put`` calls (one per superstep):
+
+    python benchmarks/bench_fusion.py --lengths 5,20,50 --output fusion.json
+
+Needs langgraph installed; the generated graphs are real LangGraph graphs.
+"""
+import argparse
+import contextlib
+import importlib
+import io
+import json
+import statistics
+import sys
+import tempfile
+from pathlib import Path
+
+try:
+    from langgraph_codegen.project import GeneratedProject
+except ImportError:
+    sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+    from langgraph_codegen.project import GeneratedProject
+
+from bench_generator import time_callable
+
+LENGTHS = [5, 20, 50]
+
+
+def chain_spec(length):
+    """STATE plus ``START -> n0 -> ... -> n{length-1} -> END``."""
+    nodes = " -> ".join(f"n{i}" for i in range(length))
+    return f"STATE: ChainState\ncounter: int\nnodes_visited: list[str]\n\nSTART -> {nodes} -> END\n"
+
+
+def import_project(project, workdir):
+    """Write a generated project to ``workdir/basename``; return its (graph, state) modules."""
+    folder = Path(workdir) / project.basename
+    project.write(folder)
+    sys.path.insert(0, str(folder))
+    try:
+        graph_module = importlib.import_module(f"{project.basename}_graph")
+        state_module = importlib.import_module(f"{project.basename}_state")
+    finally:
+        sys.path.remove(str(folder))
+    return graph_module, state_module
+
+
+def load_graph(spec, basename, workdir, **options):
+    project = GeneratedProject.from_spec(spec, basename, **options)
+    return (project, *import_project(project, workdir))
+
+
+def measure(spec, basename, workdir, min_time=0.2, **options):
+    project, graph_module, state_module = load_graph(spec, basename, workdir, **options)
+    graph = getattr(graph_module, basename)
+    saver = graph_module.checkpoint_saver
+    puts = []
+    put = saver.put
+
+    def counting_put(*args, **kwargs):
+        puts.append(1)
+        return put(*args, **kwargs)
+    saver.put = counting_put
+
+    runs = []
+
+    def run():
+        config = {"configurable": {"thread_id": str(len(runs))}, "recursion_limit": project.recursion_limit}
+        runs.append(1)
+        with contextlib.redirect_stdout(io.StringIO()):
+            result = graph.invoke(state_module.initialize_state(), config=config)
+        return result
+
+    result = run()
+    writes_per_run = len(puts)
+    samples = time_callable(run, min_time=min_time)
+    return {
+        "nodes": len(project.parsed.graph_dict) - 1,
+        "checkpoint_writes": writes_per_run,
+        "min": min(samples),
+        "median": statistics.median(samples),
+        "nodes_visited": result["nodes_visited"],
+    }
+
+
+def run_benchmarks(lengths, min_time=0.2, progress=None):
+    results = {}
+    with tempfile.TemporaryDirectory() as workdir:
+        for length in lengths:
+            spec = chain_spec(length)
+            plain = measure(spec, f"chain_{length}", workdir, min_time)
+            fused = measure(spec, f"chain_{length}_fused", workdir, min_time, fuse_chains=True)
+            if plain.pop("nodes_visited") != fused.pop("nodes_visited"):
+                raise AssertionError(f"fused chain of {length} visited different nodes")
+            results[str(length)] = {"plain": plain, "fused": fused}
+            if progress:
+                progress(length, plain, fused)
+    return {"results": results}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark --fuse-chains on linear chains")
+    parser.add_argument("--lengths", default=",".join(str(n) for n in LENGTHS),
+                        help="Comma-separated chain lengths")
+    parser.add_argument("--min-time", type=float, default=0.2,
+                        help="Minimum seconds to spend per graph")
+    parser.add_argument("-o", "--output", help="Write results JSON to this file")
+    args = parser.parse_args(argv)
+
+    def progress(length, plain, fused):
+        print(f"chain of {length:4d}: checkpoint writes {plain['checkpoint_writes']:4d} -> {fused['checkpoint_writes']:4d}"
+              f"   latency {plain['min'] * 1000:9.3f} -> {fused['min'] * 1000:9.3f} ms"
+              f" ({plain['min'] / fused['min']:.2f}x)")
+
+    lengths = [int(n) for n in args.lengths.split(",") if n.strip()]
+    current = run_benchmarks(lengths, min_time=args.min_time, progress=progress)
+    if args.output:
+        Path(args.output).write_text(json.dumps(current, indent=2) + "\n")
+        print(f"Wrote {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""Benchmarks for the code generator.
+
+Times parse_spec, gen_graph, gen_nodes, gen_state, gen_conditions and a full
+``lgcodegen`` run over every bundled example and over synthetic specs with
+100 / 1k / 10k / 100k edges.
+
+    python benchmarks/bench_generator.py --output results.json
+    python benchmarks/bench_generator.py --compare baseline.json --threshold 0.25
+
+With ``--compare`` the run exits with status 1 when any case is slower than
+the baseline by more than the threshold.  The same cases run under
+pytest-benchmark via ``benchmarks/test_bench_generator.py``.
+"""
+import argparse
+import contextlib
+import io
+import json
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+try:
+    from langgraph_codegen.gen_graph import (
+        gen_graph, gen_nodes, gen_state, gen_conditions,
+        parse_spec, parse_state_section, expand_chains, preprocess_start_syntax,
+        list_examples, get_example_path,
+    )
+    from langgraph_codegen import lgcodegen
+    from langgraph_codegen.synthetic import generate_spec
+except ImportError:
+    sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+    from langgraph_codegen.gen_graph import (
+        gen_graph, gen_nodes, gen_state, gen_conditions,
+        parse_spec, parse_state_section, expand_chains, preprocess_start_syntax,
+        list_examples, get_example_path,
+    )
+    from langgraph_codegen import lgcodegen
+    from langgraph_codegen.synthetic import generate_spec
+
+SYNTHETIC_SIZES = [100, 1_000, 10_000, 100_000]
+OPERATIONS = ["parse_spec", "gen_graph", "gen_nodes", "gen_state", "gen_conditions", "cli"]
+
+
+class Case:
+    """One spec to benchmark, prepared the way lgcodegen prepares it."""
+
+    def __init__(self, name, text):
+        self.name = name
+        self.text = text
+        _class_name, self.state_fields, spec = parse_state_section(text)
+        self.spec = preprocess_start_syntax(expand_chains(spec), name)
+        self.parsed = parse_spec(self.spec)
+        self.worker_func_names = {f[0] for f in self.parsed.worker_functions}
+
+    def operation(self, op, workdir):
+        """Return a zero-argument callable running ``op`` on this case."""
+        if op == "parse_spec":
+            return lambda: parse_spec(self.spec)
+        if op == "gen_graph":
+            return lambda: gen_graph(self.name, self.spec, parsed=self.parsed)
+        if op == "gen_nodes":
+            return lambda: gen_nodes(self.parsed.graph_dict, worker_func_names=self.worker_func_names)
+        if op == "gen_state":
+            return lambda: gen_state(self.spec, state_fields=self.state_fields or None, parsed=self.parsed)
+        if op == "gen_conditions":
+            return lambda: gen_conditions(self.spec, parsed=self.parsed)
+        if op == "cli":
+            spec_file = Path(workdir) / f"{self.name}.lgraph"
+            spec_file.write_text(self.text)
+            argv = [str(spec_file), "-o", str(Path(workdir) / self.name)]
+
+            def run_cli():
+                with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()):
+                    lgcodegen.main(argv)
+            return run_cli
+        raise ValueError(f"Unknown operation: {op}")
+
+
+def example_cases():
+    for name in list_examples():
+        yield Case(name, Path(get_example_path(name)).read_text())
+
+
+def synthetic_cases(sizes):
+    for size in sizes:
+        yield Case(f"synthetic_{size}", generate_spec(edges=size, seed=size))
+
+
+def time_callable(fn, min_time=0.2, max_repeats=50):
+    """Run ``fn`` until ``min_time`` seconds have elapsed (at least once) and return samples."""
+    samples = []
+    total = 0.0
+    while len(samples) < max_repeats and (not samples or total < min_time):
+        start = time.perf_counter()
+        fn()
+        elapsed = time.perf_counter() - start
+        samples.append(elapsed)
+        total += elapsed
+    return samples
+
+
+def run_benchmarks(cases, operations=OPERATIONS, min_time=0.2, progress=None):
+    """Time every operation on every case and return a results dict."""
+    results = {}
+    with tempfile.TemporaryDirectory() as workdir:
+        for case in cases:
+            for op in operations:
+                samples = time_callable(case.operation(op, workdir), min_time=min_time)
+                key = f"{case.name}:{op}"
+                results[key] = {
+                    "case": case.name,
+                    "operation": op,
+                    "edges": sum(len(node["edges"]) for node in case.parsed.graph_dict.values()),
+                    "runs": len(samples),
+                    "min": min(samples),
+                    "median": statistics.median(samples),
+                }
+                if progress:
+                    progress(key, results[key])
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": results,
+    }
+
+
+def compare(current, baseline, threshold):
+    """Return (regressions, improvements) as lists of (key, baseline_min, current_min, ratio)."""
+    regressions, improvements = [], []
+    for key, result in current["results"].items():
+        base = baseline["results"].get(key)
+        if not base or base["min"] <= 0:
+            continue
+        ratio = result["min"] / base["min"]
+        entry = (key, base["min"], result["min"], ratio)
+        if ratio > 1 + threshold:
+            regressions.append(entry)
+        elif ratio < 1 - threshold:
+            improvements.append(entry)
+    return regressions, improvements
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the langgraph-codegen generator")
+    parser.add_argument("--sizes", default=",".join(str(s) for s in SYNTHETIC_SIZES),
+                        help="Comma-separated synthetic edge counts (empty for none)")
+    parser.add_argument("--no-examples", action="store_true", help="Skip the bundled examples")
+    parser.add_argument("--operations", default=",".join(OPERATIONS),
+                        help="Comma-separated operations to time")
+    parser.add_argument("--min-time", type=float, default=0.2,
+                        help="Minimum seconds to spend per case/operation")
+    parser.add_argument("-o", "--output", help="Write results JSON to this file")
+    parser.add_argument("--compare", metavar="BASELINE", help="Compare against a stored results JSON")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="Relative slowdown that counts as a regression (default 0.25)")
+    args = parser.parse_args(argv)
+
+    sizes = [int(s) for s in args.sizes.split(",") if s.strip()]
+    operations = [op.strip() for op in args.operations.split(",") if op.strip()]
+    cases = [] if args.no_examples else list(example_cases())
+    cases.extend(synthetic_cases(sizes))
+
+    def progress(key, result):
+        print(f"{key:45s} {result['min'] * 1000:10.3f} ms  (median {result['median'] * 1000:.3f} ms, {result['runs']} runs)")
+
+    current = run_benchmarks(cases, operations, min_time=args.min_time, progress=progress)
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(current, indent=2) + "\n")
+        print(f"Wrote {args.output}")
+
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text())
+        regressions, improvements = compare(current, baseline, args.threshold)
+        for key, base, now, ratio in improvements:
+            print(f"FASTER     {key:45s} {base * 1000:10.3f} -> {now * 1000:10.3f} ms ({ratio:.2f}x)")
+        for key, base, now, ratio in regressions:
+            print(f"REGRESSION {key:45s} {base * 1000:10.3f} -> {now * 1000:10.3f} ms ({ratio:.2f}x)")
+        if regressions:
+            return 1
+        print(f"No regressions beyond {args.threshold:.0%}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
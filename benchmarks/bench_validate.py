@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""Throughput of the spec validator, in specs per millisecond.
+
+Writes ``--specs`` synthetic specs of ``--nodes`` nodes each to a scratch
+directory (the bundled examples are added too), then times ``validate_many``
+over all of them for each worker count:
+
+    python benchmarks/bench_validate.py --specs 5000 --nodes 20 --workers 1,4,8
+"""
+import argparse
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+try:
+    from langgraph_codegen.gen_graph import list_examples, get_example_path
+    from langgraph_codegen.synthetic import write_spec
+    from langgraph_codegen.validate import validate_many
+except ImportError:
+    sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+    from langgraph_codegen.gen_graph import list_examples, get_example_path
+    from langgraph_codegen.synthetic import write_spec
+    from langgraph_codegen.validate import validate_many
+
+
+def write_specs(directory, count, nodes):
+    paths = []
+    for name in list_examples():
+        paths.append(Path(shutil.copy(get_example_path(name), directory)))
+    for i in range(count):
+        path = Path(directory) / f"synthetic_{i}.lgraph"
+        with open(path, "w") as fp:
+            write_spec(fp, nodes=nodes, seed=i)
+        paths.append(path)
+    return paths
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark validate_many")
+    parser.add_argument("--specs", type=int, default=2000, help="Synthetic specs to validate")
+    parser.add_argument("--nodes", type=int, default=20, help="Nodes per synthetic spec")
+    parser.add_argument("--workers", default="1,4", help="Comma-separated worker counts")
+    parser.add_argument("--repeats", type=int, default=3, help="Runs per worker count; the best is reported")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as directory:
+        paths = write_specs(directory, args.specs, args.nodes)
+        for workers in [int(w) for w in args.workers.split(",") if w.strip()]:
+            best = float("inf")
+            for _ in range(args.repeats):
+                start = time.perf_counter()
+                results = validate_many(paths, workers=workers)
+                best = min(best, time.perf_counter() - start)
+            failed = sum(not result.ok for result in results)
+            print(f"workers={workers:<3d} {len(paths)} specs in {best * 1000:9.1f} ms  "
+                  f"{len(paths) / (best * 1000):8.2f} specs/ms  ({failed} with errors)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,25 @@
+"""pytest-benchmark entry point for the generator benchmarks.
+
+    pytest benchmarks --benchmark-json results.json
+    pytest benchmarks --benchmark-compare --benchmark-compare-fail=min:25%
+
+Synthetic sizes default to 100 and 1000 edges; set
+``LGCODEGEN_BENCH_SIZES=100,1000,10000,100000`` for the full scale run.
+"""
+import os
+
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+from bench_generator import OPERATIONS, example_cases, synthetic_cases
+
+SIZES = [int(s) for s in os.environ.get("LGCODEGEN_BENCH_SIZES", "100,1000").split(",") if s.strip()]
+CASES = list(example_cases()) + list(synthetic_cases(SIZES))
+
+
+@pytest.mark.parametrize("operation", OPERATIONS)
+@pytest.mark.parametrize("case", CASES, ids=[case.name for case in CASES])
+def test_generator(benchmark, case, operation, tmp_path):
+    benchmark.group = operation
+    benchmark(case.operation(operation, tmp_path))
@@ -24,6 +24,7 @@ setup(
     entry_points={
         'console_scripts': [
             'lgcodegen=langgraph_codegen.lgcodegen:main',
+            'lgvalidate=langgraph_codegen.validate:main',
         ],
     },
     install_requires=[],
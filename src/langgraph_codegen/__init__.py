@@ -3,23 +3,33 @@ from .gen_graph import (
     gen_worker_functions, gen_assignment_functions,
     find_worker_functions, find_switch_functions,
     gen_main, gen_readme,
-    ParsedSpec, parse_spec, normalize_spec,
-    parse_graph_spec, parse_state_section, transform_graph_spec,
+    ParsedSpec, parse_spec, parse_spec_stream, parse_spec_file, normalize_spec,
+    find_routing_functions, parse_graph_spec, parse_state_section, transform_graph_spec,
     expand_chains,
     gen_state_class, type_to_reducer, type_to_default,
     snake_to_state_class, preprocess_start_syntax,
     list_examples, get_example_path
 )
+from .profiling import StageProfiler, StageTiming, stage
+from .project import GeneratedProject
+from .analysis import GraphReport, GraphIssue, GraphLoop, analyze_graph, recommended_recursion_limit
+from .transforms import Transformation, parallelize_chains, fuse_chains
+from .validate import ValidationIssue, ValidationResult, validate_text, validate_file, validate_many
 
 __all__ = [
     "gen_graph", "gen_nodes", "gen_conditions", "gen_state",
     "gen_worker_functions", "gen_assignment_functions",
     "find_worker_functions", "find_switch_functions",
     "gen_main", "gen_readme",
-    "ParsedSpec", "parse_spec", "normalize_spec",
-    "parse_graph_spec", "parse_state_section", "transform_graph_spec",
+    "ParsedSpec", "parse_spec", "parse_spec_stream", "parse_spec_file", "normalize_spec",
+    "find_routing_functions", "parse_graph_spec", "parse_state_section", "transform_graph_spec",
     "expand_chains",
     "gen_state_class", "type_to_reducer", "type_to_default",
     "snake_to_state_class", "preprocess_start_syntax",
     "list_examples", "get_example_path",
+    "StageProfiler", "StageTiming", "stage",
+    "GeneratedProject",
+    "GraphReport", "GraphIssue", "GraphLoop", "analyze_graph", "recommended_recursion_limit",
+    "Transformation", "parallelize_chains", "fuse_chains",
+    "ValidationIssue", "ValidationResult", "validate_text", "validate_file", "validate_many",
 ]
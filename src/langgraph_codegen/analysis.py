@@ -0,0 +1,474 @@
+"""Static analysis of a parsed graph.
+
+:func:`analyze_graph` walks ``ParsedSpec.graph_dict`` once and reports, in
+time linear in nodes + edges:
+
+- nodes that cannot be reached from START,
+- nodes from which END cannot be reached,
+- strongly connected components (iterative Tarjan), i.e. the graph's loops,
+- loops that never exit, and loops that exit only through a condition.
+
+A loop that exits only through a condition (``replan_step -> is_done ? END :
+execute_step``) keeps running until that condition fires, or until LangGraph's
+``recursion_limit`` stops it, so every such loop is reported as a warning.
+"""
+from dataclasses import dataclass, field, asdict
+from typing import Dict, List, Tuple
+
+TRUE_FN = "true_fn"
+
+
+@dataclass
+class GraphIssue:
+    """One finding of the analysis."""
+    severity: str          # 'error' or 'warning'
+    kind: str              # 'unreachable', 'cannot_reach_end', 'loop_without_exit', 'unbounded_loop'
+    message: str
+    nodes: List[str] = field(default_factory=list)
+
+
+@dataclass
+class GraphLoop:
+    """A strongly connected component with at least one cycle."""
+    nodes: List[str]
+    exits: List[dict] = field(default_factory=list)   # [{source, condition, destination, conditional}], edges leaving the loop
+    conditional: bool = False                         # every exit depends on a routing decision
+
+
+@dataclass
+class GraphReport:
+    """Result of analyze_graph()."""
+    start_node: str
+    nodes: List[str]
+    unreachable: List[str] = field(default_factory=list)
+    cannot_reach_end: List[str] = field(default_factory=list)
+    sccs: List[List[str]] = field(default_factory=list)       # all components, reverse topological order
+    loops: List[GraphLoop] = field(default_factory=list)
+    issues: List[GraphIssue] = field(default_factory=list)
+
+    @property
+    def errors(self) -> List[GraphIssue]:
+        return [issue for issue in self.issues if issue.severity == 'error']
+
+    @property
+    def warnings(self) -> List[GraphIssue]:
+        return [issue for issue in self.issues if issue.severity == 'warning']
+
+    @property
+    def ok(self) -> bool:
+        return not self.issues
+
+    def to_dict(self):
+        return asdict(self)
+
+    def format(self) -> str:
+        """One line per issue, e.g. ``warning: unbounded_loop: ...``."""
+        return "\n".join(f"{issue.severity}: {issue.kind}: {issue.message}" for issue in self.issues)
+
+
+def _split(names):
+    return [n.strip() for n in names.split(",")] if "," in names else [names]
+
+
+def build_adjacency(graph_dict: dict) -> Dict[str, List[dict]]:
+    """Return ``{node: [{condition, destination}, ...]}`` with comma-joined names split.
+
+    Every node mentioned anywhere (including END and destinations that have no
+    block of their own) gets an entry, in order of first appearance.
+    """
+    adjacency = {}
+    for node_key, node_dict in graph_dict.items():
+        sources = _split(node_key)
+        for source in sources:
+            adjacency.setdefault(source, [])
+        for edge in node_dict["edges"]:
+            for destination in _split(edge["destination"]):
+                adjacency.setdefault(destination, [])
+                for source in sources:
+                    adjacency[source].append({"condition": edge["condition"], "destination": destination})
+    return adjacency
+
+
+def _reachable(start, neighbours):
+    seen = {start}
+    stack = [start]
+    while stack:
+        node = stack.pop()
+        for nxt in neighbours[node]:
+            if nxt not in seen:
+                seen.add(nxt)
+                stack.append(nxt)
+    return seen
+
+
+def strongly_connected_components(successors: Dict[str, List[str]]) -> List[List[str]]:
+    """Tarjan's algorithm without recursion; components come out in reverse topological order.
+
+    ``successors`` maps every node to the nodes its edges lead to.
+    """
+    index = {}
+    lowlink = {}
+    on_stack = set()
+    stack = []
+    components = []
+    counter = 0
+
+    for root in successors:
+        if root in index:
+            continue
+        # Each work item is (node, iterator over its successors)
+        index[root] = lowlink[root] = counter
+        counter += 1
+        stack.append(root)
+        on_stack.add(root)
+        work = [(root, iter(successors[root]))]
+        while work:
+            node, nexts = work[-1]
+            advanced = False
+            for nxt in nexts:
+                if nxt not in index:
+                    index[nxt] = lowlink[nxt] = counter
+                    counter += 1
+                    stack.append(nxt)
+                    on_stack.add(nxt)
+                    work.append((nxt, iter(successors[nxt])))
+                    advanced = True
+                    break
+                if nxt in on_stack:
+                    lowlink[node] = min(lowlink[node], index[nxt])
+            if advanced:
+                continue
+            work.pop()
+            if work:
+                parent = work[-1][0]
+                lowlink[parent] = min(lowlink[parent], lowlink[node])
+            if lowlink[node] == index[node]:
+                component = []
+                while True:
+                    member = stack.pop()
+                    on_stack.discard(member)
+                    component.append(member)
+                    if member == node:
+                        break
+                component.reverse()
+                components.append(component)
+    return components
+
+
+def analyze_graph(graph_dict: dict, start_node: str = "START") -> GraphReport:
+    """Analyze a parsed graph; see the module docstring for what is checked."""
+    adjacency = build_adjacency(graph_dict)
+    adjacency.setdefault(start_node, [])
+    adjacency.setdefault("END", [])
+    nodes = [n for n in adjacency if n not in (start_node, "END")]
+
+    successors = {node: [e["destination"] for e in edges] for node, edges in adjacency.items()}
+    predecessors = {node: [] for node in adjacency}
+    for node, nexts in successors.items():
+        for nxt in nexts:
+            predecessors[nxt].append(node)
+
+    reachable = _reachable(start_node, successors)
+    reaches_end = _reachable("END", predecessors)
+    report = GraphReport(start_node=start_node, nodes=nodes)
+    report.unreachable = [n for n in nodes if n not in reachable]
+    report.cannot_reach_end = [n for n in nodes if n in reachable and n not in reaches_end]
+
+    # A node routes (picks among its edges) when any edge has a real condition;
+    # otherwise all of its edges fire together.
+    routes = {node: any(e["condition"] != TRUE_FN for e in edges) for node, edges in adjacency.items()}
+
+    report.sccs = strongly_connected_components(successors)
+    for component in report.sccs:
+        if len(component) == 1 and component[0] not in successors[component[0]]:
+            continue
+        members = set(component)
+        exits = [
+            {"source": node, "condition": edge["condition"], "destination": edge["destination"],
+             "conditional": routes[node]}
+            for node in component
+            for edge in adjacency[node]
+            if edge["destination"] not in members
+        ]
+        report.loops.append(GraphLoop(
+            nodes=component,
+            exits=exits,
+            conditional=any(e["conditional"] for e in exits),
+        ))
+
+    if report.unreachable:
+        report.issues.append(GraphIssue(
+            'warning', 'unreachable',
+            f"not reachable from {start_node}: {', '.join(report.unreachable)}",
+            report.unreachable,
+        ))
+    if report.cannot_reach_end:
+        report.issues.append(GraphIssue(
+            'warning', 'cannot_reach_end',
+            f"no path to END from: {', '.join(report.cannot_reach_end)}",
+            report.cannot_reach_end,
+        ))
+    for loop in report.loops:
+        cycle = ", ".join(loop.nodes)
+        if not loop.conditional:
+            # Edges out of a non-routing node fire alongside the edges that
+            # stay in the loop, so the loop keeps going either way.
+            report.issues.append(GraphIssue(
+                'error', 'loop_without_exit',
+                f"loop through {cycle} has no conditional exit and runs until recursion_limit",
+                loop.nodes,
+            ))
+        else:
+            conditions = sorted({
+                e["condition"] if e["condition"] != TRUE_FN else f"else of {e['source']}"
+                for e in loop.exits if e["conditional"]
+            })
+            report.issues.append(GraphIssue(
+                'warning', 'unbounded_loop',
+                f"loop through {cycle} exits only via {', '.join(conditions)}; bounded only by recursion_limit",
+                loop.nodes,
+            ))
+    return report
+
+
+# LangGraph's own default; recommendations never go below it
+DEFAULT_RECURSION_LIMIT = 25
+# Passes assumed through a loop that has no loop guard
+DEFAULT_LOOP_ITERATIONS = 10
+
+
+def longest_superstep_path(graph_dict: dict, start_node: str = "START",
+                           loop_iterations: int = DEFAULT_LOOP_ITERATIONS) -> int:
+    """Supersteps on the longest path from START, counting each loop ``loop_iterations`` times.
+
+    Every node is one superstep (parallel branches share them), and a loop
+    costs ``len(loop) * loop_iterations`` steps.  Runs in linear time over the
+    condensation of the graph.
+    """
+    adjacency = build_adjacency(graph_dict)
+    adjacency.setdefault(start_node, [])
+    successors = {node: [e["destination"] for e in edges] for node, edges in adjacency.items()}
+    components = strongly_connected_components(successors)
+    component_of = {}
+    for i, component in enumerate(components):
+        for node in component:
+            component_of[node] = i
+
+    def weight(component):
+        node = component[0]
+        if len(component) > 1 or node in successors[node]:
+            return len(component) * loop_iterations
+        return 0 if node in (start_node, "END") else 1
+
+    # Components are in reverse topological order: successors come first
+    longest = [0] * len(components)
+    for i, component in enumerate(components):
+        best = 0
+        for node in component:
+            for nxt in successors[node]:
+                j = component_of[nxt]
+                if j != i:
+                    best = max(best, longest[j])
+        longest[i] = weight(component) + best
+    return longest[component_of[start_node]]
+
+
+def recommended_recursion_limit(graph_dict: dict, start_node: str = "START",
+                                loop_iterations: int = DEFAULT_LOOP_ITERATIONS) -> int:
+    """A ``recursion_limit`` that lets the longest path run with every loop taken ``loop_iterations`` times."""
+    steps = longest_superstep_path(graph_dict, start_node, loop_iterations)
+    # One spare superstep per loop pass is enough for the exit branch itself
+    return max(DEFAULT_RECURSION_LIMIT, steps + loop_iterations)
+
+
+def loop_guard_points(report: GraphReport, skip=()) -> Dict[str, str]:
+    """Pick one router per conditional loop to guard: ``{router_node: exit_destination}``.
+
+    The router is the first loop node (in loop order) with a conditional exit;
+    the guard forces that exit.  Nodes in ``skip`` (e.g. worker fan-out
+    nodes, whose routers return Send lists) are never chosen.
+    """
+    exits_by_source = {}
+    for loop in report.loops:
+        if not loop.conditional:
+            continue
+        for exit_edge in loop.exits:
+            if exit_edge["conditional"]:
+                exits_by_source.setdefault(exit_edge["source"], exit_edge["destination"])
+    guards = {}
+    for loop in report.loops:
+        for node in loop.nodes:
+            if node in exits_by_source and node not in skip:
+                guards[node] = exits_by_source[node]
+                break
+    return guards
+
+
+# --- superstep schedule and critical path from NODES hints ---
+
+DEFAULT_LATENCY = 1.0
+
+
+@dataclass
+class ScheduleReport:
+    """Estimated execution of one pass through the graph (each loop taken once).
+
+    LangGraph runs nodes in supersteps: every node triggered by the previous
+    step runs in parallel, and the step ends when its slowest node finishes.
+    """
+    supersteps: List[List[str]]                 # nodes per superstep, in order
+    step_latency: List[float]                   # slowest node of each superstep
+    schedule_latency: float                     # sum of step_latency: what LangGraph waits
+    critical_path: List[str]                    # slowest dependency chain
+    critical_path_latency: float                # lower bound with perfect overlap
+    serial_latency: float                       # same nodes run one at a time
+    max_width: int                              # most nodes running in one superstep
+    speedup: float                              # serial_latency / schedule_latency
+    tokens: int                                 # one pass, worst branch of each router
+    back_edges: List[Tuple[str, str]] = field(default_factory=list)  # loop edges left out
+    unannotated: List[str] = field(default_factory=list)             # nodes without a latency hint
+
+    def to_dict(self):
+        return asdict(self)
+
+    def format(self) -> str:
+        lines = ["Superstep schedule" + (" (loops taken once)" if self.back_edges else "") + ":",
+                 "  step   latency  nodes"]
+        for i, (nodes, latency) in enumerate(zip(self.supersteps, self.step_latency), 1):
+            lines.append(f"  {i:4d}  {latency:8.2f}  {', '.join(nodes)}")
+        lines.append(f"Critical path: {' -> '.join(self.critical_path)} ({self.critical_path_latency:.2f})")
+        lines.append(f"Superstep latency: {self.schedule_latency:.2f}")
+        lines.append(f"Serial latency: {self.serial_latency:.2f}")
+        lines.append(f"Speedup from parallel branches: {self.speedup:.2f}x")
+        lines.append(f"Max parallel width: {self.max_width}")
+        lines.append(f"Tokens per pass: {self.tokens}")
+        if self.unannotated:
+            lines.append(f"No latency hint (assumed {DEFAULT_LATENCY:g}): {', '.join(self.unannotated)}")
+        return "\n".join(lines)
+
+
+def _hint_number(node_hints, node, key, default):
+    value = node_hints.get(node, {}).get(key)
+    if value is None:
+        return default
+    try:
+        return float(value)
+    except ValueError:
+        raise ValueError(f"NODES: {node}: {key}={value} is not a number") from None
+
+
+def _back_edges(start, successors):
+    """Edges into a node on the current DFS path (iterative DFS from ``start``)."""
+    back = set()
+    on_path = {start}
+    visited = {start}
+    work = [(start, iter(successors[start]))]
+    while work:
+        node, nexts = work[-1]
+        for nxt in nexts:
+            if nxt in on_path:
+                back.add((node, nxt))
+            elif nxt not in visited:
+                visited.add(nxt)
+                on_path.add(nxt)
+                work.append((nxt, iter(successors[nxt])))
+                break
+        else:
+            work.pop()
+            on_path.discard(node)
+    return back
+
+
+def schedule_graph(graph_dict: dict, start_node: str = "START", node_hints: dict = None) -> ScheduleReport:
+    """Estimate supersteps, critical path and parallel speedup from node hints.
+
+    ``node_hints`` is ``ParsedSpec.node_hints``: ``latency`` (any time unit)
+    and ``tokens`` per node; nodes without a latency count as
+    DEFAULT_LATENCY.  Loop back edges are dropped, so each loop is taken
+    once.  A node fed by several branches runs after the last of them, and
+    the destinations of one router are alternatives: only the slowest counts
+    towards serial latency and tokens, and together they add one to the width.
+    """
+    node_hints = node_hints or {}
+    adjacency = build_adjacency(graph_dict)
+    adjacency.setdefault(start_node, [])
+    successors = {node: [e["destination"] for e in edges] for node, edges in adjacency.items()}
+    routes = {node: any(e["condition"] != TRUE_FN for e in edges) for node, edges in adjacency.items()}
+    back = _back_edges(start_node, successors)
+
+    # Forward (acyclic) edges among nodes reachable from START
+    reachable = _reachable(start_node, successors)
+    preds = {node: [] for node in reachable}
+    indegree = dict.fromkeys(reachable, 0)
+    for node in reachable:
+        for nxt in successors[node]:
+            if (node, nxt) not in back:
+                preds[nxt].append(node)
+                indegree[nxt] += 1
+
+    latency = {n: 0.0 if n in (start_node, "END") else _hint_number(node_hints, n, "latency", DEFAULT_LATENCY)
+               for n in reachable}
+    tokens = {n: 0.0 if n in (start_node, "END") else _hint_number(node_hints, n, "tokens", 0)
+              for n in reachable}
+
+    # Kahn's order: level = superstep, finish = earliest finish with perfect overlap
+    level = {start_node: 0}
+    finish = {start_node: 0.0}
+    via = {}
+    ready = [start_node]
+    while ready:
+        node = ready.pop()
+        for nxt in successors[node]:
+            if (node, nxt) in back:
+                continue
+            level[nxt] = max(level.get(nxt, 0), level[node] + 1)
+            if finish[node] >= finish.get(nxt, -1.0):
+                finish[nxt], via[nxt] = finish[node], node
+            indegree[nxt] -= 1
+            if indegree[nxt] == 0:
+                finish[nxt] += latency[nxt]
+                ready.append(nxt)
+
+    nodes = [n for n in adjacency if n in level and n not in (start_node, "END")]
+    steps = {}
+    for node in nodes:
+        steps.setdefault(level[node], []).append(node)
+    supersteps = [steps[k] for k in sorted(steps)]
+
+    step_latency = []
+    serial_latency = 0.0
+    total_tokens = 0.0
+    max_width = 0
+    for step in supersteps:
+        step_latency.append(max(latency[n] for n in step))
+        # Destinations reached only from one router are alternatives
+        groups = {}
+        for node in step:
+            sources = set(preds[node])
+            source = sources.pop() if len(sources) == 1 else None
+            key = ("router", source) if source is not None and routes[source] else ("node", node)
+            groups.setdefault(key, []).append(node)
+        max_width = max(max_width, len(groups))
+        serial_latency += sum(max(latency[n] for n in group) for group in groups.values())
+        total_tokens += sum(max(tokens[n] for n in group) for group in groups.values())
+
+    end = max(nodes, key=lambda n: finish[n]) if nodes else start_node
+    critical_path = [end] if nodes else []
+    while critical_path and via.get(critical_path[-1], start_node) != start_node:
+        critical_path.append(via[critical_path[-1]])
+    critical_path.reverse()
+
+    schedule_latency = sum(step_latency)
+    return ScheduleReport(
+        supersteps=supersteps,
+        step_latency=step_latency,
+        schedule_latency=schedule_latency,
+        critical_path=critical_path,
+        critical_path_latency=finish[end] if nodes else 0.0,
+        serial_latency=serial_latency,
+        max_width=max_width,
+        speedup=serial_latency / schedule_latency if schedule_latency else 1.0,
+        tokens=int(total_tokens),
+        back_edges=sorted(back),
+        unannotated=[n for n in nodes if "latency" not in node_hints.get(n, {})],
+    )
@@ -1,4 +1,5 @@
 import random
+import re
 import sys
 from dataclasses import dataclass, field
 from textwrap import dedent
@@ -6,6 +7,8 @@ from typing import Dict, Any, List, Optional, Tuple, Union
 from pathlib import Path
 import os
 from langgraph_codegen.graph import Graph
+from langgraph_codegen.profiling import profile_iter, profile_stage, stage
+from langgraph_codegen.validate import validate_text
 
 ERROR_START_NODE_NOT_FOUND = "START node not found at beginning of graph specification"
 
@@ -32,134 +35,131 @@ def snake_to_state_class(name):
     return ''.join(p.capitalize() for p in parts) + 'State'
 
 
-def expand_chains(graph_spec):
-    """Expand chained arrows into individual edges.
+def _has_bare_commas(s):
+    """Return True if s contains commas outside parentheses."""
+    return ',' in s and '(' not in s
 
-    ``a -> b -> c -> d`` becomes three lines: ``a -> b``, ``b -> c``, ``c -> d``.
-    ``START:State -> a -> b`` becomes ``START:State -> a``, ``a -> b``.
-    ``a -> b, c -> d`` (fan-out/fan-in) becomes ``a -> b``, ``a -> c``, ``b -> d``, ``c -> d``.
-    ``a -> worker(field) -> b`` becomes ``a -> worker(field)``, ``worker -> b``.
-    ``a -> b -> cond ? x : y`` becomes ``a -> b``, ``b -> cond ? x : y``.
-    Lines with 0 or 1 arrows pass through unchanged.
-    """
-    result_lines = []
-    for line in graph_spec.split('\n'):
-        stripped = line.strip()
-        # Pass through comments, blanks, indented lines (conditionals), old => syntax
-        if not stripped or stripped.startswith('#') or line[0:1].isspace() or '->' not in stripped:
-            result_lines.append(line)
-            continue
 
-        # Split on -> to get segments
-        segments = stripped.split('->')
-        parts = [s.strip() for s in segments]
+def expand_chain_line(line):
+    """Expand a single spec line into a list of lines (see ``expand_chains``)."""
+    stripped = line.strip()
+    # Pass through comments, blanks, indented lines (conditionals), old => syntax
+    if not stripped or stripped.startswith('#') or line[0:1].isspace() or '->' not in stripped:
+        return [line]
 
-        def _has_bare_commas(s):
-            """Return True if s contains commas outside parentheses."""
-            return ',' in s and '(' not in s
+    # Split on -> to get segments
+    segments = stripped.split('->')
+    parts = [s.strip() for s in segments]
 
-        # Single arrow — check for bare commas in destination to split
-        if len(segments) == 2:
-            src, dst = parts[0], parts[1]
-            if _has_bare_commas(dst):
-                for node in [n.strip() for n in dst.split(',')]:
-                    result_lines.append(f"{src} -> {node}")
-            else:
-                result_lines.append(line)
-            continue
+    # Single arrow — check for bare commas in destination to split
+    if len(segments) == 2:
+        src, dst = parts[0], parts[1]
+        if _has_bare_commas(dst):
+            return [f"{src} -> {node}" for node in [n.strip() for n in dst.split(',')]]
+        return [line]
 
-        # Multiple arrows — expand into individual edges
-        i = 0
-        while i < len(parts) - 1:
-            src = parts[i]
-            dst = parts[i + 1]
-
-            # For the source: if it's a function call like worker(field),
-            # use just the function name as the source node
-            if i > 0 and '(' in src and ')' in src:
-                src = src.split('(')[0].strip()
-            # For the source: if it's pipe notation like field | func,
-            # use just the func name as the source node
-            if i > 0 and '|' in src:
-                src = src.split('|')[1].strip()
-
-            # If dst contains bare commas (not inside parens), split into individual fan-out edges
-            if _has_bare_commas(dst):
-                fan_nodes = [n.strip() for n in dst.split(',')]
-                # Emit individual fan-out edges: src -> each node
+    # Multiple arrows — expand into individual edges
+    result_lines = []
+    i = 0
+    while i < len(parts) - 1:
+        src = parts[i]
+        dst = parts[i + 1]
+
+        # For the source: if it's a function call like worker(field),
+        # use just the function name as the source node
+        if i > 0 and '(' in src and ')' in src:
+            src = src.split('(')[0].strip()
+        # For the source: if it's pipe notation like field | func,
+        # use just the func name as the source node
+        if i > 0 and '|' in src:
+            src = src.split('|')[1].strip()
+
+        # If dst contains bare commas (not inside parens), split into individual fan-out edges
+        if _has_bare_commas(dst):
+            fan_nodes = [n.strip() for n in dst.split(',')]
+            # Emit individual fan-out edges: src -> each node
+            for node in fan_nodes:
+                result_lines.append(f"{src} -> {node}")
+            if i + 2 < len(parts):
+                # Fan-in: each node -> next destination
+                next_dst = parts[i + 2]
                 for node in fan_nodes:
-                    result_lines.append(f"{src} -> {node}")
-                if i + 2 < len(parts):
-                    # Fan-in: each node -> next destination
-                    next_dst = parts[i + 2]
-                    for node in fan_nodes:
-                        result_lines.append(f"{node} -> {next_dst}")
-                    # Skip the fan-in target
-                    i += 2
-                else:
-                    i += 1
+                    result_lines.append(f"{node} -> {next_dst}")
+                # Skip the fan-in target
+                i += 2
             else:
-                result_lines.append(f"{src} -> {dst}")
                 i += 1
-
-    return '\n'.join(result_lines)
+        else:
+            result_lines.append(f"{src} -> {dst}")
+            i += 1
+    return result_lines
 
 
-def preprocess_start_syntax(graph_spec, graph_name):
-    """Normalise START lines to internal ``START(ClassName) => dest`` form.
+def _iter_expanded(lines):
+    for line in lines:
+        yield from expand_chain_line(line)
 
-    Accepted user-facing forms:
-    1. ``START:ClassName -> dest`` — explicit state class
-    2. ``START -> dest`` — class name derived from graph_name
 
-    Internal passthrough:
-    3. ``START(ClassName) => dest`` — already in internal form
+@profile_stage
+def expand_chains(graph_spec):
+    """Expand chained arrows into individual edges.
 
-    Handles multiple START lines (from fan-out expansion).
+    ``a -> b -> c -> d`` becomes three lines: ``a -> b``, ``b -> c``, ``c -> d``.
+    ``START:State -> a -> b`` becomes ``START:State -> a``, ``a -> b``.
+    ``a -> b, c -> d`` (fan-out/fan-in) becomes ``a -> b``, ``a -> c``, ``b -> d``, ``c -> d``.
+    ``a -> worker(field) -> b`` becomes ``a -> worker(field)``, ``worker -> b``.
+    ``a -> b -> cond ? x : y`` becomes ``a -> b``, ``b -> cond ? x : y``.
+    Lines with 0 or 1 arrows pass through unchanged.
     """
-    lines = graph_spec.split('\n')
+    return '\n'.join(_iter_expanded(graph_spec.split('\n')))
+
+
+def _iter_start_preprocessed(lines, graph_name):
     class_name = None
-    changed = False
-    for i, line in enumerate(lines):
+    for line in lines:
         stripped = line.strip()
-        if not stripped or stripped.startswith('#'):
-            continue
-        if not stripped.startswith('START'):
-            continue
-        if '(' in stripped:
-            continue  # Already internal form
-        if ':' in stripped.split('->')[0]:
+        if not stripped or stripped.startswith('#') or not stripped.startswith('START') or '(' in stripped:
+            # '(' means already internal form
+            yield line
+        elif ':' in stripped.split('->')[0]:
             # START:ClassName -> dest
             start_part = stripped.split('->')[0].strip()
             class_name = start_part.split(':', 1)[1].strip()
             if '->' in stripped:
                 destination = stripped.split('->', 1)[1].strip()
-                lines[i] = f'START({class_name}) => {destination}'
-                changed = True
+                yield f'START({class_name}) => {destination}'
+            else:
+                yield line
         elif '->' in stripped:
             # Bare START -> dest
             if class_name is None:
                 class_name = snake_to_state_class(graph_name)
             destination = stripped.split('->', 1)[1].strip()
-            lines[i] = f'START({class_name}) => {destination}'
-            changed = True
-    if changed:
-        return '\n'.join(lines)
-    return graph_spec
+            yield f'START({class_name}) => {destination}'
+        else:
+            yield line
 
-def normalize_spec(graph_spec: str) -> str:
-    """Stage 2: Convert expanded format to normalized indented format.
 
-    Input: expanded spec (one -> per line, from expand_chains + preprocess_start_syntax)
-    Output: normalized spec with indented edges and metadata comments
+@profile_stage
+def preprocess_start_syntax(graph_spec, graph_name):
+    """Normalise START lines to internal ``START(ClassName) => dest`` form.
+
+    Accepted user-facing forms:
+    1. ``START:ClassName -> dest`` — explicit state class
+    2. ``START -> dest`` — class name derived from graph_name
+
+    Internal passthrough:
+    3. ``START(ClassName) => dest`` — already in internal form
+
+    Handles multiple START lines (from fan-out expansion).
     """
-    graph_spec = dedent(graph_spec)
-    # NOTE: no expand_chains() call — input is already expanded
-    lines = graph_spec.split("\n")
-    transformed_lines = []
+    return '\n'.join(_iter_start_preprocessed(graph_spec.split('\n'), graph_name))
+
+def _iter_normalized(lines):
     state_class_name = None
     start_node_name = None
     for line in lines:
+        transformed_lines = []
         # Remove comments from the line
         # design issue here, we are relying on whitespace at beginning controls how to interpret the line, so have to rstrip only
         line = line.split('#')[0].rstrip()
@@ -176,6 +176,7 @@ def normalize_spec(graph_spec: str) -> str:
                 start_node_name = line.split("→")[1].strip()
             transformed_lines.append(f"START({state_class_name})")
             transformed_lines.append(f"  => {start_node_name}")
+            yield from transformed_lines
             continue
         # Additional START edges (from fan-out expansion)
         if state_class_name is not None and line.strip().startswith("START"):
@@ -188,6 +189,7 @@ def normalize_spec(graph_spec: str) -> str:
                 dest = None
             if dest:
                 transformed_lines.append(f"  => {dest}")
+                yield from transformed_lines
                 continue
         # if we have a line in this format:
         # "node_name -> fn_name(node_name2, node_name3, END)"
@@ -211,6 +213,7 @@ def normalize_spec(graph_spec: str) -> str:
                 transformed_lines.append(f"{node_name}")
                 transformed_lines.append(f"  {assignment_function_name} => {fn_name}")
                 transformed_lines.append(f"# WORKER_ASSIGNMENT: {assignment_function_name}({field_name}) -> {fn_name}")
+                yield from transformed_lines
                 continue
             elif "(" in line:
                 # All func(...) calls are switch functions
@@ -253,7 +256,19 @@ def normalize_spec(graph_spec: str) -> str:
         else:
             transformed_lines.append(line)
 
-    return "\n".join(transformed_lines)
+        yield from transformed_lines
+
+
+@profile_stage
+def normalize_spec(graph_spec: str) -> str:
+    """Stage 2: Convert expanded format to normalized indented format.
+
+    Input: expanded spec (one -> per line, from expand_chains + preprocess_start_syntax)
+    Output: normalized spec with indented edges and metadata comments
+    """
+    graph_spec = dedent(graph_spec)
+    # NOTE: no expand_chains() call — input is already expanded
+    return "\n".join(_iter_normalized(graph_spec.split("\n")))
 
 
 def transform_graph_spec(graph_spec: str) -> str:
@@ -266,16 +281,26 @@ def transform_graph_spec(graph_spec: str) -> str:
 @dataclass
 class ParsedSpec:
     """Pre-computed results from parsing a graph specification."""
-    raw_spec: str                                          # After expand + preprocess (expanded format)
-    normalized_spec: str                                   # After normalize_spec() (normalized format)
+    raw_spec: Optional[str]                                # After expand + preprocess (expanded format)
+    normalized_spec: Optional[str]                         # After normalize_spec() (normalized format)
     graph_dict: dict                                       # {node: {state, edges: [{condition, destination}]}}
     start_node: str
     state_class: str
     worker_functions: List[Tuple[str, str]] = field(default_factory=list)          # [(func_name, field_name), ...]
     assignment_functions: List[Tuple[str, str, str]] = field(default_factory=list) # [(assign_fn, field_name, worker_fn), ...]
     switch_functions: List[Tuple[str, List[str]]] = field(default_factory=list)    # [(fn_name, [params]), ...]
-
-
+    routing_functions: Optional[Dict[str, str]] = None     # {node: routing fn named in the spec}
+    state_class_name: Optional[str] = None                 # From the STATE section (parse_spec_stream only)
+    state_fields: List[Tuple[str, str]] = field(default_factory=list)              # From the STATE section
+    concise_spec: Optional[str] = None                     # STATE/NODES sections removed, before expansion
+    expanded_spec: Optional[str] = None                    # After expand_chains() (.lgraphx form)
+    node_hints: Dict[str, Dict[str, str]] = field(default_factory=dict)           # From the NODES section
+    fused_nodes: Dict[str, List[str]] = field(default_factory=dict)               # {fused node: [member nodes]}
+    field_policies: Dict[str, Dict[str, object]] = field(default_factory=dict)    # {field: {'keep': n} or {'ephemeral': True}}
+    checkpoint_budget: Optional[int] = None                # STATE: Name budget=64KB, in bytes
+
+
+@profile_stage
 def parse_spec(graph_spec: str) -> 'ParsedSpec':
     """Run the full pipeline once and return all intermediate results.
 
@@ -293,24 +318,175 @@ def parse_spec(graph_spec: str) -> 'ParsedSpec':
         worker_functions=find_worker_functions(graph_spec),
         assignment_functions=find_assignment_functions(normalized),
         switch_functions=find_switch_functions(normalized),
+        routing_functions=find_routing_functions(graph_spec),
     )
 
 
-def parse_graph_spec(graph_spec, state_class_name=None):
-    # transform graph into a uniform format
-    # node_name
-    #   => destination
-    # node_name
-    #   condition_name => destination
-    graph_spec = transform_graph_spec(graph_spec)
+SPEC_TEXT_FORMS = ('concise_spec', 'expanded_spec', 'raw_spec', 'normalized_spec')
+
+
+def _split_lines(lines):
+    """Yield lines without newlines, exactly as ``text.split('\\n')`` would."""
+    ends_with_newline = True
+    for line in lines:
+        ends_with_newline = line.endswith('\n')
+        yield line[:-1] if ends_with_newline else line
+    if ends_with_newline:
+        yield ''
+
+
+def _iter_without_state_section(lines, state):
+    """Drop the STATE section from a line stream, recording it in ``state``.
+
+    Mirrors parse_state_section(): fills ``state['class_name']``,
+    ``state['fields']``, ``state['policies']`` and ``state['budget']`` as the
+    section goes by.
+    """
+    in_section = False
+    for line in lines:
+        stripped = line.strip()
+        if in_section:
+            if _section_ends(stripped, 'NODES:'):
+                in_section = False
+                yield line
+            elif not stripped.startswith('#') and ':' in stripped:
+                name, ftype = stripped.split(':', 1)
+                ftype, policy = split_field_policy(ftype.strip())
+                state['fields'].append((name.strip(), ftype))
+                if policy:
+                    state['policies'][name.strip()] = policy
+        elif state['class_name'] is None and stripped.startswith('STATE:') and not line[0].isspace():
+            state['class_name'], state['budget'] = _state_line(line)
+            in_section = True
+        else:
+            yield line
+
+
+def _tap(lines, sink):
+    """Pass lines through, appending them to ``sink`` when it is a list."""
+    if sink is None:
+        yield from lines
+        return
+    for line in lines:
+        sink.append(line)
+        yield line
 
+
+@profile_stage
+def parse_spec_stream(lines, graph_name, expanded=False, keep_text=False) -> 'ParsedSpec':
+    """Parse a spec from an iterable of lines without holding the whole text.
+
+    Runs the same stages as lgcodegen (STATE and NODES sections, expand_chains,
+    preprocess_start_syntax, normalize_spec, parse_graph_spec) one line at a
+    time, building ``graph_dict`` and the function tables as lines go by.
+
+    Args:
+        lines: Any iterable of lines, e.g. an open file.
+        graph_name: Used to derive the state class for a bare ``START``.
+        expanded: Input is already expanded (``.lgraphx``); skip expand_chains.
+        keep_text: ``True`` to keep every intermediate text form on the
+            result, or a collection of names from SPEC_TEXT_FORMS.  Forms
+            that are not kept are left as None.
+    """
+    if keep_text is True:
+        keep_text = SPEC_TEXT_FORMS
+    keep = {name: [] if name in (keep_text or ()) else None for name in SPEC_TEXT_FORMS}
+
+    state = {'class_name': None, 'fields': [], 'policies': {}, 'budget': None}
+    worker_functions, assignment_functions, switch_functions = [], [], []
+    routing_functions = {}
+
+    def resub_start(stream):
+        # Same as lgcodegen's re.sub over the whole text, once the class is known
+        for line in stream:
+            if state['class_name'] and 'START(' in line:
+                line = re.sub(r'START\([^)]*\)', f"START({state['class_name']})", line)
+            yield line
+
+    def tap_expanded(stream):
+        for line in stream:
+            found = _worker_function_in_line(line)
+            if found:
+                worker_functions.append(found)
+            found = _routing_function_in_line(line)
+            if found:
+                routing_functions.setdefault(*found)
+            yield line
+
+    def tap_normalized(stream):
+        for line in stream:
+            if line.startswith('#'):
+                found = _assignment_function_in_line(line)
+                if found:
+                    assignment_functions.append(found)
+                found = _switch_function_in_line(line)
+                if found:
+                    switch_functions.append(found)
+            yield line
+
+    # Each stage is profiled under the name of the whole-text function it mirrors
+    node_hints = {}
+    stream = profile_iter('parse_state_section', _iter_without_state_section(_split_lines(lines), state))
+    stream = profile_iter('parse_nodes_section', _iter_without_nodes_section(stream, node_hints))
+    stream = _tap(stream, keep['concise_spec'])
+    if not expanded:
+        stream = profile_iter('expand_chains', _iter_expanded(stream))
+    stream = _tap(stream, keep['expanded_spec'])
+    stream = profile_iter('preprocess_start_syntax', resub_start(_iter_start_preprocessed(stream, graph_name)))
+    stream = tap_expanded(_tap(stream, keep['raw_spec']))
+    # parse_graph_spec() re-expands its input; expansion is a no-op on expanded lines
+    stream = profile_iter('normalize_spec', _iter_normalized(_iter_expanded(stream)))
+    stream = tap_normalized(_tap(stream, keep['normalized_spec']))
+    with stage('parse_graph_spec', streaming=True):
+        graph_dict, start_node = _build_graph(stream, state['class_name'])
+
+    if start_node is None:
+        raise ValueError("Graph spec has no START node")
+    if state['class_name']:
+        # A STATE section after the START line still names the state class
+        for node_dict in graph_dict.values():
+            node_dict['state'] = state['class_name']
+    text = {name: None if kept is None else '\n'.join(kept) for name, kept in keep.items()}
+    return ParsedSpec(
+        raw_spec=text['raw_spec'],
+        normalized_spec=text['normalized_spec'],
+        graph_dict=graph_dict,
+        start_node=start_node,
+        state_class=graph_dict[start_node]['state'],
+        worker_functions=worker_functions,
+        assignment_functions=assignment_functions,
+        switch_functions=switch_functions,
+        routing_functions=routing_functions,
+        state_class_name=state['class_name'],
+        state_fields=state['fields'],
+        concise_spec=text['concise_spec'],
+        expanded_spec=text['expanded_spec'],
+        node_hints=node_hints,
+        field_policies=state['policies'],
+        checkpoint_budget=state['budget'],
+    )
+
+
+def parse_spec_file(path, keep_text=False) -> 'ParsedSpec':
+    """Stream-parse a spec file; see parse_spec_stream().
+
+    ``.lgraphx`` files are treated as already expanded, and the graph name is
+    the file's stem, as in lgcodegen.
+    """
+    path = Path(path)
+    with open(path) as fp:
+        return parse_spec_stream(fp, path.stem, expanded=path.suffix == '.lgraphx', keep_text=keep_text)
+
+
+def _build_graph(lines, state_class_name=None):
+    """Build ``(graph_dict, start_node)`` from normalized spec lines."""
     TRUE_FN = "true_fn"
     graph = {}
     current_node = None
     state = None
     start_node = None
 
-    for line in graph_spec.strip().split("\n"):
+    for line in lines:
         line = line.strip()
         if not line or line[0] in ["#", "-", "/"]:
             continue
@@ -339,14 +515,59 @@ def parse_graph_spec(graph_spec, state_class_name=None):
             graph[current_node] = {"state": state, "edges": []}
         else:
             current_node = line
-            graph[current_node] = {"state": state, "edges": []}
+            # A node can head several blocks (e.g. fan-out expands to one
+            # line per destination); keep accumulating its edges.
+            if current_node not in graph:
+                graph[current_node] = {"state": state, "edges": []}
     return graph, start_node
 
 
+@profile_stage
+def parse_graph_spec(graph_spec, state_class_name=None):
+    # transform graph into a uniform format
+    # node_name
+    #   => destination
+    # node_name
+    #   condition_name => destination
+    graph_spec = transform_graph_spec(graph_spec)
+    return _build_graph(graph_spec.strip().split("\n"), state_class_name)
+
+
 def all_true_fn(edges):
     return all(edge["condition"] == "true_fn" for edge in edges)
 
 
+def _routing_function_in_line(line):
+    """Return ``(node_name, function_name)`` for ``node -> fn(a, b)`` lines, else None."""
+    line = line.split('#')[0].strip()  # Remove comments
+    if '->' in line or '→' in line:
+        # Determine which arrow type to use for splitting
+        arrow = '->' if '->' in line else '→'
+        parts = line.split(arrow)
+        if len(parts) == 2:
+            destination_part = parts[1].strip()
+            if '(' in destination_part:
+                # Extract function name (everything before the first parenthesis)
+                func_name = destination_part.split('(')[0].strip()
+                if func_name:
+                    return parts[0].strip(), func_name
+    return None
+
+
+def find_routing_functions(graph_spec):
+    """Map each node to the routing function named in the spec.
+
+    Looks for lines like "node_name -> function_name(param1, param2)";
+    the first such line for a node wins.
+    """
+    routing_functions = {}
+    for line in graph_spec.splitlines():
+        found = _routing_function_in_line(line)
+        if found:
+            routing_functions.setdefault(*found)
+    return routing_functions
+
+
 def get_routing_function_name_from_spec(graph_spec, node_name):
     """Extract the original function name from the graph specification.
     
@@ -354,18 +575,9 @@ def get_routing_function_name_from_spec(graph_spec, node_name):
     and returns "function_name".
     """
     for line in graph_spec.splitlines():
-        line = line.split('#')[0].strip()  # Remove comments
-        if ('->' in line or '→' in line) and line.startswith(node_name):
-            # Determine which arrow type to use for splitting
-            arrow = '->' if '->' in line else '→'
-            parts = line.split(arrow)
-            if len(parts) == 2:
-                destination_part = parts[1].strip()
-                if '(' in destination_part:
-                    # Extract function name (everything before the first parenthesis)
-                    func_name = destination_part.split('(')[0].strip()
-                    if func_name:
-                        return func_name
+        found = _routing_function_in_line(line)
+        if found and found[0] == node_name:
+            return found[1]
     # Fallback to the old naming scheme
     return f"after_{node_name}"
 
@@ -392,7 +604,48 @@ def get_routing_function_name(node_name, edges):
         return f"after_{node_name}"
 
 
-def mk_conditions(node_name, node_dict, graph_spec=None):
+def _route_value(destination):
+    """Python literal a router returns for an edge destination."""
+    if "," in destination:
+        return str([d.strip() for d in destination.split(",")])
+    return f"'{destination}'"
+
+
+def mk_dispatch_router(routing_function_name, state_type, edges):
+    """Router that walks a precomputed ``(condition, destination)`` table.
+
+    Same result as the if/elif chain from mk_conditions(): the first true
+    condition wins, then the unconditional edge, then END.  A condition that
+    appears again further down can never win there, so it is left out of the
+    table and each condition runs at most once per call.
+    """
+    table = f"{routing_function_name.upper()}_ROUTES"
+    routes = []
+    seen = set()
+    default = "'END'"
+    for edge in edges:
+        condition = edge["condition"]
+        if condition == "true_fn":
+            default = _route_value(edge["destination"])
+            break
+        if condition not in seen:
+            seen.add(condition)
+            routes.append(f"    ({condition}, {_route_value(edge['destination'])}),")
+    return "\n".join([
+        f"{table} = (",
+        *routes,
+        ")",
+        "",
+        f"def {routing_function_name}(state: {state_type}):",
+        f"    for condition, destination in {table}:",
+        "        if condition(state):",
+        "            return destination",
+        f"    return {default}",
+        "",
+    ])
+
+
+def mk_conditions(node_name, node_dict, graph_spec=None, routing_functions=None, dispatch=False):
     edges = node_dict["edges"]
     state_type = node_dict["state"]
 
@@ -401,10 +654,14 @@ def mk_conditions(node_name, node_dict, graph_spec=None):
         return ""
 
     # Use the original graph spec to get the function name if available
-    if graph_spec:
+    if routing_functions is not None:
+        routing_function_name = routing_functions.get(node_name, f"after_{node_name}")
+    elif graph_spec:
         routing_function_name = get_routing_function_name_from_spec(graph_spec, node_name)
     else:
         routing_function_name = get_routing_function_name(node_name, edges)
+    if dispatch:
+        return mk_dispatch_router(routing_function_name, state_type, edges)
     function_body = [f"def {routing_function_name}(state: {state_type}):"]
 
     for i, edge in enumerate(edges):
@@ -412,13 +669,7 @@ def mk_conditions(node_name, node_dict, graph_spec=None):
         destination = edge["destination"]
 
         # Format return statement based on destination type
-        if destination == "END":
-            return_statement = "return 'END'"
-        elif "," in destination:
-            destinations = [d.strip() for d in destination.split(",")]
-            return_statement = f"return {destinations}"
-        else:
-            return_statement = f"return '{destination}'"
+        return_statement = f"return {_route_value(destination)}"
 
         # Add condition and return statement
         if condition == "true_fn":
@@ -436,7 +687,8 @@ def mk_conditions(node_name, node_dict, graph_spec=None):
     return "\n".join(function_body)
 
 
-def mk_conditional_edges(builder_graph, node_name, node_dict, graph_spec=None):
+def mk_conditional_edges(builder_graph, node_name, node_dict, graph_spec=None, routing_functions=None, guard=None,
+                         replay=False):
     edges = node_dict["edges"]
 
     # Case 1: parallel output (all edges are true_fn)
@@ -480,17 +732,32 @@ def mk_conditional_edges(builder_graph, node_name, node_dict, graph_spec=None):
         edge_mappings.append("'END': END")
     
     # Use the original graph spec to get the function name if available
-    if graph_spec:
+    if routing_functions is not None:
+        routing_function_name = routing_functions.get(node_name, f"after_{node_name}")
+    elif graph_spec:
         routing_function_name = get_routing_function_name_from_spec(graph_spec, node_name)
     else:
         routing_function_name = get_routing_function_name(node_name, edges)
+    if guard:
+        # Loop guard: force the exit branch once the loop's counter hits the limit
+        counter, limit, exit_to = guard
+        routing_function_name = f"loop_guard({routing_function_name}, '{counter}', {limit}, '{exit_to}')"
+    if replay:
+        # Record or replay this router's decisions (see replay.py)
+        routing_function_name = replay_router(node_name, routing_function_name)
     if any("," in edge["destination"] for edge in edges):
         return f"{node_name}_conditional_edges = {list(destinations)}\n{builder_graph}.add_conditional_edges('{node_name}', {routing_function_name}, {node_name}_conditional_edges)\n"
     else:
         return f"{node_name}_conditional_edges = {{ {', '.join(edge_mappings)} }}\n{builder_graph}.add_conditional_edges('{node_name}', {routing_function_name}, {node_name}_conditional_edges)\n"
 
 
-def gen_node(node_name, state_type, single_node=False):
+def gen_node(node_name, state_type, single_node=False, schema=None):
+    """Mock node function.
+
+    ``schema`` is ``(input_type, output_type, writes)`` from node_schemas():
+    the node takes ``input_type``, is annotated to return ``output_type``
+    and returns a default value for each ``(field, default)`` in writes.
+    """
     imports = """# GENERATED CODE: node function for {node_name}
 from typing import Dict, TypedDict, Annotated, Optional
 from langgraph.graph import StateGraph
@@ -498,13 +765,20 @@ from langchain_core.messages.tool import ToolMessage
 from langchain_core.runnables.config import RunnableConfig
 
 """ if single_node else ""
-    
+
+    if schema:
+        input_type, output_type, writes = schema
+        update = ', '.join(f"'{name}': {default}" for name, default in writes)
+        return f"""{imports}def {node_name}(state: {input_type}, *, config:Optional[RunnableConfig] = None) -> {output_type}:
+    print(f'NODE: {node_name}')
+    return {{ {update} }}
+"""
     return f"""{imports}def {node_name}(state: {state_type}, *, config:Optional[RunnableConfig] = None):
     print(f'NODE: {node_name}')
     return {{ 'nodes_visited': '{node_name}', 'counter': state['counter'] + 1 }}
 """
 
-def process_node(node_name, node_data, found_functions, graph, state_type, single_node=False):
+def process_node(node_name, node_data, found_functions, graph, state_type, single_node=False, schema=None):
     """Process a single node and generate appropriate code."""
     if node_name in ["START", "END"]:  # Exclude both START and END
         return None
@@ -516,7 +790,7 @@ def process_node(node_name, node_data, found_functions, graph, state_type, singl
     else:
         if isinstance(graph, dict) and node_data is not None:
             state_type = node_data.get('state', 'default')
-        return gen_node(node_name, state_type, single_node)
+        return gen_node(node_name, state_type, single_node, schema)
 
 def gen_node_names(node_names):
     if "," in node_names:
@@ -526,13 +800,16 @@ def gen_node_names(node_names):
     else:
         yield node_names
 
-def gen_nodes(graph: Union[Graph, dict], found_functions: list[str] = None, worker_func_names: set = None):
+@profile_stage
+def gen_nodes(graph: Union[Graph, dict], found_functions: list[str] = None, worker_func_names: set = None,
+              node_schemas: dict = None):
     """Generate code for graph nodes.
 
     Args:
         graph: Either a Graph instance containing nodes and edges, or a dictionary with graph data
         found_functions: Optional list of found function names
         worker_func_names: Optional set of worker function names to exclude
+        node_schemas: Optional {node: (input_type, output_type, writes)} (see gen_node)
     """
     nodes = []
     # workaround python mutable default argument problem (list is mutable, and created once at function definition time)
@@ -555,7 +832,8 @@ def gen_nodes(graph: Union[Graph, dict], found_functions: list[str] = None, work
         for node_name in gen_node_names(node_names):
             if node_name in worker_func_names:
                 continue
-            node_code = process_node(node_name, node_data, found_functions, graph, state_type)
+            schema = node_schemas.get(node_name) if node_schemas else None
+            node_code = process_node(node_name, node_data, found_functions, graph, state_type, schema=schema)
             if node_code:
                 nodes.append(node_code)
     
@@ -585,7 +863,8 @@ def {condition}(state: {state_type}) -> bool:
     return result
 """
 
-def gen_conditions(graph_spec, human=False, parsed=None):
+@profile_stage
+def gen_conditions(graph_spec, human=False, parsed=None, dispatch=False):
     if parsed:
         graph, start_node = parsed.graph_dict, parsed.start_node
         assignment_func_names = {af[0] for af in parsed.assignment_functions}
@@ -632,11 +911,24 @@ def human_choice(condition, choices):
 
     # Generate switch condition functions
     for fn_name, params in switch_funcs:
-        conditions.append(gen_switch_condition(fn_name, params, state_type, human))
+        conditions.append(gen_switch_condition(fn_name, params, state_type, human, dispatch))
 
     result = "# Conditional Edge Functions\n# Functions that determine which path to take in the graph"
     return result + "\n".join(conditions) if conditions else "# Conditional Edge Functions: None"
 
+def _worker_function_in_line(line):
+    """Return ``(func_name, field_name)`` for ``node -> field | func`` lines, else None."""
+    line = line.split('#')[0].strip()  # Remove comments
+    if ('->' in line or '→' in line) and '|' in line:
+        arrow = '->' if '->' in line else '→'
+        parts = line.split(arrow)
+        if len(parts) == 2:
+            dest = parts[1].strip()
+            if '|' in dest:
+                field_name, func_name = [s.strip() for s in dest.split('|')]
+                return (func_name, field_name)
+    return None
+
 def find_worker_functions(graph_spec):
     """Extract Worker Functions from the original graph specification.
 
@@ -645,15 +937,9 @@ def find_worker_functions(graph_spec):
     """
     worker_functions = []
     for line in graph_spec.splitlines():
-        line = line.split('#')[0].strip()  # Remove comments
-        if ('->' in line or '→' in line) and '|' in line:
-            arrow = '->' if '->' in line else '→'
-            parts = line.split(arrow)
-            if len(parts) == 2:
-                dest = parts[1].strip()
-                if '|' in dest:
-                    field_name, func_name = [s.strip() for s in dest.split('|')]
-                    worker_functions.append((func_name, field_name))
+        found = _worker_function_in_line(line)
+        if found:
+            worker_functions.append(found)
     return worker_functions
 
 def gen_worker_function(func_name, param, state_type):
@@ -676,6 +962,7 @@ def {func_name}(item):
     return {{"result": f"processed {{item}}"}}
 """
 
+@profile_stage
 def gen_worker_functions(graph_spec, parsed=None):
     """Generate all Worker Function implementations."""
     if parsed:
@@ -697,27 +984,41 @@ def gen_worker_functions(graph_spec, parsed=None):
 
     return result + "\n".join(implementations)
 
+def _switch_function_in_line(line):
+    """Return ``(fn_name, [params])`` for a ``# SWITCH:`` comment line, else None."""
+    if line.strip().startswith("# SWITCH:"):
+        content = line.replace("# SWITCH:", "").strip()
+        fn_name = content.split("(")[0].strip()
+        params = content.split("(")[1].split(")")[0].strip()
+        return (fn_name, [p.strip() for p in params.split(",")])
+    return None
+
+
 def find_switch_functions(transformed_spec):
     """Extract switch functions from # SWITCH: comments.
     Returns list of (fn_name, [param1, param2, ...])."""
     switch_functions = []
     for line in transformed_spec.splitlines():
-        if line.strip().startswith("# SWITCH:"):
-            content = line.replace("# SWITCH:", "").strip()
-            fn_name = content.split("(")[0].strip()
-            params = content.split("(")[1].split(")")[0].strip()
-            param_list = [p.strip() for p in params.split(",")]
-            switch_functions.append((fn_name, param_list))
+        found = _switch_function_in_line(line)
+        if found:
+            switch_functions.append(found)
     return switch_functions
 
 
-def gen_switch_condition(fn_name, params, state_type, human=False):
+def gen_switch_condition(fn_name, params, state_type, human=False, dispatch=False):
     choices_str = ", ".join(f"'{p}'" for p in params)
+    constant = ""
+    if dispatch:
+        # Destinations built once, at import time
+        constant = f"\n{fn_name.upper()}_CHOICES = {tuple(params)!r}\n"
+        choices_str = f"*{fn_name.upper()}_CHOICES"
     if human:
         choice_fn = f"human_choice('{fn_name}', [{choices_str}])"
+    elif dispatch:
+        choice_fn = f"random.choice({fn_name.upper()}_CHOICES)"
     else:
         choice_fn = f"random.choice([{choices_str}])"
-    return f"""
+    return f"""{constant}
 def {fn_name}(state: {state_type}) -> str:
     result = {choice_fn}
     print(f'CONDITION: {fn_name}. Result: {{result}}')
@@ -725,6 +1026,18 @@ def {fn_name}(state: {state_type}) -> str:
 """
 
 
+def _assignment_function_in_line(line):
+    """Return ``(assignment_func, field_name, worker_func)`` for a ``# WORKER_ASSIGNMENT:`` line, else None."""
+    line = line.strip()
+    if line.startswith("# WORKER_ASSIGNMENT:"):
+        # Parse: # WORKER_ASSIGNMENT: assign_workers_llm_call(sections) -> llm_call
+        parts = line.replace("# WORKER_ASSIGNMENT:", "").strip()
+        assignment_part, worker_func = parts.split(" -> ")
+        assignment_func = assignment_part.split("(")[0].strip()
+        field_name = assignment_part.split("(")[1].split(")")[0].strip()
+        return (assignment_func, field_name, worker_func)
+    return None
+
 def find_assignment_functions(graph_spec):
     """Extract Assignment Functions from the transformed graph specification.
     
@@ -733,14 +1046,9 @@ def find_assignment_functions(graph_spec):
     """
     assignment_functions = []
     for line in graph_spec.splitlines():
-        line = line.strip()
-        if line.startswith("# WORKER_ASSIGNMENT:"):
-            # Parse: # WORKER_ASSIGNMENT: assign_workers_llm_call(sections) -> llm_call
-            parts = line.replace("# WORKER_ASSIGNMENT:", "").strip()
-            assignment_part, worker_func = parts.split(" -> ")
-            assignment_func = assignment_part.split("(")[0].strip()
-            field_name = assignment_part.split("(")[1].split(")")[0].strip()
-            assignment_functions.append((assignment_func, field_name, worker_func))
+        found = _assignment_function_in_line(line)
+        if found:
+            assignment_functions.append(found)
     return assignment_functions
 
 def gen_assignment_function(assignment_func, field_name, worker_func, state_type):
@@ -755,6 +1063,7 @@ def {assignment_func}(state: {state_type}):
     return [Send('{worker_func}', {{'item': item}}) for item in state['{field_name}']]
 """
 
+@profile_stage
 def gen_assignment_functions(graph_spec, parsed=None):
     """Generate all Assignment Function implementations."""
     if parsed:
@@ -785,12 +1094,77 @@ TYPE_DEFAULTS = {'list': '[]', 'int': '0', 'str': "''", 'dict': '{}', 'bool': 'F
 DEFAULT_STATE_FIELDS = [('nodes_visited', 'list[str]'), ('counter', 'int')]
 
 
+# --- STATE retention directives ---
+#
+# STATE: ChatState budget=64KB
+# messages: list[str] keep=50
+# scratch: dict ephemeral
+
+_BYTE_UNITS = {'': 1, 'B': 1, 'K': 1024, 'KB': 1024, 'M': 1024 ** 2, 'MB': 1024 ** 2, 'G': 1024 ** 3, 'GB': 1024 ** 3}
+
+
+def parse_byte_size(text):
+    """'65536', '64KB', '64K' or '1.5MB' -> bytes."""
+    match = re.fullmatch(r'([0-9.]+)\s*([KMG]?B?)', text.strip().upper())
+    if not match:
+        raise ValueError(f"Not a byte size: {text!r}")
+    return int(float(match.group(1)) * _BYTE_UNITS[match.group(2)])
+
+
+def _state_line(line):
+    """``STATE: Name [budget=SIZE]`` -> (class_name, budget in bytes or None)."""
+    words = line.split(':', 1)[1].split()
+    budget = parse_node_hints(' '.join(words[1:])).get('budget')
+    return (words[0] if words else ''), parse_byte_size(budget) if budget else None
+
+
+def split_field_policy(field_type):
+    """Split retention directives off a STATE field type.
+
+    ``'list[str] keep=50'`` -> ``('list[str]', {'keep': 50})``: the field's
+    reducer keeps only the last 50 items.  ``'dict ephemeral'`` ->
+    ``('dict', {'ephemeral': True})``: the value lasts one step and is not
+    carried into later checkpoints.
+    """
+    policy = {}
+    rest = field_type
+    while ' ' in rest:
+        head, last = rest.rsplit(' ', 1)
+        if last == 'ephemeral':
+            policy['ephemeral'] = True
+        elif last.startswith('keep='):
+            if not last[5:].isdigit() or int(last[5:]) < 1:
+                raise ValueError(f"keep= takes a positive number of items: {field_type}")
+            policy['keep'] = int(last[5:])
+        else:
+            break
+        rest = head.rstrip()
+    if 'keep' in policy and (policy.get('ephemeral') or type_to_reducer(rest) != 'add_to_list'):
+        raise ValueError(f"keep= applies to list fields that are not ephemeral: {field_type}")
+    return rest, policy
+
+
+def keep_reducer_name(keep):
+    return f"add_to_list_keep_{keep}"
+
+
+def field_annotation(field_type, policy=None):
+    """Type annotation of a state field, with its reducer or channel."""
+    policy = policy or {}
+    if policy.get('ephemeral'):
+        return f"Annotated[{field_type}, EphemeralValue]"
+    reducer = keep_reducer_name(policy['keep']) if 'keep' in policy else type_to_reducer(field_type)
+    return f"Annotated[{field_type}, {reducer}]" if reducer else field_type
+
+
+@profile_stage
 def parse_state_section(graph_spec):
     """Extract STATE section from graph spec.
 
     Returns (class_name, fields, remaining_spec).
     - class_name: str or None
-    - fields: list of (field_name, field_type)
+    - fields: list of (field_name, field_type); retention directives are
+      dropped (parse_spec_stream() keeps them in ``field_policies``)
     - remaining_spec: graph spec with STATE section removed
     """
     lines = graph_spec.split('\n')
@@ -806,27 +1180,27 @@ def parse_state_section(graph_spec):
         return (None, [], graph_spec)
 
     # Extract class name from the STATE: line
-    class_name = lines[state_line_idx].split(':', 1)[1].strip()
+    class_name, _budget = _state_line(lines[state_line_idx])
 
     # Collect field lines
     fields = []
     end_idx = state_line_idx + 1
     for j in range(state_line_idx + 1, len(lines)):
         stripped = lines[j].strip()
-        # Stop at blank line, START, or arrow
+        # Stop at blank line, START, arrow, or a NODES section
         if not stripped:
             end_idx = j
             break
-        if stripped.startswith('START') or '=>' in stripped or '->' in stripped:
+        if stripped.startswith('START') or '=>' in stripped or '->' in stripped or stripped.startswith('NODES:'):
             end_idx = j
             break
         if stripped.startswith('#'):
             end_idx = j + 1
             continue
-        # Parse field: name: type
+        # Parse field: name: type [keep=N | ephemeral]
         if ':' in stripped:
             name, ftype = stripped.split(':', 1)
-            fields.append((name.strip(), ftype.strip()))
+            fields.append((name.strip(), split_field_policy(ftype.strip())[0]))
         end_idx = j + 1
 
     # Build remaining spec without STATE section
@@ -836,6 +1210,63 @@ def parse_state_section(graph_spec):
     return (class_name, fields, remaining_spec)
 
 
+# --- NODES section: per-node hints ---
+#
+# NODES:
+# plan_step: latency=2.0 tokens=1500
+# execute_step: latency=8 tokens=4000
+
+
+def _section_ends(stripped, other_section):
+    """True for lines that end a STATE or NODES section."""
+    return (not stripped or stripped.startswith('START') or '=>' in stripped or '->' in stripped
+            or stripped.startswith(other_section))
+
+
+def parse_node_hints(text):
+    """Parse ``key=value key=value`` into a dict of strings."""
+    hints = {}
+    for item in text.split():
+        if '=' in item:
+            key, value = item.split('=', 1)
+            hints[key.strip()] = value.strip()
+    return hints
+
+
+@profile_stage
+def parse_nodes_section(graph_spec):
+    """Extract the NODES section (per-node hints) from a graph spec.
+
+    Returns (node_hints, remaining_spec).
+    - node_hints: {node_name: {key: value}}, values as written
+    - remaining_spec: graph spec with NODES section removed
+    """
+    if 'NODES:' not in graph_spec:
+        return ({}, graph_spec)
+    node_hints = {}
+    remaining_spec = '\n'.join(_iter_without_nodes_section(graph_spec.split('\n'), node_hints))
+    return (node_hints, remaining_spec)
+
+
+def _iter_without_nodes_section(lines, node_hints):
+    """Drop the NODES section from a line stream, filling ``node_hints``."""
+    in_section = False
+    seen = False
+    for line in lines:
+        stripped = line.strip()
+        if in_section:
+            if _section_ends(stripped, 'STATE:'):
+                in_section = False
+                yield line
+            elif not stripped.startswith('#') and ':' in stripped:
+                name, hints = stripped.split(':', 1)
+                node_hints.setdefault(name.strip(), {}).update(parse_node_hints(hints))
+        elif not seen and stripped.startswith('NODES:') and not line[0].isspace():
+            in_section = seen = True
+        else:
+            yield line
+
+
 def type_to_reducer(field_type):
     """Return the reducer function name for a field type, or None."""
     base = field_type.split('[')[0]
@@ -848,36 +1279,46 @@ def type_to_default(field_type):
     return TYPE_DEFAULTS.get(base, 'None')
 
 
-def gen_state_class(state_class, fields, is_default=False):
+def gen_state_class(state_class, fields, is_default=False, policies=None):
     """Generate state class code from a list of (field_name, field_type) tuples.
 
     Only emits reducer functions that are actually used by the fields.
-    When is_default=True, adds '# default field' comments.
+    When is_default=True, adds '# default field' comments.  ``policies``
+    maps field names to retention directives (see split_field_policy()).
     """
+    policies = policies or {}
     # Determine which reducers are needed
     needed_reducers = set()
-    for _name, ftype in fields:
+    keeps = set()
+    ephemeral = False
+    for name, ftype in fields:
+        policy = policies.get(name, {})
+        if policy.get('ephemeral'):
+            ephemeral = True
+            continue
         r = type_to_reducer(ftype)
         if r:
             needed_reducers.add(r)
+        if 'keep' in policy:
+            keeps.add(policy['keep'])
 
     parts = [f"\n# Graph State: {state_class}", "from typing import Annotated, TypedDict\n"]
+    if ephemeral:
+        parts[-1] = parts[-1].rstrip('\n') + "\nfrom langgraph.channels import EphemeralValue\n"
 
     # Emit only needed reducer functions
     if 'add_to_list' in needed_reducers:
         parts.append('def add_to_list(a=None, b=""):\n    return (a if a is not None else []) + ([b] if not isinstance(b, list) else b)\n')
+    for keep in sorted(keeps):
+        parts.append(f'def {keep_reducer_name(keep)}(a=None, b=""):\n    return add_to_list(a, b)[-{keep}:]\n')
     if 'add_int' in needed_reducers:
         parts.append('def add_int(a, b):\n    if b == 0: return 0\n    return b+1 if a==b else b\n')
 
     # Build class body
     class_lines = [f"class {state_class}(TypedDict):"]
     for name, ftype in fields:
-        reducer = type_to_reducer(ftype)
         comment = "  # default field" if is_default else ""
-        if reducer:
-            class_lines.append(f"    {name}: Annotated[{ftype}, {reducer}]{comment}")
-        else:
-            class_lines.append(f"    {name}: {ftype}{comment}")
+        class_lines.append(f"    {name}: {field_annotation(ftype, policies.get(name))}{comment}")
     parts.append('\n'.join(class_lines) + '\n')
 
     # Build initialize_state()
@@ -890,7 +1331,56 @@ def gen_state_class(state_class, fields, is_default=False):
     return '\n'.join(parts)
 
 
-def mock_state(state_class, extra_fields=None):
+def node_schema_names(node_name):
+    """Input and output TypedDict names for a node: fetch_news -> FetchNewsInput, FetchNewsOutput."""
+    base = ''.join(part[:1].upper() + part[1:] for part in node_name.split('_'))
+    return f"{base}Input", f"{base}Output"
+
+
+def gen_schema_class(class_name, fields, policies=None):
+    """A TypedDict with the given (field_name, field_type) fields, reducers as in the state class."""
+    policies = policies or {}
+    lines = [f"class {class_name}(TypedDict):"]
+    for name, ftype in fields:
+        lines.append(f"    {name}: {field_annotation(ftype, policies.get(name))}")
+    if not fields:
+        lines.append("    pass")
+    return '\n'.join(lines) + '\n'
+
+
+def gen_node_schemas(fields, node_access, graph_schemas=None, policies=None):
+    """Per-node input and output TypedDicts, for the state module.
+
+    Args:
+        fields: The state's (field_name, field_type) list, in declaration order.
+        node_access: {node: access} where access has ``reads`` and ``writes`` field sets.
+        graph_schemas: Optional ``((input_name, input_fields), (output_name, output_fields))``
+            for the graph's own input and output schemas; either may be None.
+        policies: The state's field retention directives, so annotations match.
+
+    Raises ValueError for a field that is not in ``fields``.
+    """
+    types = dict(fields)
+    parts = ["# Node Schemas: fields each node reads (Input) and returns (Output)"]
+
+    def select(node, names):
+        unknown = sorted(set(names) - set(types))
+        if unknown:
+            raise ValueError(f"NODES: {node} uses {', '.join(unknown)}, not a state field")
+        return [(name, ftype) for name, ftype in fields if name in names]
+
+    for node, access in node_access.items():
+        input_name, output_name = node_schema_names(node)
+        parts.append(gen_schema_class(input_name, select(node, access.reads), policies))
+        parts.append(gen_schema_class(output_name, select(node, access.writes), policies))
+    for schema in graph_schemas or ():
+        if schema:
+            class_name, names = schema
+            parts.append(gen_schema_class(class_name, select(class_name, names), policies))
+    return '\n'.join(parts)
+
+
+def mock_state(state_class, extra_fields=None, policies=None):
     """Backward-compatible wrapper around gen_state_class using default fields."""
     fields = list(DEFAULT_STATE_FIELDS)
     if extra_fields:
@@ -898,12 +1388,16 @@ def mock_state(state_class, extra_fields=None):
         for field_name, field_type in extra_fields:
             if field_name not in existing_names:
                 fields.append((field_name, field_type))
-    return gen_state_class(state_class, fields, is_default=True)
+    return gen_state_class(state_class, fields, is_default=True, policies=policies)
 
-def gen_state(graph_spec, state_class_file=None, state_fields=None, state_class_name=None, parsed=None):
+@profile_stage
+def gen_state(graph_spec, state_class_file=None, state_fields=None, state_class_name=None, parsed=None,
+              extra_fields=None):
+    policies = None
     if parsed:
         state_class = state_class_name or parsed.state_class
         worker_funcs = parsed.worker_functions
+        policies = parsed.field_policies
     else:
         graph, start_node = parse_graph_spec(graph_spec)
         state_class = state_class_name or graph[start_node]["state"]
@@ -920,6 +1414,8 @@ def gen_state(graph_spec, state_class_file=None, state_fields=None, state_class_
         else:
             field_name = param
         worker_extra.append((field_name, 'list'))
+    # Generator-owned fields, e.g. loop guard counters
+    worker_extra.extend(extra_fields or [])
 
     if state_fields:
         # Custom STATE section — add worker fields only if missing
@@ -928,27 +1424,138 @@ def gen_state(graph_spec, state_class_file=None, state_fields=None, state_class_
         for field_name, field_type in worker_extra:
             if field_name not in existing_names:
                 fields.append((field_name, field_type))
-        return gen_state_class(state_class, fields, is_default=False)
+        return gen_state_class(state_class, fields, is_default=False, policies=policies)
     else:
         # Default fields
-        return mock_state(state_class, extra_fields=worker_extra if worker_extra else None)
+        return mock_state(state_class, extra_fields=worker_extra if worker_extra else None, policies=policies)
 
 
     
-def gen_graph(graph_name, graph_spec, compile_args=None, parsed=None):
-    if not graph_spec: return ""
+def loop_counter_field(node_name):
+    """State field counting runs of a loop-guarded router node."""
+    return f"{node_name}_iterations"
+
+
+LOOP_GUARD_HELPERS = """import functools
+
+
+def count_iterations(node, counter):
+    \"\"\"Wrap a node so each run also writes counter = previous count + 1.\"\"\"
+    @functools.wraps(node)
+    def counted(state, *args, **kwargs):
+        update = node(state, *args, **kwargs) or {}
+        return {**update, counter: state.get(counter, 0) + 1}
+    return counted
+
+
+def loop_guard(router, counter, limit, exit_to):
+    \"\"\"Wrap a router so it takes the loop exit once counter reaches limit.\"\"\"
+    @functools.wraps(router)
+    def guarded(state, *args, **kwargs):
+        if state.get(counter, 0) >= limit:
+            print(f'LOOP GUARD: {counter} reached {limit}, routing to {exit_to}')
+            return exit_to
+        return router(state, *args, **kwargs)
+    return guarded
+"""
+
+FUSE_HELPERS = """import typing
+
+
+def _reducers(state_class):
+    \"\"\"{field: (reducer, empty value)} for the Annotated fields of a state class.\"\"\"
+    reducers = {}
+    for name, hint in typing.get_type_hints(state_class, include_extras=True).items():
+        if typing.get_origin(hint) is not typing.Annotated or not callable(hint.__metadata__[-1]):
+            continue
+        base = typing.get_args(hint)[0]
+        try:
+            empty = (typing.get_origin(base) or base)()
+        except Exception:
+            empty = None
+        reducers[name] = (hint.__metadata__[-1], empty)
+    return reducers
+
+
+def fuse_nodes(state_class, *nodes):
+    \"\"\"Run nodes in order as a single node.
+
+    Each node sees the state as updated by the nodes before it.  Updates to
+    reducer fields are folded together with the reducer, so the graph's one
+    application of the merged update matches applying them one by one.
+    \"\"\"
+    reducers = _reducers(state_class)
+
+    def fused(state, config=None):
+        view = dict(state)
+        merged = {}
+        for node in nodes:
+            for key, value in (node(view, config=config) or {}).items():
+                if key not in reducers:
+                    view[key] = merged[key] = value
+                    continue
+                reducer, empty = reducers[key]
+                view[key] = reducer(view[key], value) if key in view else value
+                if key in merged:
+                    merged[key] = reducer(merged[key], value)
+                else:
+                    merged[key] = value if empty is None else reducer(empty, value)
+        return merged
+    fused.__name__ = '__'.join(node.__name__ for node in nodes)
+    return fused
+"""
+
+CHECKPOINT_BUDGET_HELPERS = """class BudgetedSaver(MemorySaver):
+    \"\"\"MemorySaver that reports checkpoints whose state is larger than budget bytes.\"\"\"
+
+    def __init__(self, budget):
+        super().__init__()
+        self.budget = budget
+
+    def put(self, config, checkpoint, metadata, new_versions):
+        size = sum(len(self.serde.dumps_typed(value)[1]) for value in checkpoint["channel_values"].values())
+        if size > self.budget:
+            print(f'CHECKPOINT BUDGET: step {metadata.get("step")} is {size} bytes (budget {self.budget})')
+        return super().put(config, checkpoint, metadata, new_versions)
+"""
+
+
+@profile_stage
+def gen_graph(graph_name, graph_spec, compile_args=None, parsed=None, loop_guards=None, loop_limit=None,
+              node_schemas=None, graph_schemas=None, dispatch=False, replay=False):
+    """Generate the graph builder code.
+
+    ``loop_guards`` maps router nodes to the exit destination forced after
+    ``loop_limit`` runs of that node (see analysis.loop_guard_points); the
+    counts live in ``loop_counter_field(node)`` state fields.  Nodes in
+    ``parsed.fused_nodes`` run their members in order through ``fuse_nodes``.
+    ``node_schemas`` maps nodes to the input TypedDict they are registered
+    with, and ``graph_schemas`` is the graph's ``(input, output)`` TypedDict
+    names (either may be None).  With ``parsed.checkpoint_budget`` the
+    checkpointer reports checkpoints over that many bytes.  ``dispatch``
+    emits routers as condition tables (see mk_dispatch_router).  ``replay``
+    routes every node and router through the generated replay module.
+    """
+    if not graph_spec and parsed is None: return ""
+    loop_guards = loop_guards if loop_limit else {}
+    fused_nodes = parsed.fused_nodes if parsed else {}
+    checkpoint_budget = parsed.checkpoint_budget if parsed else None
     if parsed:
         graph = parsed.graph_dict
         start_node = parsed.start_node
         assignment_funcs = parsed.assignment_functions
         switch_funcs = parsed.switch_functions
+        routing_functions = parsed.routing_functions
     else:
         graph, start_node = parse_graph_spec(graph_spec)
         transformed_spec = transform_graph_spec(graph_spec)
         assignment_funcs = find_assignment_functions(transformed_spec)
         switch_funcs = find_switch_functions(transformed_spec)
+        routing_functions = None
+    if routing_functions is None and graph_spec:
+        routing_functions = find_routing_functions(graph_spec)
 
-    nodes_added = []
+    nodes_added = set()
 
     # Generate the graph state, node definitions, and entry point
     initial_comment = f"# Graph Builder: {graph_name}\n"
@@ -961,24 +1568,50 @@ import sqlite3"""
     if state_type == "MessageGraph":
         imports += """
 from langgraph.graph import MessageGraph"""
-
-    graph_setup += f"checkpoint_saver = MemorySaver()\n"
+    if replay:
+        imports += "\nimport replay"
+    if loop_guards:
+        imports += "\n\n" + LOOP_GUARD_HELPERS
+    if fused_nodes:
+        imports += "\n\n" + FUSE_HELPERS
+    if checkpoint_budget:
+        imports += "\n\n" + CHECKPOINT_BUDGET_HELPERS
+        graph_setup += f"checkpoint_saver = BudgetedSaver({checkpoint_budget})\n"
+    else:
+        graph_setup += f"checkpoint_saver = MemorySaver()\n"
     builder_graph = f"builder_{graph_name}"
-    graph_setup += f"{builder_graph} = StateGraph({state_type})\n"
+    schema_args = ""
+    if graph_schemas:
+        input_schema, output_schema = graph_schemas
+        schema_args += f", input_schema={input_schema}" if input_schema else ""
+        schema_args += f", output_schema={output_schema}" if output_schema else ""
+    graph_setup += f"{builder_graph} = StateGraph({state_type}{schema_args})\n"
     if state_type == "MessageGraph":
         graph_setup = f"{builder_graph} = MessageGraph()\n"
 
+    def node_function(name):
+        function = name
+        if name in fused_nodes:
+            function = f"fuse_nodes({state_type}, {', '.join(fused_nodes[name])})"
+        if name in loop_guards:
+            function = f"count_iterations({function}, '{loop_counter_field(name)}')"
+        if replay:
+            function = f"replay.node('{name}', {function})"
+        if node_schemas and name in node_schemas:
+            function += f", input_schema={node_schemas[name]}"
+        return function
+
     for node_name in graph:
         if node_name != "START":
             if "," in node_name:
                 node_names = [n.strip() for n in node_name.split(",")]
                 for nn in node_names:
                     if nn not in nodes_added:
-                        nodes_added.append(nn)
-                        graph_setup += f"{builder_graph}.add_node('{nn}', {nn})\n"
+                        nodes_added.add(nn)
+                        graph_setup += f"{builder_graph}.add_node('{nn}', {node_function(nn)})\n"
             elif node_name not in nodes_added:
-                nodes_added.append(node_name)
-                graph_setup += f"{builder_graph}.add_node('{node_name}', {node_name})\n"
+                nodes_added.add(node_name)
+                graph_setup += f"{builder_graph}.add_node('{node_name}', {node_function(node_name)})\n"
     if start_node != "START":
         graph_setup += f"\n{builder_graph}.set_entry_point('{start_node}')\n\n"
 
@@ -986,43 +1619,54 @@ from langgraph.graph import MessageGraph"""
     # For these nodes we emit add_conditional_edges with a list target
     # instead of the normal routing-function + dict approach.
     # Map: source_node_name -> list of (assign_fn, worker_fn)
-    worker_assignment_map = {}
+    assign_to_worker = {}
     for assign_fn, field_name, worker_fn in assignment_funcs:
-        # Walk graph edges to find which node uses this assign_fn as a condition
-        for n, nd in graph.items():
-            for edge in nd["edges"]:
-                if edge["condition"] == assign_fn:
-                    worker_assignment_map.setdefault(n, []).append((assign_fn, worker_fn))
+        assign_to_worker.setdefault(assign_fn, []).append(worker_fn)
+    worker_assignment_map = {}
+    for n, nd in graph.items():
+        for edge in nd["edges"]:
+            for worker_fn in assign_to_worker.get(edge["condition"], ()):
+                worker_assignment_map.setdefault(n, []).append((edge["condition"], worker_fn))
 
     # Build map of nodes that use switch functions (single routing function).
     # For these nodes we skip mk_conditions (no routing wrapper needed).
-    switch_node_map = {}
+    # Switch edges are named {fn_name}_{param}, so look the names up directly.
+    switch_conditions = {}
     for sf_name, sf_params in switch_funcs:
-        for n, nd in graph.items():
-            for edge in nd["edges"]:
-                if edge["condition"].startswith(sf_name + "_"):
-                    switch_node_map[n] = sf_name
-                    break
+        for param in sf_params:
+            switch_conditions.setdefault(f"{sf_name}_{param}", sf_name)
+    switch_node_map = {}
+    for n, nd in graph.items():
+        for edge in nd["edges"]:
+            if edge["condition"] in switch_conditions:
+                switch_node_map.setdefault(n, switch_conditions[edge["condition"]])
+                break
 
     # Generate the code for edges and conditional edges
     node_code = []
     for node_name, node_dict in graph.items():
+        guard = None
+        if node_name in loop_guards:
+            guard = (loop_counter_field(node_name), loop_limit, loop_guards[node_name])
         if node_name in worker_assignment_map:
             # Worker/assignment pattern — emit list-based conditional edges
             for assign_fn, worker_fn in worker_assignment_map[node_name]:
                 node_code.append(
-                    f"{builder_graph}.add_conditional_edges('{node_name}', {assign_fn}, ['{worker_fn}'])"
+                    f"{builder_graph}.add_conditional_edges('{node_name}', "
+                    f"{replay_router(node_name + ':' + assign_fn, assign_fn) if replay else assign_fn}, ['{worker_fn}'])"
                 )
         elif node_name in switch_node_map:
             # Switch function IS the routing function — skip mk_conditions
-            conditional_edges = mk_conditional_edges(builder_graph, node_name, node_dict, graph_spec)
+            conditional_edges = mk_conditional_edges(builder_graph, node_name, node_dict, graph_spec, routing_functions, guard,
+                                                     replay)
             if conditional_edges:
                 node_code.append(conditional_edges)
         else:
-            conditions = mk_conditions(node_name, node_dict, graph_spec)
+            conditions = mk_conditions(node_name, node_dict, graph_spec, routing_functions, dispatch)
             if conditions:
                 node_code.append(conditions)
-            conditional_edges = mk_conditional_edges(builder_graph, node_name, node_dict, graph_spec)
+            conditional_edges = mk_conditional_edges(builder_graph, node_name, node_dict, graph_spec, routing_functions, guard,
+                                                     replay)
             if conditional_edges:
                 node_code.append(conditional_edges)
 
@@ -1057,25 +1701,26 @@ def validate_graph(graph_spec: str) -> Dict[str, Any]:
     
     # Normalize indentation first
     graph_spec = dedent(graph_spec)
-    
-    # Validate START node
-    lines = [line.strip() for line in graph_spec.split('\n') if line.strip()]
-    first_non_comment = next((line for line in lines if not line.startswith('#')), None)
-    
-    has_start = first_non_comment and (
-        first_non_comment.startswith('START(')
-        or first_non_comment.startswith('START:')
-        or first_non_comment.startswith('START ->')
-    )
-    if not has_start:
-        errors.append(ERROR_START_NODE_NOT_FOUND)
-        solutions.append(
-            "The graph must begin with a START node definition, for example:\n"
-            "START:State -> first_node"
-        )
-        details.append(f"Found: {first_non_comment or 'No non-comment lines'}\n"
-                      f"Expected: START:StateClass -> first_node")
-    
+
+    # Check the syntax line by line before building anything
+    for issue in validate_text(graph_spec).errors:
+        if issue.kind == 'missing_start':
+            if ERROR_START_NODE_NOT_FOUND in errors:
+                continue
+            lines = [line.strip() for line in graph_spec.split('\n') if line.strip()]
+            first_non_comment = next((line for line in lines if not line.startswith('#')), None)
+            errors.append(ERROR_START_NODE_NOT_FOUND)
+            solutions.append(
+                "The graph must begin with a START node definition, for example:\n"
+                "START:State -> first_node"
+            )
+            details.append(f"Found: {first_non_comment or 'No non-comment lines'}\n"
+                          f"Expected: START:StateClass -> first_node")
+        else:
+            errors.append(f"Line {issue.line}: {issue.message}")
+            solutions.append("Please check the graph specification syntax")
+            details.append(f"Error: {issue.kind} on line {issue.line}")
+
     try:
         if not errors:  # Only try to parse if no errors so far
             graph_spec = expand_chains(graph_spec)
@@ -1204,8 +1849,14 @@ def get_graph(graph_name: str) -> str:
     return gen_graph(graph_name.split('.')[0], graph_spec)
 
 
-def gen_main(basename, state_class):
-    """Generate a main.py entry point that runs the compiled graph."""
+@profile_stage
+def gen_main(basename, state_class, recursion_limit=None):
+    """Generate a main.py entry point that runs the compiled graph.
+
+    ``recursion_limit`` (see analysis.recommended_recursion_limit) is added to
+    the run config when given.
+    """
+    limit = f', "recursion_limit": {recursion_limit}' if recursion_limit else ""
     return f"""from {basename}_graph import {basename}
 from {basename}_state import initialize_state
 
@@ -1220,7 +1871,7 @@ def save_graph_image():
 
 def main():
     save_graph_image()
-    config = {{"configurable": {{"thread_id": "1"}}}}
+    config = {{"configurable": {{"thread_id": "1"}}{limit}}}
     initial_state = initialize_state()
     result = {basename}.invoke(initial_state, config=config)
     print(result)
@@ -1230,6 +1881,499 @@ if __name__ == "__main__":
 """
 
 
+COVERAGE_RUNNER_TEMPLATE = '''"""Exhaustive branch coverage for the BASENAME graph.
+
+The mock conditions in BASENAME_graph pick branches with random_one_or_zero()
+and random.choice().  This runner swaps both for a decision tape and runs
+every sequence of routing decisions up to --depth decisions, spread over a
+process pool, then reports node and branch coverage and per-path latency:
+
+    python coverage_runner.py --depth 8 --workers 4 --json coverage.json
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import statistics
+import sys
+import time
+import uuid
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import BASENAME_graph as graph_module
+from BASENAME_state import initialize_state
+
+RECURSION_LIMIT = RECURSION_LIMIT_VALUE
+NODES = NODES_VALUE
+# Outcomes each condition can return
+CONDITIONS = CONDITIONS_VALUE
+
+
+class DepthExceeded(Exception):
+    """The path needs more routing decisions than --depth allows."""
+
+
+class DecisionTape:
+    """Replays a prefix of choices, then always takes the first option.
+
+    Stands in for both random_one_or_zero() and the random module of the
+    graph module; every decision is recorded as
+    ``[condition, choice index, number of options, value]``.
+    """
+
+    def __init__(self, prefix, depth):
+        self.prefix = prefix
+        self.depth = depth
+        self.decisions = []
+
+    def decide(self, options):
+        i = len(self.decisions)
+        if i >= self.depth:
+            raise DepthExceeded()
+        choice = self.prefix[i] if i < len(self.prefix) else 0
+        condition = sys._getframe(2).f_code.co_name  # the condition that asked
+        self.decisions.append([condition, choice, len(options), options[choice]])
+        return options[choice]
+
+    def one_or_zero(self):
+        return self.decide([False, True])
+
+    def choice(self, seq):
+        return self.decide(list(seq))
+
+
+def run_path(prefix, depth):
+    """Run the graph once following ``prefix``; return what happened."""
+    tape = DecisionTape(prefix, depth)
+    graph_module.random_one_or_zero = tape.one_or_zero
+    graph_module.random = tape
+    config = {"configurable": {"thread_id": str(uuid.uuid4())}, "recursion_limit": RECURSION_LIMIT}
+    nodes, status, error = [], "complete", None
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        try:
+            for update in graph_module.BASENAME.stream(initialize_state(), config=config, stream_mode="updates"):
+                nodes.extend(update)
+        except DepthExceeded:
+            status = "truncated"
+        except Exception as e:
+            status = "recursion_limit" if type(e).__name__ == "GraphRecursionError" else "error"
+            error = f"{type(e).__name__}: {e}"
+    return {
+        "prefix": prefix, "decisions": tape.decisions, "nodes": nodes,
+        "status": status, "error": error, "latency": time.perf_counter() - start,
+    }
+
+
+def explore(depth, workers, max_paths=None):
+    """Run every decision sequence up to ``depth``; each path runs exactly once.
+
+    A finished path followed the first option at every decision past its
+    prefix, so each of those decisions yields one new prefix per other option.
+    """
+    results = []
+    submitted = 1
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = {pool.submit(run_path, [], depth)}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                result = future.result()
+                results.append(result)
+                taken = [choice for _condition, choice, _options, _value in result["decisions"]]
+                for i in range(len(result["prefix"]), len(taken)):
+                    for alternative in range(1, result["decisions"][i][2]):
+                        if max_paths and submitted >= max_paths:
+                            break
+                        pending.add(pool.submit(run_path, taken[:i] + [alternative], depth))
+                        submitted += 1
+    return results
+
+
+def coverage(results, depth):
+    visited = {node for result in results for node in result["nodes"]}
+    seen = {}
+    for result in results:
+        for condition, _choice, _options, value in result["decisions"]:
+            seen.setdefault(condition, set()).add(value)
+    outcomes = sum(len(values) for values in CONDITIONS.values())
+    covered = sum(len(seen.get(name, set()) & set(values)) for name, values in CONDITIONS.items())
+    latencies = [result["latency"] for result in results]
+    statuses = {}
+    for result in results:
+        statuses[result["status"]] = statuses.get(result["status"], 0) + 1
+    return {
+        "depth": depth,
+        "paths": len(results),
+        "statuses": statuses,
+        "nodes_covered": sorted(visited & set(NODES)),
+        "nodes_missed": sorted(set(NODES) - visited),
+        "outcomes_covered": covered,
+        "outcomes_total": outcomes,
+        "outcomes_missed": {name: [v for v in values if v not in seen.get(name, set())]
+                            for name, values in CONDITIONS.items()
+                            if set(values) - seen.get(name, set())},
+        "latency": {
+            "min": min(latencies), "median": statistics.median(latencies), "max": max(latencies),
+        },
+        "errors": [{"decisions": r["decisions"], "error": r["error"]} for r in results if r["status"] == "error"],
+        "slowest": [
+            {"latency": r["latency"], "decisions": r["decisions"], "status": r["status"]}
+            for r in sorted(results, key=lambda r: r["latency"], reverse=True)[:5]
+        ],
+    }
+
+
+def format_report(report):
+    def pct(part, whole):
+        return f"{100 * part / whole:.0f}%" if whole else "n/a"
+
+    statuses = ", ".join(f"{name} {count}" for name, count in sorted(report["statuses"].items()))
+    nodes = len(report["nodes_covered"]) + len(report["nodes_missed"])
+    latency = report["latency"]
+    lines = [
+        f"Paths: {report['paths']} ({statuses}) at depth {report['depth']}",
+        f"Nodes covered: {len(report['nodes_covered'])}/{nodes} ({pct(len(report['nodes_covered']), nodes)})",
+        f"Branch outcomes covered: {report['outcomes_covered']}/{report['outcomes_total']}"
+        f" ({pct(report['outcomes_covered'], report['outcomes_total'])})",
+        f"Latency per path: min {latency['min'] * 1000:.2f} ms, median {latency['median'] * 1000:.2f} ms,"
+        f" max {latency['max'] * 1000:.2f} ms",
+    ]
+    if report["nodes_missed"]:
+        lines.append(f"Nodes never reached: {', '.join(report['nodes_missed'])}")
+    for name, values in report["outcomes_missed"].items():
+        lines.append(f"Never taken: {name} -> {', '.join(map(str, values))}")
+    lines.append("Slowest paths:")
+    for path in report["slowest"]:
+        decisions = ", ".join(f"{condition}={value}" for condition, _c, _n, value in path["decisions"]) or "(no decisions)"
+        lines.append(f"  {path['latency'] * 1000:8.2f} ms  {path['status']:15s} {decisions}")
+    for error in report["errors"]:
+        lines.append(f"ERROR: {error['error']}")
+    return "\\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run every routing decision sequence of the BASENAME graph")
+    parser.add_argument("--depth", type=int, default=8, help="Maximum routing decisions per path (default 8)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="Worker processes")
+    parser.add_argument("--max-paths", type=int, help="Stop after this many paths")
+    parser.add_argument("--json", metavar="FILE", help="Also write the report as JSON")
+    args = parser.parse_args(argv)
+
+    report = coverage(explore(args.depth, args.workers, args.max_paths), args.depth)
+    print(format_report(report))
+    if args.json:
+        with open(args.json, "w") as fp:
+            json.dump(report, fp, indent=2)
+    return 1 if report["errors"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
+'''
+
+
+REPLAY_TEMPLATE = '''"""Record and replay runs of the BASENAME graph.
+
+The graph module wraps every node with replay.node() and every router with
+replay.router().  With no session active the wrappers just call through.
+While recording, each router decision and each node output is appended to a
+binary log, one record each.  While replaying, routers return the recorded
+decisions, so control flow is identical to the recorded run.  Nodes run
+live and are timed, except stubbed ones (e.g. nodes that call an LLM), which
+return their recorded output:
+
+    python replay.py record run.replay
+    python replay.py replay run.replay --stub research,write --output new.replay
+    python replay.py timings run.replay new.replay
+"""
+import argparse
+import functools
+import hashlib
+import inspect
+import pickle
+import struct
+import sys
+import threading
+import time
+
+MAGIC = b"LGREPLAY1\\n"
+DECISION, NODE = 1, 2
+# kind, name length, occurrence, duration in seconds, payload length
+HEADER = struct.Struct("<BHIdI")
+
+_session = None
+
+
+class ReplayDivergence(Exception):
+    """The replayed run asked for a record the log does not have."""
+
+
+def _digest(value):
+    try:
+        return hashlib.blake2b(pickle.dumps(value), digest_size=8).digest()
+    except Exception:
+        return None
+
+
+def write_record(fp, kind, name, occurrence, duration, digest, value):
+    name_bytes = name.encode()
+    payload = pickle.dumps((digest, value))
+    fp.write(HEADER.pack(kind, len(name_bytes), occurrence, duration, len(payload)))
+    fp.write(name_bytes)
+    fp.write(payload)
+
+
+def read_log(path):
+    """Yield ``(kind, name, occurrence, duration, digest, value)`` for each record."""
+    with open(path, "rb") as fp:
+        if fp.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path} is not a replay log")
+        while True:
+            header = fp.read(HEADER.size)
+            if not header:
+                return
+            kind, name_length, occurrence, duration, payload_length = HEADER.unpack(header)
+            name = fp.read(name_length).decode()
+            digest, value = pickle.loads(fp.read(payload_length))
+            yield kind, name, occurrence, duration, digest, value
+
+
+class Session:
+    """One recording or replay; writes a log when given an output path."""
+
+    def __init__(self, output=None, replay_from=None, stub=()):
+        self.lock = threading.Lock()
+        self.counts = {}
+        self.stub = set(stub)
+        self.timings = []  # (node, seconds, stubbed)
+        self.recorded = {}
+        if replay_from:
+            for kind, name, occurrence, duration, digest, value in read_log(replay_from):
+                self.recorded.setdefault((kind, name), []).append([digest, value, False])
+        self.fp = open(output, "wb") if output else None
+        if self.fp:
+            self.fp.write(MAGIC)
+
+    @property
+    def replaying(self):
+        return bool(self.recorded)
+
+    def _next(self, kind, name):
+        key = (kind, name)
+        occurrence = self.counts.get(key, 0)
+        self.counts[key] = occurrence + 1
+        return occurrence
+
+    def _take(self, kind, name, digest):
+        """The recorded value for this call: same input if possible, else the next unused one."""
+        records = [r for r in self.recorded.get((kind, name), []) if not r[2]]
+        if not records:
+            raise ReplayDivergence(f"no recorded {'decision' if kind == DECISION else 'output'} left for {name}")
+        record = next((r for r in records if digest is not None and r[0] == digest), records[0])
+        record[2] = True
+        return record[1]
+
+    def _write(self, kind, name, occurrence, duration, digest, value):
+        if self.fp:
+            write_record(self.fp, kind, name, occurrence, duration, digest, value)
+
+    def decision(self, name, router, state):
+        digest = _digest(state)
+        with self.lock:
+            occurrence = self._next(DECISION, name)
+            if self.replaying:
+                value = self._take(DECISION, name, digest)
+        if not self.replaying:
+            value = router(state)
+        with self.lock:
+            self._write(DECISION, name, occurrence, 0.0, digest, value)
+        return value
+
+    def node(self, name, call, state):
+        digest = _digest(state)
+        stubbed = self.replaying and (name in self.stub or "*" in self.stub)
+        with self.lock:
+            occurrence = self._next(NODE, name)
+            recorded = self._take(NODE, name, digest) if self.replaying else None
+        start = time.perf_counter()
+        value = recorded if stubbed else call()
+        duration = time.perf_counter() - start
+        with self.lock:
+            self.timings.append((name, duration, stubbed))
+            self._write(NODE, name, occurrence, duration, digest, value)
+        return value
+
+    def close(self):
+        if self.fp:
+            self.fp.close()
+            self.fp = None
+
+
+def start(output=None, replay_from=None, stub=()):
+    """Begin recording to ``output`` and/or replaying ``replay_from``; returns the session."""
+    global _session
+    _session = Session(output, replay_from, stub)
+    return _session
+
+
+def stop():
+    global _session
+    session, _session = _session, None
+    if session:
+        session.close()
+    return session
+
+
+def node(name, fn):
+    """Wrap a node function so its output is recorded or replayed."""
+    takes_config = "config" in inspect.signature(fn).parameters
+
+    @functools.wraps(fn)
+    def wrapped(state, config=None):
+        def call():
+            return fn(state, config=config) if takes_config else fn(state)
+        if _session is None:
+            return call()
+        return _session.node(name, call, state)
+    if not takes_config:
+        del wrapped.__wrapped__  # let LangGraph see the (state, config) signature
+    return wrapped
+
+
+def router(name, fn):
+    """Wrap a routing function so its decisions are recorded or replayed."""
+    @functools.wraps(fn)
+    def wrapped(state):
+        if _session is None:
+            return fn(state)
+        return _session.decision(name, fn, state)
+    return wrapped
+
+
+def timings(path):
+    """``{node: [seconds, ...]}`` from the node records of a log."""
+    result = {}
+    for kind, name, _occurrence, duration, _digest, _value in read_log(path):
+        if kind == NODE:
+            result.setdefault(name, []).append(duration)
+    return result
+
+
+def format_timings(before, after=None):
+    lines = [f"{'node':30s} {'runs':>5s} {'mean ms':>10s}" + (f" {'new mean ms':>12s} {'ratio':>7s}" if after is not None else "")]
+    for name in sorted(set(before) | set(after or {})):
+        old = before.get(name, [])
+        line = f"{name:30s} {len(old):5d} {1000 * sum(old) / len(old) if old else 0:10.3f}"
+        if after is not None:
+            new = after.get(name, [])
+            if not new:   # stubbed or not run this time
+                line += f" {'-':>12s} {'-':>7s}"
+            else:
+                old_mean = sum(old) / len(old) if old else 0
+                new_mean = sum(new) / len(new)
+                ratio = f"{new_mean / old_mean:7.2f}" if old_mean else "      -"
+                line += f" {1000 * new_mean:12.3f} {ratio}"
+        lines.append(line)
+    return "\\n".join(lines)
+
+
+def run_graph():
+    from BASENAME_graph import BASENAME
+    from BASENAME_state import initialize_state
+    config = {"configurable": {"thread_id": "replay"}, "recursion_limit": RECURSION_LIMIT_VALUE}
+    return BASENAME.invoke(initialize_state(), config=config)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Record or replay runs of the BASENAME graph")
+    commands = parser.add_subparsers(dest="command", required=True)
+    record = commands.add_parser("record", help="Run the graph and record every decision and node output")
+    record.add_argument("log")
+    replay = commands.add_parser("replay", help="Rerun a recorded run with the recorded decisions")
+    replay.add_argument("log")
+    replay.add_argument("--stub", default="", help="Comma-separated nodes that return recorded output ('*' for all)")
+    replay.add_argument("--output", help="Write the replayed run (with new timings) to this log")
+    show = commands.add_parser("timings", help="Per-node timing of a log, or of two logs side by side")
+    show.add_argument("log")
+    show.add_argument("other", nargs="?")
+    args = parser.parse_args(argv)
+
+    if args.command == "timings":
+        print(format_timings(timings(args.log), timings(args.other) if args.other else None))
+        return 0
+    if args.command == "record":
+        start(output=args.log)
+    else:
+        start(output=args.output, replay_from=args.log, stub=[n for n in args.stub.split(",") if n])
+    try:
+        run_graph()
+    finally:
+        session = stop()
+    measured = {}
+    for name, duration, stubbed in session.timings:
+        if not stubbed:
+            measured.setdefault(name, []).append(duration)
+    if args.command == "replay":
+        print(format_timings(timings(args.log), measured))
+    else:
+        print(format_timings(measured))
+    return 0
+
+
+if __name__ == "__main__":
+    # Run through the importable module so the graph's wrappers see the session
+    import replay as replay_module
+    sys.exit(replay_module.main())
+'''
+
+
+def replay_router(name, function):
+    """Router expression wrapped for the replay module."""
+    return f"replay.router('{name}', {function})"
+
+
+@profile_stage
+def gen_replay(basename, recursion_limit):
+    """Generate replay.py, the record/replay runtime for ``gen_graph(..., replay=True)``."""
+    return (REPLAY_TEMPLATE
+            .replace("RECURSION_LIMIT_VALUE", str(recursion_limit))
+            .replace("BASENAME", basename))
+
+
+def condition_outcomes(parsed):
+    """``{condition: [outcomes]}`` for the mock conditions of a graph.
+
+    Boolean conditions return False or True; switch functions return one of
+    their destinations.  Assignment (Send) functions are not decisions.
+    """
+    assignment_funcs = {af[0] for af in parsed.assignment_functions}
+    switch_conditions = {f"{name}_{param}" for name, params in parsed.switch_functions for param in params}
+    outcomes = {}
+    for node_dict in parsed.graph_dict.values():
+        for condition in find_conditions(node_dict):
+            if condition not in assignment_funcs and condition not in switch_conditions:
+                outcomes.setdefault(condition, [False, True])
+    for name, params in parsed.switch_functions:
+        outcomes.setdefault(name, list(params))
+    return outcomes
+
+
+@profile_stage
+def gen_coverage_runner(basename, node_names, outcomes, recursion_limit):
+    """Generate coverage_runner.py, which runs every branch of the graph (see COVERAGE_RUNNER_TEMPLATE).
+
+    ``outcomes`` is condition_outcomes() of the graph.
+    """
+    return (COVERAGE_RUNNER_TEMPLATE
+            .replace("RECURSION_LIMIT_VALUE", str(recursion_limit))
+            .replace("NODES_VALUE", repr(list(node_names)))
+            .replace("CONDITIONS_VALUE", repr(outcomes))
+            .replace("BASENAME", basename))
+
+
+@profile_stage
 def gen_readme(basename, concise_spec, expanded_spec, folder_name=None):
     """Generate a README.md with graph image, specs, and run instructions."""
     folder = folder_name or basename
@@ -4,17 +4,15 @@ import sys
 import subprocess
 import shutil
 import argparse
+import json
+from dataclasses import asdict
 from pathlib import Path
-from langgraph_codegen.gen_graph import (
-    gen_graph, gen_nodes, gen_state,
-    gen_conditions, gen_worker_functions, gen_assignment_functions,
-    find_worker_functions, gen_main, gen_readme,
-    parse_spec, parse_graph_spec, parse_state_section, preprocess_start_syntax,
-    expand_chains, list_examples, get_example_path
-)
+from langgraph_codegen.gen_graph import list_examples, get_example_path
+from langgraph_codegen.project import GeneratedProject, SECTIONS
+from langgraph_codegen.profiling import StageProfiler, stage
 
 
-def main():
+def main(argv=None):
     # Build dynamic epilog showing available examples
     examples = list_examples()
     if examples:
@@ -43,8 +41,42 @@ def main():
     parser.add_argument('--show', action='store_true', help='Show the content of the graph spec and exit')
     parser.add_argument('--verify', action='store_true',
                         help='Verify generated files execute without import errors')
-    args = parser.parse_args()
+    parser.add_argument('--analyze', nargs='?', const='text', choices=['text', 'json'],
+                        help='Report graph issues, superstep schedule and critical path (from NODES hints) and exit')
+    parser.add_argument('--parallelize', action='store_true',
+                        help='Run independent nodes of linear chains in parallel (uses NODES reads=/writes=)')
+    parser.add_argument('--fuse-chains', action='store_true',
+                        help='Run each linear chain of nodes as a single node (one superstep per chain)')
+    parser.add_argument('--node-schemas', action='store_true',
+                        help='Give nodes input/output schemas from NODES reads=/writes=')
+    parser.add_argument('--dispatch-routers', action='store_true',
+                        help='Generate routers as condition tables instead of if/elif chains')
+    parser.add_argument('--coverage-runner', action='store_true',
+                        help='Also generate coverage_runner.py, which runs every branch of the graph')
+    parser.add_argument('--replay', action='store_true',
+                        help='Also generate replay.py, which records graph runs and replays them offline')
+    parser.add_argument('--warn-loops', action='store_true',
+                        help='Also warn about loops that exit only through a condition')
+    parser.add_argument('--loop-guard', type=int, metavar='N',
+                        help='Force the exit branch of each conditional loop after N passes')
+    parser.add_argument('--profile', action='store_true',
+                        help='Report wall time and peak allocation per generator stage (on stderr)')
+    parser.add_argument('--profile-stats', metavar='FILE',
+                        help='Also write cProfile stats to FILE (read with pstats); implies --profile')
+    args = parser.parse_args(argv)
+
+    if args.profile or args.profile_stats:
+        with StageProfiler(pstats_path=args.profile_stats) as profiler:
+            generate(args)
+        print(profiler.report(), file=sys.stderr)
+        if args.profile_stats:
+            print(f"Wrote {args.profile_stats}", file=sys.stderr)
+    else:
+        generate(args)
+
 
+def generate(args):
+    """Resolve the input spec and generate the requested sections."""
     # Resolve input file
     input_path = Path(args.input_file)
     from_example = False
@@ -61,89 +93,58 @@ def main():
         input_path = Path(resolved)
         from_example = 'data/examples' in resolved
 
-    graph_spec = input_path.read_text()
-
     if args.show:
-        print(graph_spec, end='')
+        with open(input_path) as fp:
+            shutil.copyfileobj(fp, sys.stdout)
         sys.exit(0)
 
     basename = input_path.stem
-    is_expanded = input_path.suffix == '.lgraphx'
-
-    # 1. Extract STATE section first (before preprocessing)
-    state_class_name, state_fields, graph_spec = parse_state_section(graph_spec)
-    concise_spec = graph_spec  # save pre-expansion form
-
-    if not is_expanded:
-        # 2. Expand chained arrows (a -> b -> c) into individual edges
-        graph_spec = expand_chains(graph_spec)
-
-    expanded_spec = graph_spec  # for .lgraphx — uses -> and START:Class only
-
-    # 3. Preprocess START syntax (always runs, even for .lgraphx input)
-    graph_spec = preprocess_start_syntax(graph_spec, basename)
-
-    # 4. If STATE gave us a class name, ensure START uses it
-    if state_class_name:
-        import re
-        # Replace START(Whatever) with STATE class name, or bare START
-        graph_spec = re.sub(
-            r'START\([^)]*\)',
-            f'START({state_class_name})',
-            graph_spec
-        )
 
     # Determine what to generate (default = all)
     generate_all = not (args.state or args.nodes or args.graph)
+    sections = None if generate_all else [name for name in SECTIONS if getattr(args, name)]
+    output_dir = Path(args.output_dir) if args.output_dir else Path(basename)
+
+    # STATE section -> expand chains -> START syntax -> normalize -> parse,
+    # streamed line by line from the file.  Only the text forms written
+    # out (.lgraphx and README) are kept in memory.
+    try:
+        project = GeneratedProject.from_file(
+            input_path, folder_name=output_dir.name,
+            keep_text=() if args.stdout or args.analyze else ('concise_spec', 'expanded_spec'),
+            loop_guard=args.loop_guard,
+            parallelize=args.parallelize,
+            fuse_chains=args.fuse_chains,
+            node_schemas=args.node_schemas,
+            dispatch_routers=args.dispatch_routers,
+            coverage_runner=args.coverage_runner,
+            replay=args.replay,
+        )
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+    for transformation in project.transformations:
+        print(transformation, file=sys.stderr)
+
+    if args.analyze:
+        print_analysis(project, args.analyze)
+        return
+
+    # Flag unreachable nodes, dead ends and loops with no exit; conditional loops only with --warn-loops
+    with stage('analyze_graph'):
+        for issue in project.analysis.issues:
+            if issue.kind == 'unbounded_loop' and not args.warn_loops:
+                continue
+            print(f"{issue.severity.capitalize()}: {issue.message}", file=sys.stderr)
 
-    # Stages 2+3: Expanded -> Normalized -> Parsed (once)
-    parsed = parse_spec(graph_spec)
-
-    # Extract metadata for cross-file imports
-    state_class = parsed.state_class
-    node_names = []
-    for node_key in parsed.graph_dict:
-        if node_key == "START":
-            continue
-        if "," in node_key:
-            node_names.extend(n.strip() for n in node_key.split(","))
-        else:
-            node_names.append(node_key)
-    node_names = list(dict.fromkeys(node_names))  # dedupe, preserve order
-
-    # Exclude worker functions (they're defined in the graph file, not nodes)
-    worker_func_names = {f[0] for f in parsed.worker_functions}
-    import_node_names = [n for n in node_names if n not in worker_func_names]
-
-    # Generate requested sections
-    sections = {}
-    if args.state or generate_all:
-        sections['state'] = gen_state(graph_spec, state_fields=state_fields if state_fields else None,
-                                      state_class_name=state_class_name, parsed=parsed)
-    if args.nodes or generate_all:
-        sections['nodes'] = gen_nodes(parsed.graph_dict, worker_func_names=worker_func_names)
-    if args.graph or generate_all:
-        parts = []
-        conditions = gen_conditions(graph_spec, parsed=parsed)
-        if conditions and conditions.strip() != '# Conditional Edge Functions: None':
-            parts.append("import random\n\ndef random_one_or_zero():\n    return random.choice([False, True])")
-            parts.append(conditions)
-        workers = gen_worker_functions(graph_spec, parsed=parsed)
-        if workers and not workers.startswith("# This graph has no"):
-            parts.append(workers)
-        assignments = gen_assignment_functions(graph_spec, parsed=parsed)
-        if assignments and not assignments.startswith("# This graph has no"):
-            parts.append(assignments)
-        parts.append(gen_graph(basename, graph_spec, parsed=parsed))
-        sections['graph'] = '\n\n'.join(parts)
-
-    # Output
+    # Output — sections are rendered only when read
     if args.stdout:
-        for section in sections.values():
-            print(section)
+        for name in sections or SECTIONS:
+            print(project.section(name))
             print()
-    else:
-        output_dir = Path(args.output_dir) if args.output_dir else Path(basename)
+        return
+
+    with stage('write_files'):
         output_dir.mkdir(parents=True, exist_ok=True)
 
         # Copy DSL source into output dir on first use from package examples
@@ -152,47 +153,31 @@ def main():
             shutil.copy2(input_path, dest)
             print(f"Copied {input_path.name} to {dest}")
 
-        # Write expanded intermediate format
-        lgraphx_path = output_dir / f"{basename}.lgraphx"
-        lgraphx_path.write_text(expanded_spec + '\n')
-        print(f"Wrote {lgraphx_path}")
-
-        for name, code in sections.items():
-            filepath = output_dir / f"{basename}_{name}.py"
-
-            # Prepend cross-file imports when writing to files
-            if name == 'nodes':
-                imports_header = (
-                    f"from typing import Optional\n"
-                    f"from langchain_core.runnables.config import RunnableConfig\n"
-                    f"from {basename}_state import {state_class}\n\n"
-                )
-                code = imports_header + code
-            elif name == 'graph':
-                if len(import_node_names) > 5:
-                    node_imports = "(\n    " + ",\n    ".join(import_node_names) + ",\n)"
-                else:
-                    node_imports = ", ".join(import_node_names)
-                imports_header = (
-                    f"from {basename}_state import {state_class}\n"
-                    f"from {basename}_nodes import {node_imports}\n\n"
-                )
-                code = imports_header + code
-
-            filepath.write_text(code + '\n')
-            print(f"Wrote {filepath}")
-
-        if generate_all:
-            main_path = output_dir / "main.py"
-            main_path.write_text(gen_main(basename, state_class) + '\n')
-            print(f"Wrote {main_path}")
-
-            readme_path = output_dir / "README.md"
-            readme_path.write_text(gen_readme(basename, concise_spec, expanded_spec, output_dir.name) + '\n')
-            print(f"Wrote {readme_path}")
-
-        if args.verify:
-            verify_generated_files(output_dir, basename)
+        for path, written in project.write(output_dir, sections):
+            print(f"{'Wrote' if written else 'Unchanged'} {path}")
+
+    if args.verify:
+        verify_generated_files(output_dir, basename)
+
+
+def print_analysis(project, output_format='text'):
+    """Print graph issues and the estimated schedule for ``--analyze``."""
+    report, schedule = project.analysis, project.schedule
+    if output_format == 'json':
+        print(json.dumps({
+            'graph': project.basename,
+            'issues': [asdict(issue) for issue in report.issues],
+            'loops': [asdict(loop) for loop in report.loops],
+            'recursion_limit': project.recursion_limit,
+            'transformations': [asdict(t) for t in project.transformations],
+            'schedule': schedule.to_dict(),
+        }, indent=2))
+        return
+    print(f"Graph: {project.basename}")
+    print(f"Nodes: {len(report.nodes)}  Loops: {len(report.loops)}  Recommended recursion_limit: {project.recursion_limit}")
+    print(report.format() or "No issues found")
+    print()
+    print(schedule.format())
 
 
 def verify_generated_files(output_dir, basename):
@@ -0,0 +1,184 @@
+"""Stage-level profiling for the code generator.
+
+Pipeline functions are wrapped with :func:`profile_stage`, and callers can
+mark their own stages with :func:`stage`.  Streaming stages, chained
+generators that each pull lines from the one before, are wrapped with
+:func:`profile_iter`; each reports only its own share of the time.  All
+three are no-ops unless a :class:`StageProfiler` is active, so normal
+generation pays only a global lookup per call.
+
+    with StageProfiler() as profiler:
+        parsed = parse_spec(graph_spec)
+        code = gen_graph("my_graph", graph_spec, parsed=parsed)
+    print(profiler.report())
+"""
+import cProfile
+import functools
+import time
+import tracemalloc
+from contextlib import contextmanager
+from dataclasses import dataclass, asdict
+from typing import Dict, List, Optional
+
+# The profiler collecting stage timings, or None when profiling is off.
+_active_profiler = None
+
+
+@dataclass
+class StageTiming:
+    """Accumulated measurements for one named stage."""
+    name: str
+    calls: int = 0
+    wall_time: float = 0.0     # seconds, summed over calls
+    peak_bytes: int = 0        # largest tracemalloc peak above the stage's starting allocation
+
+
+class StageProfiler:
+    """Collect wall time and peak allocation per generator stage.
+
+    Args:
+        trace_memory: Track peak allocations with tracemalloc (slower).
+        pstats_path: If given, also run cProfile and dump stats to this file.
+    """
+
+    def __init__(self, trace_memory: bool = True, pstats_path: Optional[str] = None):
+        self.trace_memory = trace_memory
+        self.pstats_path = pstats_path
+        self.stages: Dict[str, StageTiming] = {}
+        self._frames: List[list] = []   # [start_bytes, peak_bytes] per open stage
+        self._upstream: List[float] = []  # time spent in streaming stages, per open stage
+        self._previous = None
+        self._started_tracing = False
+        self._cprofile = None
+
+    def __enter__(self):
+        global _active_profiler
+        self._previous = _active_profiler
+        _active_profiler = self
+        if self.trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+        if self.pstats_path:
+            self._cprofile = cProfile.Profile()
+            self._cprofile.enable()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        global _active_profiler
+        if self._cprofile is not None:
+            self._cprofile.disable()
+            self._cprofile.dump_stats(self.pstats_path)
+            self._cprofile = None
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+        _active_profiler = self._previous
+        return False
+
+    def _timing(self, name):
+        timing = self.stages.get(name)
+        if timing is None:
+            timing = self.stages[name] = StageTiming(name)
+        return timing
+
+    @contextmanager
+    def stage(self, name: str, streaming: bool = False, calls: int = 1):
+        """Time the enclosed block and record it under ``name``.
+
+        ``streaming=True`` marks a block that pulls lines from streaming
+        stages (see :meth:`iter_stage`): their time is left out of this
+        stage's, and counted once, for the stage enclosing this one.
+        """
+        tracing = self.trace_memory and tracemalloc.is_tracing()
+        if tracing:
+            current, peak = tracemalloc.get_traced_memory()
+            # Fold the enclosing stage's peak so far before resetting the counter
+            if self._frames:
+                self._frames[-1][1] = max(self._frames[-1][1], peak)
+            tracemalloc.reset_peak()
+            self._frames.append([current, current])
+        self._upstream.append(0.0)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            upstream = self._upstream.pop()
+            if self._upstream:
+                self._upstream[-1] += elapsed if streaming else upstream
+            timing = self._timing(name)
+            timing.calls += calls
+            timing.wall_time += elapsed - upstream if streaming else elapsed
+            if tracing:
+                _current, peak = tracemalloc.get_traced_memory()
+                frame = self._frames.pop()
+                frame[1] = max(frame[1], peak)
+                timing.peak_bytes = max(timing.peak_bytes, frame[1] - frame[0])
+                if self._frames:
+                    self._frames[-1][1] = max(self._frames[-1][1], frame[1])
+
+    def iter_stage(self, name: str, iterable):
+        """Yield from ``iterable``, recording the time spent producing items as ``name``.
+
+        Time spent in streaming stages further up the chain is left out, so
+        chained generators each report their own share, as sequential stages
+        would.  Counts as one call however many items it yields.
+        """
+        self._timing(name).calls += 1   # now, so stages are listed in pipeline order
+        return self._iter_stage(name, iter(iterable))
+
+    def _iter_stage(self, name, iterator):
+        while True:
+            with self.stage(name, streaming=True, calls=0):
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    return
+            yield item
+
+    def to_dict(self):
+        """Return the timings as a list of plain dicts, in first-seen order."""
+        return [asdict(timing) for timing in self.stages.values()]
+
+    def report(self):
+        """Return a human-readable table of stage timings."""
+        width = max([len("stage")] + [len(name) for name in self.stages])
+        lines = [f"{'stage'.ljust(width)}  calls   wall ms    peak KiB"]
+        for timing in self.stages.values():
+            lines.append(
+                f"{timing.name.ljust(width)}  {timing.calls:5d}  {timing.wall_time * 1000:8.2f}  {timing.peak_bytes / 1024:10.1f}"
+            )
+        return "\n".join(lines)
+
+
+@contextmanager
+def stage(name: str, streaming: bool = False):
+    """Record the enclosed block as ``name`` on the active profiler, if any."""
+    profiler = _active_profiler
+    if profiler is None:
+        yield
+        return
+    with profiler.stage(name, streaming=streaming):
+        yield
+
+
+def profile_iter(name: str, iterable):
+    """Record the time spent producing ``iterable``'s items as stage ``name``, if profiling."""
+    profiler = _active_profiler
+    if profiler is None:
+        return iterable
+    return profiler.iter_stage(name, iterable)
+
+
+def profile_stage(func):
+    """Decorator recording each call of ``func`` as a stage named after it."""
+    name = func.__name__
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        profiler = _active_profiler
+        if profiler is None:
+            return func(*args, **kwargs)
+        with profiler.stage(name):
+            return func(*args, **kwargs)
+    return wrapper
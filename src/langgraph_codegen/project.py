@@ -0,0 +1,359 @@
+"""A generated project: every output file of lgcodegen, computed on demand.
+
+:class:`GeneratedProject` wraps one :class:`ParsedSpec` and renders each
+artifact the first time it is read, so asking for the state class does not
+pay for the graph builder::
+
+    project = GeneratedProject.from_file("plan_and_execute.lgraph")
+    print(project.state)
+    project.write("plan_and_execute")      # skips files that are unchanged
+"""
+import io
+from functools import cached_property
+from pathlib import Path
+from typing import Iterable, List, Optional, Tuple
+
+from langgraph_codegen.analysis import (
+    DEFAULT_LOOP_ITERATIONS, GraphReport, ScheduleReport, analyze_graph, loop_guard_points,
+    recommended_recursion_limit, schedule_graph,
+)
+from langgraph_codegen.gen_graph import (
+    ParsedSpec, gen_state, gen_nodes, gen_conditions, gen_worker_functions,
+    gen_assignment_functions, gen_graph, gen_main, gen_readme,
+    parse_spec_file, parse_spec_stream, loop_counter_field,
+    DEFAULT_STATE_FIELDS, gen_node_schemas, node_schema_names, type_to_default,
+    condition_outcomes, gen_coverage_runner, gen_replay,
+)
+from langgraph_codegen import transforms
+
+# Sections lgcodegen can be asked for, and the files written for each
+SECTIONS = ('state', 'nodes', 'graph')
+
+
+def _import_list(names):
+    """Names for a ``from module import ...`` line, parenthesized one per line when long."""
+    if len(names) > 5:
+        return "(\n    " + ",\n    ".join(names) + ",\n)"
+    return ", ".join(names)
+
+
+class GeneratedProject:
+    """Lazily rendered output files for one parsed spec.
+
+    Args:
+        parsed: The parsed spec.  ``concise_spec`` and ``expanded_spec`` must
+            be kept if ``readme`` or ``lgraphx`` are read.
+        basename: Graph name; prefixes the generated module names.
+        folder_name: Directory name shown in the README (default: basename).
+        loop_guard: If set, each conditional loop exits after this many
+            passes: a counter field is added to the state and the loop's
+            router forces its exit branch once the counter reaches the limit.
+        parallelize: Rewrite independent runs of linear chains into
+            fan-out/fan-in (see transforms.parallelize_chains).  The rewrites
+            applied are listed in ``transformations``.
+        fuse_chains: Replace each linear chain with one node that runs its
+            members in order (see transforms.fuse_chains).  Applied after
+            ``parallelize``.
+        node_schemas: Give each node that declares reads=/writes= in NODES
+            its own input and output TypedDict, and register it with its
+            input schema so it only receives the fields it reads.
+        dispatch_routers: Emit routers as precomputed ``(condition,
+            destination)`` tables instead of if/elif chains.
+        coverage_runner: Also write ``coverage_runner.py``, which runs every
+            routing decision sequence of the mock graph.
+        replay: Route every node and router through a generated
+            ``replay.py`` that records runs to a binary log and replays
+            them with the recorded routing decisions.
+    """
+
+    def __init__(self, parsed: ParsedSpec, basename: str, folder_name: Optional[str] = None,
+                 loop_guard: Optional[int] = None, parallelize: bool = False, fuse_chains: bool = False,
+                 node_schemas: bool = False, dispatch_routers: bool = False, coverage_runner: bool = False,
+                 replay: bool = False):
+        self.original = parsed
+        self.transformations = []
+        if parallelize:
+            parsed, applied = transforms.parallelize_chains(parsed)
+            self.transformations.extend(applied)
+        if fuse_chains:
+            parsed, applied = transforms.fuse_chains(parsed)
+            self.transformations.extend(applied)
+        self.parsed = parsed
+        self.basename = basename
+        self.folder_name = folder_name or basename
+        self.loop_guard = loop_guard
+        self.node_schemas = node_schemas
+        self.dispatch_routers = dispatch_routers
+        self.with_coverage_runner = coverage_runner
+        self.with_replay = replay
+
+    @classmethod
+    def from_file(cls, path, folder_name=None, keep_text=('concise_spec', 'expanded_spec'), **options):
+        """Stream-parse a spec file; the basename is the file's stem."""
+        return cls(parse_spec_file(path, keep_text=keep_text), Path(path).stem, folder_name, **options)
+
+    @classmethod
+    def from_spec(cls, graph_spec: str, basename: str, expanded=False, folder_name=None,
+                  keep_text=('concise_spec', 'expanded_spec'), **options):
+        """Parse spec text (as written in a ``.lgraph`` file)."""
+        parsed = parse_spec_stream(io.StringIO(graph_spec), basename, expanded=expanded, keep_text=keep_text)
+        return cls(parsed, basename, folder_name, **options)
+
+    # --- names shared across files ---
+
+    @property
+    def state_class(self):
+        return self.parsed.state_class
+
+    @cached_property
+    def node_names(self) -> List[str]:
+        """Node names in graph order, with comma-joined keys split, deduplicated."""
+        node_names = []
+        for node_key in self.parsed.graph_dict:
+            if node_key == "START":
+                continue
+            if "," in node_key:
+                node_names.extend(n.strip() for n in node_key.split(","))
+            else:
+                node_names.append(node_key)
+        return list(dict.fromkeys(node_names))
+
+    @cached_property
+    def worker_func_names(self) -> set:
+        return {f[0] for f in self.parsed.worker_functions}
+
+    @cached_property
+    def import_node_names(self) -> List[str]:
+        """Node functions the graph module imports (worker functions live in the graph file)."""
+        fused = self.parsed.fused_nodes
+        names = [m for n in self.node_names for m in fused.get(n, [n])]
+        return [n for n in names if n not in self.worker_func_names]
+
+    @cached_property
+    def analysis(self) -> GraphReport:
+        """Reachability, loop and termination findings for the graph."""
+        return analyze_graph(self.parsed.graph_dict, self.parsed.start_node)
+
+    @cached_property
+    def schedule(self) -> ScheduleReport:
+        """Superstep schedule and critical path from the spec's NODES hints."""
+        return schedule_graph(self.parsed.graph_dict, self.parsed.start_node, self.parsed.node_hints)
+
+    @cached_property
+    def loop_guards(self) -> dict:
+        """``{router_node: exit_destination}`` for guarded loops (empty without loop_guard)."""
+        if not self.loop_guard:
+            return {}
+        # Worker fan-out routers return Send lists; they cannot take a forced exit
+        assign_fns = {af[0] for af in self.parsed.assignment_functions}
+        send_nodes = {
+            node for node, node_dict in self.parsed.graph_dict.items()
+            if any(edge["condition"] in assign_fns for edge in node_dict["edges"])
+        }
+        return loop_guard_points(self.analysis, skip=send_nodes)
+
+    @cached_property
+    def recursion_limit(self) -> int:
+        """recursion_limit for the run config, sized for loop_guard (or default) passes per loop."""
+        return recommended_recursion_limit(self.parsed.graph_dict, self.parsed.start_node,
+                                           self.loop_guard or DEFAULT_LOOP_ITERATIONS)
+
+    @cached_property
+    def state_fields(self) -> List[Tuple[str, str]]:
+        """(name, type) of every state field, generator-owned fields included."""
+        fields = list(self.parsed.state_fields or DEFAULT_STATE_FIELDS)
+        fields.extend((loop_counter_field(node), 'int') for node in self.loop_guards)
+        return fields
+
+    @cached_property
+    def node_access(self) -> dict:
+        """``{node: NodeAccess}`` for nodes with their own schemas (empty without node_schemas).
+
+        Covers the original node functions and any fused nodes.  Loop-guarded
+        nodes also read and write their iteration counter.
+        """
+        if not self.node_schemas:
+            return {}
+        access = {**transforms.node_access(self.original), **transforms.node_access(self.parsed)}
+        for node in self.loop_guards:
+            if node in access:
+                counter = frozenset({loop_counter_field(node)})
+                access[node] = transforms.NodeAccess(access[node].reads | counter, access[node].writes | counter)
+        return {node: a for node, a in access.items() if node not in self.worker_func_names}
+
+    @cached_property
+    def graph_schemas(self) -> Tuple[Optional[tuple], Optional[tuple]]:
+        """``((name, fields), (name, fields))`` for the graph's input and output schemas.
+
+        Only known when every node declares reads/writes (and there are no
+        worker functions): the input is what nodes read but none write, the
+        output is what nodes write but none read.  Fields that only pass
+        between nodes are in neither.  Either entry is None when unknown or empty.
+        """
+        access = self.node_access
+        nodes = {n.strip() for key in self.original.graph_dict for n in key.split(",")} - {"START"}
+        if not access or self.worker_func_names or not nodes <= set(access):
+            return None, None
+        reads = set().union(*(access[n].reads for n in nodes))
+        writes = set().union(*(access[n].writes for n in nodes))
+        inputs, outputs = reads - writes, writes - reads
+        return ((f"{self.state_class}Input", inputs) if inputs else None,
+                (f"{self.state_class}Output", outputs) if outputs else None)
+
+    def schema_names(self, nodes) -> List[str]:
+        """Schema class names the given nodes use, for imports."""
+        names = []
+        for node in nodes:
+            if node in self.node_access:
+                names.extend(node_schema_names(node))
+        return names
+
+    # --- artifacts ---
+
+    @cached_property
+    def state(self) -> str:
+        counters = [(loop_counter_field(node), 'int') for node in self.loop_guards]
+        state = gen_state(None, state_fields=self.parsed.state_fields or None,
+                          state_class_name=self.parsed.state_class_name, parsed=self.parsed,
+                          extra_fields=counters)
+        if self.node_access:
+            state += '\n' + gen_node_schemas(self.state_fields, self.node_access, self.graph_schemas,
+                                              self.parsed.field_policies)
+        return state
+
+    @cached_property
+    def nodes(self) -> str:
+        # Fused nodes are built from the original node functions
+        types = dict(self.state_fields)
+        schemas = {
+            node: (*node_schema_names(node), [(f, type_to_default(types[f])) for f in types if f in access.writes])
+            for node, access in self.node_access.items()
+        }
+        return gen_nodes(self.original.graph_dict, worker_func_names=self.worker_func_names, node_schemas=schemas)
+
+    @cached_property
+    def conditions(self) -> str:
+        return gen_conditions(None, parsed=self.parsed, dispatch=self.dispatch_routers)
+
+    @cached_property
+    def workers(self) -> str:
+        return gen_worker_functions(None, parsed=self.parsed)
+
+    @cached_property
+    def assignments(self) -> str:
+        return gen_assignment_functions(None, parsed=self.parsed)
+
+    @cached_property
+    def graph(self) -> str:
+        """The graph builder alone (see ``graph_module`` for the full graph file body)."""
+        graph_schemas = tuple(schema[0] if schema else None for schema in self.graph_schemas)
+        return gen_graph(self.basename, None, parsed=self.parsed,
+                         loop_guards=self.loop_guards, loop_limit=self.loop_guard,
+                         node_schemas={node: node_schema_names(node)[0] for node in self.node_access},
+                         graph_schemas=graph_schemas if any(graph_schemas) else None,
+                         dispatch=self.dispatch_routers, replay=self.with_replay)
+
+    @cached_property
+    def graph_module(self) -> str:
+        """Conditions, worker and assignment functions, then the graph builder."""
+        parts = []
+        if self.conditions and self.conditions.strip() != '# Conditional Edge Functions: None':
+            parts.append("import random\n\ndef random_one_or_zero():\n    return random.choice([False, True])")
+            parts.append(self.conditions)
+        if self.workers and not self.workers.startswith("# This graph has no"):
+            parts.append(self.workers)
+        if self.assignments and not self.assignments.startswith("# This graph has no"):
+            parts.append(self.assignments)
+        parts.append(self.graph)
+        return '\n\n'.join(parts)
+
+    @cached_property
+    def main(self) -> str:
+        return gen_main(self.basename, self.state_class, recursion_limit=self.recursion_limit)
+
+    @cached_property
+    def coverage_runner(self) -> str:
+        return gen_coverage_runner(self.basename, self.node_names, condition_outcomes(self.parsed),
+                                   self.recursion_limit)
+
+    @cached_property
+    def replay(self) -> str:
+        return gen_replay(self.basename, self.recursion_limit)
+
+    @cached_property
+    def readme(self) -> str:
+        return gen_readme(self.basename, self._kept('concise_spec'), self._kept('expanded_spec'), self.folder_name)
+
+    @cached_property
+    def lgraphx(self) -> str:
+        return self._kept('expanded_spec')
+
+    def _kept(self, name):
+        text = getattr(self.parsed, name)
+        if text is None:
+            raise ValueError(f"{name} was not kept when parsing; pass keep_text including '{name}'")
+        return text
+
+    def section(self, name: str) -> str:
+        """Section as printed by ``lgcodegen --stdout`` ('state', 'nodes' or 'graph')."""
+        return self.graph_module if name == 'graph' else getattr(self, name)
+
+    # --- files ---
+
+    def files(self, sections: Optional[Iterable[str]] = None) -> List[Tuple[str, str]]:
+        """Return ``[(filename, content), ...]`` as lgcodegen writes them.
+
+        With ``sections=None`` every section plus ``main.py`` and ``README.md``
+        is included; the ``.lgraphx`` file is always included.
+        """
+        generate_all = sections is None
+        sections = SECTIONS if generate_all else [s for s in SECTIONS if s in sections]
+        files = [(f"{self.basename}.lgraphx", self.lgraphx + '\n')]
+        for name in sections:
+            code = self.section(name)
+            # Prepend cross-file imports when writing to files
+            if name == 'nodes':
+                state_imports = _import_list([self.state_class] + self.schema_names(self.import_node_names))
+                code = (
+                    f"from typing import Optional\n"
+                    f"from langchain_core.runnables.config import RunnableConfig\n"
+                    f"from {self.basename}_state import {state_imports}\n\n"
+                ) + code
+            elif name == 'graph':
+                node_imports = _import_list(self.import_node_names)
+                input_schemas = [node_schema_names(node)[0] for node in self.node_names if node in self.node_access]
+                graph_schemas = [schema[0] for schema in self.graph_schemas if schema]
+                state_imports = _import_list([self.state_class] + input_schemas + graph_schemas)
+                code = (
+                    f"from {self.basename}_state import {state_imports}\n"
+                    f"from {self.basename}_nodes import {node_imports}\n\n"
+                ) + code
+            files.append((f"{self.basename}_{name}.py", code + '\n'))
+        if generate_all:
+            files.append(("main.py", self.main + '\n'))
+            if self.with_coverage_runner:
+                files.append(("coverage_runner.py", self.coverage_runner))
+            if self.with_replay:
+                files.append(("replay.py", self.replay))
+            files.append(("README.md", self.readme + '\n'))
+        return files
+
+    def write(self, output_dir, sections: Optional[Iterable[str]] = None) -> List[Tuple[Path, bool]]:
+        """Write ``files(sections)`` into ``output_dir``.
+
+        Files whose content is already identical are left untouched (their
+        mtime is preserved).  Returns ``[(path, written), ...]``.
+        """
+        output_dir = Path(output_dir)
+        output_dir.mkdir(parents=True, exist_ok=True)
+        results = []
+        for filename, content in self.files(sections):
+            path = output_dir / filename
+            try:
+                unchanged = path.read_text() == content
+            except (FileNotFoundError, UnicodeDecodeError):
+                unchanged = False
+            if not unchanged:
+                path.write_text(content)
+            results.append((path, not unchanged))
+        return results
@@ -0,0 +1,168 @@
+"""Synthetic ``.lgraph`` specs for scale testing.
+
+Specs are produced line by line from a seeded RNG, so multi-million-line
+inputs can be written straight to disk without being built in memory::
+
+    python -m langgraph_codegen.synthetic --nodes 1000000 -o big.lgraph
+
+The graph is a sequence of segments hanging off a single running tail node:
+chains, fan-out/fan-in groups, ternary routers, switch routers, worker pipes
+and conditional back edges (cycles).  Every node is reachable from START and
+has an outgoing edge, so the output is accepted by the whole pipeline.
+"""
+import argparse
+import random
+import sys
+from dataclasses import dataclass, replace
+from typing import Iterator, Optional, TextIO
+
+STATE_FIELD_TYPES = ['list[str]', 'int', 'str', 'dict', 'bool', 'float']
+
+
+@dataclass
+class SyntheticSpecConfig:
+    """Shape of a synthetic spec.  Segment weights are relative."""
+    nodes: int = 100                 # stop after this many nodes...
+    edges: Optional[int] = None      # ...or, if set, after this many edges
+    seed: int = 0
+    state_class: str = "SyntheticState"
+    state_fields: int = 4            # extra STATE fields (0 for no STATE section)
+    chain_length: int = 4            # nodes per chain segment
+    fan_width: int = 3               # parallel nodes per fan-out/fan-in segment
+    switch_width: int = 3            # destinations per switch router
+    chain_weight: float = 5.0
+    fan_weight: float = 1.0
+    ternary_weight: float = 1.0
+    switch_weight: float = 1.0
+    worker_weight: float = 0.5
+    cycle_weight: float = 0.5
+    cycle_window: int = 50           # back edges target one of the last N nodes
+
+
+SEGMENTS = ('chain', 'fan', 'ternary', 'switch', 'worker', 'cycle')
+
+
+def iter_spec_lines(config: Optional[SyntheticSpecConfig] = None, **overrides) -> Iterator[str]:
+    """Yield the lines (without newlines) of a synthetic spec."""
+    config = replace(config or SyntheticSpecConfig(), **overrides)
+    rng = random.Random(config.seed)
+    weights = [getattr(config, f"{name}_weight") for name in SEGMENTS]
+
+    yield f"# Synthetic spec: seed={config.seed} nodes={config.nodes} edges={config.edges}"
+    if config.state_fields:
+        yield f"STATE: {config.state_class}"
+        for i in range(config.state_fields):
+            yield f"field_{i}: {rng.choice(STATE_FIELD_TYPES)}"
+        yield ""
+        yield "START -> n0"
+    else:
+        yield f"START:{config.state_class} -> n0"
+
+    node_count = 1
+    edge_count = 1
+    segment = 0
+
+    def new_node():
+        nonlocal node_count
+        node_count += 1
+        return f"n{node_count - 1}"
+
+    def done():
+        if config.edges is not None:
+            return edge_count >= config.edges
+        return node_count >= config.nodes
+
+    tail = "n0"
+    while not done():
+        kind = rng.choices(SEGMENTS, weights)[0]
+        segment += 1
+        if kind == 'chain':
+            chain = [new_node() for _ in range(max(1, config.chain_length))]
+            yield " -> ".join([tail] + chain)
+            edge_count += len(chain)
+            tail = chain[-1]
+        elif kind == 'fan':
+            fan = [new_node() for _ in range(max(2, config.fan_width))]
+            join = new_node()
+            yield f"{tail} -> {', '.join(fan)} -> {join}"
+            edge_count += 2 * len(fan)
+            tail = join
+        elif kind == 'ternary':
+            yes, no, join = new_node(), new_node(), new_node()
+            yield f"{tail} -> cond_{segment} ? {yes} : {no}"
+            yield f"{yes} -> {join}"
+            yield f"{no} -> {join}"
+            edge_count += 4
+            tail = join
+        elif kind == 'switch':
+            branches = [new_node() for _ in range(max(2, config.switch_width))]
+            join = new_node()
+            yield f"{tail} -> route_{segment}({', '.join(branches + ['END'])})"
+            for branch in branches:
+                yield f"{branch} -> {join}"
+            edge_count += 2 * len(branches) + 1
+            tail = join
+        elif kind == 'worker':
+            join = new_node()
+            yield f"{tail} -> items_{segment} | worker_{segment} -> {join}"
+            edge_count += 2
+            tail = join
+        else:  # cycle
+            last = node_count - 1
+            back = rng.randint(max(0, last - config.cycle_window), last)
+            join = new_node()
+            yield f"{tail} -> done_{segment} ? {join} : n{back}"
+            edge_count += 2
+            tail = join
+    yield f"{tail} -> END"
+
+
+def write_spec(fp: TextIO, config: Optional[SyntheticSpecConfig] = None, **overrides) -> int:
+    """Stream a synthetic spec to an open text file; return the number of lines written."""
+    count = 0
+    buffer = []
+    for line in iter_spec_lines(config, **overrides):
+        buffer.append(line + "\n")
+        count += 1
+        if len(buffer) >= 4096:
+            fp.writelines(buffer)
+            buffer.clear()
+    fp.writelines(buffer)
+    return count
+
+
+def generate_spec(config: Optional[SyntheticSpecConfig] = None, **overrides) -> str:
+    """Return a synthetic spec as a single string (convenient for small specs)."""
+    return "\n".join(iter_spec_lines(config, **overrides)) + "\n"
+
+
+def main(argv=None):
+    defaults = SyntheticSpecConfig()
+    parser = argparse.ArgumentParser(description='Write a synthetic .lgraph spec for scale testing')
+    parser.add_argument('--nodes', type=int, default=defaults.nodes, help='Approximate node count')
+    parser.add_argument('--edges', type=int, help='Approximate edge count (overrides --nodes)')
+    parser.add_argument('--seed', type=int, default=defaults.seed)
+    parser.add_argument('--state-fields', type=int, default=defaults.state_fields)
+    parser.add_argument('--chain-length', type=int, default=defaults.chain_length)
+    parser.add_argument('--fan-width', type=int, default=defaults.fan_width)
+    parser.add_argument('--switch-width', type=int, default=defaults.switch_width)
+    for name in SEGMENTS:
+        parser.add_argument(f'--{name}-weight', type=float, default=getattr(defaults, f"{name}_weight"))
+    parser.add_argument('-o', '--output', help='Output file (default: stdout)')
+    args = parser.parse_args(argv)
+
+    config = SyntheticSpecConfig(
+        nodes=args.nodes, edges=args.edges, seed=args.seed, state_fields=args.state_fields,
+        chain_length=args.chain_length, fan_width=args.fan_width, switch_width=args.switch_width,
+        **{f"{name}_weight": getattr(args, f"{name}_weight") for name in SEGMENTS},
+    )
+    if args.output:
+        with open(args.output, 'w') as fp:
+            count = write_spec(fp, config)
+        print(f"Wrote {count} lines to {args.output}", file=sys.stderr)
+    else:
+        write_spec(sys.stdout, config)
+
+
+if __name__ == '__main__':
+    main()
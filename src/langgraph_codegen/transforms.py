@@ -0,0 +1,252 @@
+"""Graph rewrites applied before code generation.
+
+Rewrites work on ``ParsedSpec.graph_dict`` and return a new ParsedSpec plus a
+list of :class:`Transformation` records describing what changed, so callers
+can show the user exactly what was rewritten.
+
+:func:`parallelize_chains` turns runs of nodes in a linear chain that touch
+disjoint state fields into fan-out/fan-in groups.  Which fields a node reads
+and writes comes from the spec's NODES section::
+
+    NODES:
+    fetch_news: reads=topic writes=news
+    fetch_weather: reads=city writes=weather
+
+:func:`fuse_chains` replaces each linear chain with one node that runs the
+chain's nodes in order, saving a superstep (and a checkpoint) per link.
+"""
+from dataclasses import dataclass, replace
+from typing import Dict, FrozenSet, List, Tuple
+
+from langgraph_codegen.gen_graph import ParsedSpec
+
+TRUE_FN = "true_fn"
+
+
+@dataclass(frozen=True)
+class NodeAccess:
+    """State fields a node declares it reads and writes."""
+    reads: FrozenSet[str]
+    writes: FrozenSet[str]
+
+    def independent_of(self, other: 'NodeAccess') -> bool:
+        """No read/write, write/read or write/write overlap in either direction."""
+        return not (self.writes & (other.reads | other.writes) or other.writes & self.reads)
+
+
+@dataclass
+class Transformation:
+    """One rewrite applied to the graph."""
+    kind: str          # 'parallelize' or 'fuse'
+    nodes: List[str]   # nodes the rewrite covers
+    before: str        # the affected edges in DSL form
+    after: str
+
+    def __str__(self):
+        return f"{self.kind}: {self.before}  =>  {self.after}"
+
+
+def _field_list(value):
+    return frozenset(f.strip() for f in value.split(",") if f.strip())
+
+
+def node_access(parsed: ParsedSpec) -> Dict[str, NodeAccess]:
+    """Read/write declarations from NODES hints.
+
+    Field names are checked against the STATE section when there is one.
+    Nodes that declare neither ``reads`` nor ``writes`` are left out: nothing
+    is known about them.  A node declaring only one of them is taken to
+    touch nothing else.
+    """
+    known = {name for name, _type in parsed.state_fields}
+    access = {}
+    for node, hints in parsed.node_hints.items():
+        if "reads" not in hints and "writes" not in hints:
+            continue
+        reads = _field_list(hints.get("reads", ""))
+        writes = _field_list(hints.get("writes", ""))
+        if known:
+            unknown = sorted((reads | writes) - known)
+            if unknown:
+                raise ValueError(
+                    f"NODES: {node} uses {', '.join(unknown)}, not declared in STATE: {parsed.state_class_name}"
+                )
+        access[node] = NodeAccess(reads, writes)
+    return access
+
+
+def linear_chains(graph_dict: dict, exclude=()) -> List[List[str]]:
+    """Maximal runs ``[x0, x1, ..., xk]`` linked by plain edges.
+
+    Each link ``x -> y`` is x's only edge, unconditional, and y's only
+    incoming edge, so x1..xk are entered only from the node before them.  x0
+    may have any number of incoming edges and may be START.  Nodes in
+    ``exclude`` (e.g. worker functions, which are Send targets) break chains.
+    """
+    indegree = {}
+    for node_dict in graph_dict.values():
+        for edge in node_dict["edges"]:
+            for dest in edge["destination"].split(","):
+                dest = dest.strip()
+                indegree[dest] = indegree.get(dest, 0) + 1
+
+    def plain_node(name):
+        return name in graph_dict and "," not in name and name not in exclude
+
+    link = {}
+    for node, node_dict in graph_dict.items():
+        edges = node_dict["edges"]
+        if not plain_node(node) or len(edges) != 1 or edges[0]["condition"] != TRUE_FN:
+            continue
+        dest = edges[0]["destination"]
+        if dest != node and plain_node(dest) and dest != "START" and indegree.get(dest) == 1:
+            link[node] = dest
+
+    linked_to = set(link.values())
+    chains = []
+    for node in graph_dict:
+        if node in link and node not in linked_to:
+            chain = [node]
+            while chain[-1] in link:
+                chain.append(link[chain[-1]])
+            chains.append(chain)
+    return chains
+
+
+def _single_exit(graph_dict, node):
+    """Destination of node's only edge when it is unconditional, else None."""
+    edges = graph_dict[node]["edges"]
+    if len(edges) == 1 and edges[0]["condition"] == TRUE_FN and "," not in edges[0]["destination"]:
+        return edges[0]["destination"]
+    return None
+
+
+def parallelize_chains(parsed: ParsedSpec) -> Tuple[ParsedSpec, List[Transformation]]:
+    """Rewrite provably independent runs of a linear chain into fan-out/fan-in.
+
+    In ``a -> b -> c -> d``, if b and c both declare reads/writes and neither
+    writes a field the other reads or writes, the chain becomes
+    ``a -> b, c -> d``: both run in one superstep and d runs once after them.
+    Runs are grown greedily from the start of each chain.
+
+    A chain's head is never grouped: it is the fan-out point, and the edges
+    into it (a routing branch, several incoming edges, a fan-in key or a
+    worker) are not rewritten.  So after ``x -> is_ok ? b : END``, the chain
+    ``b -> c -> d`` keeps b and c sequential even when they are independent;
+    only nodes after the head can run together.
+    """
+    access = node_access(parsed)
+    if not access:
+        return parsed, []
+    worker_funcs = {f[0] for f in parsed.worker_functions}
+    graph = dict(parsed.graph_dict)
+    transformations = []
+
+    for chain in linear_chains(graph, exclude=worker_funcs):
+        i = 1
+        while i < len(chain):
+            group = [chain[i]]
+            if chain[i] in access:
+                for node in chain[i + 1:]:
+                    if node in access and all(access[node].independent_of(access[m]) for m in group):
+                        group.append(node)
+                    else:
+                        break
+            after = _single_exit(graph, group[-1]) if len(group) > 1 else None
+            if after is None:
+                i += 1
+                continue
+            before_node = chain[i - 1]
+            graph[before_node] = {**graph[before_node], "edges": [
+                {"condition": TRUE_FN, "destination": member} for member in group
+            ]}
+            for member in group:
+                graph[member] = {**graph[member], "edges": [{"condition": TRUE_FN, "destination": after}]}
+            transformations.append(Transformation(
+                kind="parallelize",
+                nodes=list(group),
+                before=" -> ".join([before_node] + group + [after]),
+                after=f"{before_node} -> {', '.join(group)} -> {after}",
+            ))
+            # The join node is the next group's fan-out point
+            i += len(group) + 1
+    if not transformations:
+        return parsed, []
+    return replace(parsed, graph_dict=graph), transformations
+
+
+def _merged_hints(hints):
+    """NODES hints for a fused node: latency and tokens add up, field lists join."""
+    merged = {}
+    for key in ("latency", "tokens"):
+        values = [h[key] for h in hints if key in h]
+        if values:
+            try:
+                merged[key] = f"{sum(float(v) for v in values):g}"
+            except ValueError:
+                pass
+    for key in ("reads", "writes"):
+        fields = [f for h in hints for f in h.get(key, "").split(",") if f.strip()]
+        if fields:
+            merged[key] = ",".join(dict.fromkeys(f.strip() for f in fields))
+    return merged
+
+
+def fuse_chains(parsed: ParsedSpec) -> Tuple[ParsedSpec, List[Transformation]]:
+    """Replace each linear chain with a single fused node.
+
+    For ``a -> b -> c`` (b and c entered only from the node before them) the
+    fused node ``a__b__c`` runs a, b and c in order and takes over a's
+    incoming edges and c's outgoing edges, including c's routing.  The
+    members are listed in ``fused_nodes`` of the returned spec; gen_graph
+    emits them through ``fuse_nodes``.  START, worker functions (Send
+    targets) and MessageGraph graphs are never fused.
+    """
+    graph = parsed.graph_dict
+    if graph[parsed.start_node]["state"] == "MessageGraph":
+        return parsed, []
+    worker_funcs = {f[0] for f in parsed.worker_functions}
+    renames = {}
+    for chain in linear_chains(graph, exclude=worker_funcs | {"START", parsed.start_node}):
+        if len(chain) > 1:
+            renames[chain[0]] = chain
+    if not renames:
+        return parsed, []
+
+    members = {node for chain in renames.values() for node in chain[1:]}
+    names = {head: "__".join(chain) for head, chain in renames.items()}
+
+    def rename(destination):
+        return ", ".join(names.get(d.strip(), d.strip()) for d in destination.split(","))
+
+    fused_graph = {}
+    for node, node_dict in graph.items():
+        if node in members:
+            continue
+        if node in renames:
+            node, node_dict = names[node], graph[renames[node][-1]]
+        fused_graph[node] = {**node_dict, "edges": [
+            {**edge, "destination": rename(edge["destination"])} for edge in node_dict["edges"]
+        ]}
+
+    routing_functions = parsed.routing_functions
+    if routing_functions is not None:
+        routing_functions = {names.get(node, node): fn for node, fn in routing_functions.items()}
+        for head, chain in renames.items():
+            routing_functions.setdefault(names[head], routing_functions.pop(chain[-1], f"after_{chain[-1]}"))
+    node_hints = {node: hints for node, hints in parsed.node_hints.items() if node not in members}
+    for head, chain in renames.items():
+        node_hints.pop(head, None)
+        hints = _merged_hints([parsed.node_hints.get(node, {}) for node in chain])
+        if hints:
+            node_hints[names[head]] = hints
+
+    transformations = [
+        Transformation(kind="fuse", nodes=list(chain), before=" -> ".join(chain), after=names[head])
+        for head, chain in renames.items()
+    ]
+    fused = replace(
+        parsed, graph_dict=fused_graph, routing_functions=routing_functions, node_hints=node_hints,
+        fused_nodes={**parsed.fused_nodes, **{names[head]: list(chain) for head, chain in renames.items()}},
+    )
+    return fused, transformations
@@ -0,0 +1,312 @@
+"""Fast validation of graph specs, one at a time or thousands at once.
+
+:func:`validate_text` checks a spec in one pass over its lines with the
+precompiled patterns below, without building the graph.  It reports every
+problem it finds, with its line number, as a :class:`ValidationIssue`:
+
+- ``missing_start``: the first graph line leaves neither START
+  (``START ->``, ``START:State ->``, ``START(State) =>``) nor a state class
+  (``MessagesState -> first_node``),
+- ``syntax``: a line that is not one of the DSL's edge forms,
+- ``state``, ``nodes``: a malformed STATE field or NODES hint,
+- ``undefined_node``: a destination that has no outgoing edge of its own,
+- ``end_as_source``: an edge leaving END.
+
+:func:`validate_many` validates files in a process pool, for linting many
+specs in pre-commit::
+
+    lgvalidate specs/*.lgraph --workers 8
+"""
+import argparse
+import json
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field, asdict
+from textwrap import dedent
+from typing import Iterable, List, Optional
+
+_NAME = r"[A-Za-z_][A-Za-z0-9_]*"
+
+NAME = re.compile(rf"{_NAME}\Z")
+NAME_LIST = re.compile(rf"{_NAME}(?:\s*,\s*{_NAME})*\Z")
+NAME_SPLIT = re.compile(r"\s*,\s*")
+START = re.compile(rf"START(?:\s*:\s*{_NAME}|\s*\(\s*{_NAME}\s*\))?\Z")
+STATE_CLASS = re.compile(r"[A-Z][A-Za-z0-9_]*(?:\.[A-Za-z_][A-Za-z0-9_]*)?\Z")  # MessagesState -> first
+STATE_FIELD_ARG = re.compile(rf"{_NAME}\.{_NAME}\Z")
+ARROW = re.compile(r"\s*(?:->|→)\s*")
+CONDITION = re.compile(rf"({_NAME})\s*\?\s*({_NAME})\s*:\s*({_NAME})\Z")     # cond ? a : b
+CALL = re.compile(rf"({_NAME})\s*\(\s*([^()]*?)\s*\)\Z")                    # fn(a, b, END) or fn(State.field)
+WORKER = re.compile(rf"(?:{_NAME}\s*\.\s*)?{_NAME}\s*\|\s*({_NAME})\Z")     # [State.]field | worker
+FAT_ARROW = re.compile(r"\s*=>\s*")
+STATE_HEADER = re.compile(rf"STATE:\s*{_NAME}(?:\s+budget=\S+)?\s*\Z")
+STATE_FIELD = re.compile(rf"{_NAME}\s*:\s*\S")
+BAD_KEEP = re.compile(r"\skeep=(?![1-9][0-9]*(?:\s|\Z))")
+NODES_HEADER = re.compile(r"NODES:\s*\Z")
+NODES_HINT = re.compile(rf"{_NAME}\s*:(?:\s+[A-Za-z_][A-Za-z0-9_]*=\S+)*\s*\Z")
+
+MISSING_START = "START node not found at beginning of graph specification"
+
+
+@dataclass
+class ValidationIssue:
+    """One problem in a spec."""
+    severity: str          # 'error' or 'warning'
+    kind: str              # 'missing_start', 'syntax', 'state', 'nodes', 'undefined_node', 'end_as_source', 'read_error'
+    message: str
+    line: int = 0          # 1-based; 0 for the spec as a whole
+
+
+@dataclass
+class ValidationResult:
+    """Result of validate_text() / validate_file()."""
+    path: Optional[str] = None
+    issues: List[ValidationIssue] = field(default_factory=list)
+
+    @property
+    def errors(self) -> List[ValidationIssue]:
+        return [issue for issue in self.issues if issue.severity == 'error']
+
+    @property
+    def warnings(self) -> List[ValidationIssue]:
+        return [issue for issue in self.issues if issue.severity == 'warning']
+
+    @property
+    def ok(self) -> bool:
+        return not self.errors
+
+    def to_dict(self):
+        return asdict(self)
+
+    def format(self) -> str:
+        """One line per issue, e.g. ``spec.lgraph:3: error: syntax: ...``."""
+        path = self.path or "<spec>"
+        return "\n".join(f"{path}:{issue.line}: {issue.severity}: {issue.kind}: {issue.message}"
+                         for issue in self.issues)
+
+
+class _Checker:
+    """State for one pass over a spec."""
+
+    def __init__(self):
+        self.issues = []
+        self.sources = set()
+        self.destinations = {}     # name -> line it is first reached on
+        self.seen_edge = False
+
+    def error(self, kind, message, line):
+        self.issues.append(ValidationIssue('error', kind, message, line))
+
+    def reach(self, names, lineno):
+        for name in names:
+            if name == 'START':
+                self.error('syntax', "START can't be a destination", lineno)
+            elif name not in self.destinations:
+                self.destinations[name] = lineno
+
+    def leave(self, names, lineno):
+        for name in names:
+            if name == 'END':
+                self.error('end_as_source', "END can't have outgoing edges", lineno)
+            self.sources.add(name)
+
+    def first_edge(self, source, lineno):
+        """The first edge line must leave START or name the state class (``MessagesState -> llm_call``)."""
+        if self.seen_edge:
+            if START.match(source):
+                self.error('missing_start', "START must be the first edge of the graph", lineno)
+                return True
+            return False
+        self.seen_edge = True
+        if START.match(source) or STATE_CLASS.match(source):
+            return True
+        self.error('missing_start', MISSING_START, lineno)
+        return False
+
+    def destination(self, text, lineno, last):
+        """Check one destination segment; return the names the next segment leaves from."""
+        if NAME_LIST.match(text):
+            names = NAME_SPLIT.split(text)
+            self.reach(names, lineno)
+            return names
+        match = WORKER.match(text)
+        if match:
+            self.reach((match.group(1),), lineno)
+            return [match.group(1)]
+        match = CALL.match(text)
+        if match:
+            function, args = match.groups()
+            if STATE_FIELD_ARG.match(args):   # worker(State.field)
+                self.reach((function,), lineno)
+                return [function]
+            if not last:
+                self.error('syntax', f"routing function {function}() must end the line", lineno)
+            elif not NAME_LIST.match(args):
+                self.error('syntax', f"{function}() takes a comma-separated list of nodes: {text}", lineno)
+            else:
+                self.reach(NAME_SPLIT.split(args), lineno)
+            return []
+        match = CONDITION.match(text)
+        if match:
+            if not last:
+                self.error('syntax', f"condition {match.group(1)} must end the line", lineno)
+            self.reach(match.group(2, 3), lineno)
+            return []
+        self.error('syntax', f"not a destination: {text or '(empty)'}", lineno)
+        return []
+
+    def arrow_line(self, line, lineno):
+        segments = ARROW.split(line)
+        source = segments[0]
+        if self.first_edge(source, lineno):
+            sources = ['START']
+        elif NAME_LIST.match(source):
+            sources = NAME_SPLIT.split(source)
+        else:
+            self.error('syntax', f"not a node name: {source or '(empty)'}", lineno)
+            sources = []
+        for i, segment in enumerate(segments[1:], 2):
+            self.leave(sources, lineno)
+            sources = self.destination(segment, lineno, i == len(segments))
+
+    def fat_arrow_line(self, line, lineno, header):
+        """``a, b => c``, ``START(State) => a``, or an indented ``[cond] => c`` under ``header``."""
+        parts = FAT_ARROW.split(line)
+        if len(parts) != 2:
+            self.error('syntax', f"expected one '=>': {line}", lineno)
+            return
+        left, right = parts
+        if header is not None:
+            if left and not NAME.match(left):
+                self.error('syntax', f"not a condition name: {left}", lineno)
+            sources = [header]
+        elif self.first_edge(left, lineno):
+            sources = ['START']
+        elif NAME_LIST.match(left):
+            sources = NAME_SPLIT.split(left)
+        else:
+            self.error('syntax', f"not a node name: {left or '(empty)'}", lineno)
+            return
+        if not NAME_LIST.match(right):
+            self.error('syntax', f"not a destination: {right or '(empty)'}", lineno)
+            return
+        self.leave(sources, lineno)
+        self.reach(NAME_SPLIT.split(right), lineno)
+
+    def check(self, lines):
+        section = None      # 'STATE' or 'NODES' while inside one
+        header = None       # bare node name that indented '=>' lines belong to
+        for lineno, raw in enumerate(lines, 1):
+            line = raw.strip()
+            if not line:
+                section = None
+                continue
+            if '#' in line:
+                line = line.split('#', 1)[0].rstrip()
+            if not line or line[0] in '-/':
+                continue
+            indented = raw[0] in ' \t'
+            has_arrow = '->' in line or '=>' in line or '→' in line
+            if section is not None:
+                if has_arrow or line.startswith('START') or line.startswith('STATE:' if section == 'NODES' else 'NODES:'):
+                    section = None
+                elif section == 'STATE':
+                    if not STATE_FIELD.match(line):
+                        self.error('state', f"expected 'name: type [keep=N | ephemeral]': {line}", lineno)
+                    elif BAD_KEEP.search(line):
+                        self.error('state', f"keep= takes a positive number of items: {line}", lineno)
+                    continue
+                else:
+                    if not NODES_HINT.match(line):
+                        self.error('nodes', f"expected 'node: key=value ...': {line}", lineno)
+                    continue
+            if not indented and line.startswith('STATE:'):
+                if not STATE_HEADER.match(line):
+                    self.error('state', f"expected 'STATE: ClassName [budget=SIZE]': {line}", lineno)
+                section, header = 'STATE', None
+            elif not indented and NODES_HEADER.match(line):
+                section, header = 'NODES', None
+            elif '->' in line or '→' in line:
+                self.arrow_line(line, lineno)
+                header = None
+            elif '=>' in line:
+                self.fat_arrow_line(line, lineno, header if indented else None)
+                if not indented:
+                    header = None
+            elif not indented and NAME.match(line):
+                header = 'START' if self.first_edge(line, lineno) else line
+            else:
+                self.error('syntax', f"not an edge: {line}", lineno)
+        if not self.seen_edge:
+            self.error('missing_start', MISSING_START, 0)
+        for name, lineno in self.destinations.items():
+            if name != 'END' and name not in self.sources:
+                self.error('undefined_node', f"{name} has no outgoing edges", lineno)
+        return self.issues
+
+
+def validate_text(text: str, path: Optional[str] = None) -> ValidationResult:
+    """Validate a spec's text."""
+    first = text.lstrip('\n')
+    if first[:1] in (' ', '\t'):
+        text = dedent(text)
+    return ValidationResult(path, _Checker().check(text.split('\n')))
+
+
+def validate_file(path) -> ValidationResult:
+    try:
+        with open(path, encoding='utf-8') as f:
+            text = f.read()
+    except (OSError, UnicodeDecodeError) as e:
+        return ValidationResult(str(path), [ValidationIssue('error', 'read_error', str(e))])
+    return validate_text(text, str(path))
+
+
+def _validate_chunk(paths):
+    return [validate_file(path) for path in paths]
+
+
+def validate_many(paths: Iterable, workers: Optional[int] = None) -> List[ValidationResult]:
+    """Validate files in ``workers`` processes (default: one per CPU); results are in input order.
+
+    Files are handed out in chunks, so each worker gets a few large batches
+    rather than one task per file.  ``workers=1`` runs in this process.
+    """
+    paths = [str(path) for path in paths]
+    workers = min(workers or os.cpu_count() or 1, len(paths))
+    if workers <= 1:
+        return _validate_chunk(paths)
+    size = -(-len(paths) // (workers * 4))
+    chunks = [paths[i:i + size] for i in range(0, len(paths), size)]
+    with ProcessPoolExecutor(workers) as pool:
+        results = pool.map(_validate_chunk, chunks)
+        return [result for chunk in results for result in chunk]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Validate graph spec files")
+    parser.add_argument('paths', nargs='+', help='Spec files (.lgraph, .graph, .txt)')
+    parser.add_argument('--workers', type=int, help='Worker processes (default: one per CPU)')
+    parser.add_argument('--json', action='store_true', help='Print the results as JSON')
+    parser.add_argument('--stats', action='store_true', help='Print throughput to stderr')
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    results = validate_many(args.paths, workers=args.workers)
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    if args.json:
+        print(json.dumps([result.to_dict() for result in results], indent=2))
+    else:
+        for result in results:
+            if result.issues:
+                print(result.format())
+    if args.stats:
+        print(f"{len(results)} specs in {elapsed_ms:.1f} ms ({len(results) / max(elapsed_ms, 1e-9):.2f} specs/ms)",
+              file=sys.stderr)
+    return 1 if any(not result.ok for result in results) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,5 +1,6 @@
 import ast
 import builtins
+import hashlib
 
 import_dict = {
     # key: what we are importing, value: complete import statement
@@ -17,11 +18,31 @@ def import_statements(defined, used):
     return [import_dict[name] for name in used - defined if import_dict.get(name, None)]
 
 class CodeSnippetAnalyzer:
+    """Symbol table over named code snippets.
+
+    Each snippet is parsed once per distinct content: the analysis is cached
+    by content hash, so re-adding unchanged code costs a hash.  An index from
+    name to the snippets that define it is updated on every add_snippet(), so
+    undefined() and defined_elsewhere() only look at the names one snippet
+    uses, however many snippets there are.
+    """
     def __init__(self):
         self.snippets = {}
         self.builtin_names = set(dir(builtins))
+        self.definers = {}   # name -> names of the snippets that define it
+        self._cache = {}     # sha256 of code -> analyze_code() result
 
     def analyze_code(self, code_snippet):
+        """Return (defined, parameters, instance variables, globals, used, undefined, imports).
+
+        Results are cached by content, so the sets are frozensets.
+        """
+        key = hashlib.sha256(code_snippet.encode()).hexdigest()
+        if key not in self._cache:
+            self._cache[key] = self._analyze(code_snippet)
+        return self._cache[key]
+
+    def _analyze(self, code_snippet):
         defined_variables = set()
         parameter_variables = set()
         class_instance_variables = set()
@@ -35,15 +56,17 @@ class CodeSnippetAnalyzer:
 
             def visit_Name(self, node):
                 if isinstance(node.ctx, ast.Store):
-                    # Check if we're in a class context and it's an instance variable (self.x)
-                    if isinstance(node.parent, ast.Attribute) and isinstance(node.parent.value, ast.Name) and node.parent.value.id == 'self':
-                        class_instance_variables.add(node.parent.attr)
-                    else:
-                        defined_variables.add(node.id)
+                    defined_variables.add(node.id)
                 elif isinstance(node.ctx, ast.Load):
                     if node.id not in self.builtin_names:
                         used_variables.add(node.id)
 
+            def visit_Attribute(self, node):
+                # self.x = ... makes x an instance variable
+                if isinstance(node.ctx, ast.Store) and isinstance(node.value, ast.Name) and node.value.id == 'self':
+                    class_instance_variables.add(node.attr)
+                self.generic_visit(node)
+
             def visit_Global(self, node):
                 for name in node.names:
                     global_variables.add(name)
@@ -78,28 +101,28 @@ class CodeSnippetAnalyzer:
 
         try:
             tree = ast.parse(code_snippet)
-            # Add parent references to make it easier to check context
-            for node in ast.walk(tree):
-                for child in ast.iter_child_nodes(node):
-                    child.parent = node
             visitor = Visitor(self.builtin_names)
             visitor.visit(tree)
         except SyntaxError:
-            return set(), set(), set(), set(), set(), set(), []
+            return frozenset(), frozenset(), frozenset(), frozenset(), frozenset(), frozenset(), []
 
         imports = import_statements(defined_variables, used_variables)
-        undefined_variables = {var for var in used_variables 
-                             if var not in defined_variables and 
+        imported = {x.split(' ')[-1] for x in imports}
+        undefined_variables = {var for var in used_variables
+                             if var not in defined_variables and
                              var not in builtin_names and
                              var not in parameter_variables and
                              var not in class_instance_variables and
                              var not in global_variables and
-                             var not in [x.split(' ')[-1] for x in imports]}
-        
-        return (defined_variables, parameter_variables, class_instance_variables, 
-                global_variables, used_variables, undefined_variables, imports)
-    
+                             var not in imported}
+
+        return (frozenset(defined_variables), frozenset(parameter_variables), frozenset(class_instance_variables),
+                frozenset(global_variables), frozenset(used_variables), frozenset(undefined_variables), imports)
+
     def add_snippet(self, name, code):
+        """Add or replace a snippet, and update the name index."""
+        if name in self.snippets:
+            self._unindex(name)
         defined, parameter_variables, class_instance_variables, global_variables, used, undefined, import_statements = self.analyze_code(code)
         self.snippets[name] = {
             'code': code,
@@ -109,42 +132,61 @@ class CodeSnippetAnalyzer:
             'global_variables': global_variables,
             'used': used,
             'undefined': undefined,
-            'imports': import_statements
+            'imports': import_statements,
+            'provides': defined | parameter_variables | class_instance_variables | global_variables,
         }
+        for symbol in self.snippets[name]['provides']:
+            self.definers.setdefault(symbol, set()).add(name)
         return self.snippets[name]
-    
+
+    def remove_snippet(self, name):
+        self._unindex(name)
+        del self.snippets[name]
+
+    def _unindex(self, name):
+        for symbol in self.snippets[name]['provides']:
+            snippets = self.definers[symbol]
+            snippets.discard(name)
+            if not snippets:
+                del self.definers[symbol]
+
+    def defining_snippets(self, symbol):
+        """Names of the snippets that define ``symbol``."""
+        return set(self.definers.get(symbol, ()))
+
+    def undefined(self, snippet_name):
+        """Names the snippet uses that no snippet defines and that are not builtins."""
+        return {symbol for symbol in self.snippets[snippet_name]['used']
+                if symbol not in self.definers and symbol not in self.builtin_names}
+
+    def defined_elsewhere(self, snippet_name):
+        """Names the snippet uses that it doesn't define, but another snippet (or builtins) does."""
+        data = self.snippets[snippet_name]
+        provides = data['provides']
+        return {symbol for symbol in data['used']
+                if symbol not in provides and (symbol in self.definers or symbol in self.builtin_names)}
+
     def analyze_all_snippets(self):
-        all_defined = set().union(*(data['defined'] for data in self.snippets.values()))
-        all_parameters = set().union(*(data['parameter_variables'] for data in self.snippets.values()))
-        all_instance_vars = set().union(*(data['class_instance_variables'] for data in self.snippets.values()))
-        all_globals = set().union(*(data['global_variables'] for data in self.snippets.values()))
-        all_defined.update(self.builtin_names)  # Add built-in names to all_defined
-
-        for snippet_name, data in self.snippets.items():
-            defined = data['defined']
-            parameter_vars = data['parameter_variables']
-            instance_vars = data['class_instance_variables']
-            global_vars = data['global_variables']
-            used = data['used']
-            
-            # A variable is undefined if it's used but not defined anywhere
-            undefined = used - all_defined - all_parameters - all_instance_vars - all_globals
-            # A variable is defined elsewhere if it's used but defined in another snippet
-            defined_elsewhere = used.intersection(all_defined | all_parameters | all_instance_vars | all_globals) - defined - parameter_vars - instance_vars - global_vars
-
-            self.snippets[snippet_name]['analysis'] = {
-                'defined': defined,
-                'parameter_variables': parameter_vars,
-                'class_instance_variables': instance_vars,
-                'global_variables': global_vars,
-                'undefined': undefined,
-                'defined_elsewhere': defined_elsewhere
-            }
+        for snippet_name in self.snippets:
+            self.snippets[snippet_name]['analysis'] = self._analysis(snippet_name)
+
+    def _analysis(self, snippet_name):
+        data = self.snippets[snippet_name]
+        return {
+            'defined': data['defined'],
+            'parameter_variables': data['parameter_variables'],
+            'class_instance_variables': data['class_instance_variables'],
+            'global_variables': data['global_variables'],
+            # used but not defined anywhere
+            'undefined': self.undefined(snippet_name),
+            # used, and defined in another snippet
+            'defined_elsewhere': self.defined_elsewhere(snippet_name)
+        }
 
     def get_snippet_summary(self, snippet_name):
         if snippet_name not in self.snippets:
             return None
-        analysis = self.snippets[snippet_name]['analysis']
+        analysis = self._analysis(snippet_name)
         return (
             analysis['defined'],
             analysis['parameter_variables'],
@@ -0,0 +1,29 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+try:
+    from langgraph_codegen.synthetic import SyntheticSpecConfig, generate_spec, write_spec
+except ImportError:
+    sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+    from langgraph_codegen.synthetic import SyntheticSpecConfig, generate_spec, write_spec
+
+
+@pytest.fixture
+def synthetic_spec():
+    """Factory returning synthetic spec text: ``synthetic_spec(nodes=500, seed=1)``."""
+    def make(config=None, **overrides):
+        return generate_spec(config, **overrides)
+    return make
+
+
+@pytest.fixture
+def synthetic_spec_file(tmp_path):
+    """Factory streaming a synthetic spec to a file and returning its path."""
+    def make(name="synthetic", config=None, **overrides):
+        path = tmp_path / f"{name}.lgraph"
+        with open(path, "w") as fp:
+            write_spec(fp, config, **overrides)
+        return path
+    return make
@@ -0,0 +1,132 @@
+"""
+Benchmark the eval pipeline against the mock LLM server.
+
+Runs the same stages as run_eval.sh (state spec, state code, node spec,
+node code, graph code, main) for each spec, in a scratch copy of this
+directory, with every provider pointed at mock_llm_server.py.  Reports
+per-stage latency, the share of it spent waiting on the (simulated) LLM,
+and overall throughput:
+
+    python bench_pipeline.py routing.txt jokester.txt --runs 3 --latency lognormal:0.5,0.4
+    python bench_pipeline.py routing.txt --runs 8 --jobs 4 --latency fixed:0.2
+
+With --jobs > 1 the graphs run concurrently, so LLM time is only reported
+as a total.  The per-call accounting from llm_metrics is summarized by stage.  Prompts still come from the configured prompt sources.
+"""
+import os
+import sys
+import time
+import shutil
+import argparse
+import statistics
+import subprocess
+import tempfile
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+
+from mock_llm_server import start_server
+import llm_metrics
+
+EVALS_DIR = Path(__file__).resolve().parent
+
+# run_eval.sh, in order
+STAGES = ["mk_state_spec.py", "mk_state_code.py", "mk_node_spec.py",
+          "mk_node_code.py", "mk_graph_code.py", "mk_main.py"]
+
+# What a stage's working directory needs besides the spec
+SUPPORT_FILES = ["default.yaml", "llm_cache.py", "llm_metrics.py", "human_input.py", "prompts"]
+
+
+def prepare_workdir(workdir, spec):
+    for name in SUPPORT_FILES:
+        source = EVALS_DIR / name
+        if source.is_dir():
+            shutil.copytree(source, workdir / name, dirs_exist_ok=True)
+        elif source.exists():
+            shutil.copy(source, workdir / name)
+    shutil.copy(spec, workdir / Path(spec).name)
+    graph_dir = workdir / Path(spec).stem
+    shutil.rmtree(graph_dir, ignore_errors=True)
+    graph_dir.mkdir()
+    for name in ("llm_cache.py", "llm_metrics.py", "human_input.py"):
+        shutil.copy(EVALS_DIR / name, graph_dir / name)
+
+
+def run_pipeline(spec, workdir, env, mock=None):
+    """Run every stage for one spec; returns ``[(stage, seconds, llm_seconds), ...]``."""
+    prepare_workdir(workdir, spec)
+    timings = []
+    for stage in STAGES:
+        llm_before = mock.stats()["latency_seconds"] if mock else 0.0
+        start = time.perf_counter()
+        result = subprocess.run([sys.executable, str(EVALS_DIR / stage), Path(spec).name],
+                                cwd=workdir, env=env, capture_output=True, text=True)
+        seconds = time.perf_counter() - start
+        if result.returncode != 0:
+            raise RuntimeError(f"{stage} failed for {spec}:\n{result.stdout[-2000:]}{result.stderr[-2000:]}")
+        llm_seconds = mock.stats()["latency_seconds"] - llm_before if mock else None
+        timings.append((stage, seconds, llm_seconds))
+    return timings
+
+
+def format_report(results, wall_seconds, runs_completed, serial):
+    lines = [f"{'stage':18s} {'mean s':>8s} {'p50 s':>8s} {'max s':>8s}" + (f" {'llm s':>8s} {'overhead s':>11s}" if serial else "")]
+    for stage in STAGES:
+        samples = [(seconds, llm) for timings in results for name, seconds, llm in timings if name == stage]
+        if not samples:
+            continue
+        seconds = [s for s, _ in samples]
+        line = f"{stage:18s} {statistics.mean(seconds):8.2f} {statistics.median(seconds):8.2f} {max(seconds):8.2f}"
+        if serial:
+            llm = statistics.mean(l for _, l in samples)
+            line += f" {llm:8.2f} {statistics.mean(seconds) - llm:11.2f}"
+        lines.append(line)
+    lines.append(f"{runs_completed} pipeline runs in {wall_seconds:.1f}s: "
+                 f"{60 * runs_completed / wall_seconds:.1f} runs/minute")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the eval pipeline against the mock LLM server")
+    parser.add_argument("specs", nargs="+", help="Spec .txt files, e.g. routing.txt")
+    parser.add_argument("--runs", type=int, default=1, help="Pipeline runs per spec")
+    parser.add_argument("--jobs", type=int, default=1, help="Pipeline runs at once")
+    parser.add_argument("--latency", default="fixed:0", help="Mock latency, e.g. lognormal:0.5,0.4")
+    parser.add_argument("--responses", help="Mock response rules (see mock_llm_server.py)")
+    args = parser.parse_args(argv)
+
+    server, base_url = start_server(0, args.latency, args.responses)
+    serial = args.jobs == 1
+    jobs = [(Path(spec).resolve(), run) for spec in args.specs for run in range(args.runs)]
+    with tempfile.TemporaryDirectory() as scratch:
+        metrics_log = Path(scratch) / "llm_metrics.jsonl"
+        env = {**os.environ, "MOCK_LLM_BASE_URL": base_url, llm_metrics.LOG_ENV: str(metrics_log)}
+
+        def one(job):
+            spec, run = job
+            workdir = Path(scratch) / f"{spec.stem}-{run}"
+            workdir.mkdir()
+            return run_pipeline(spec, workdir, env, server.mock if serial else None)
+
+        start = time.perf_counter()
+        try:
+            with ThreadPoolExecutor(args.jobs) as pool:
+                results = list(pool.map(one, jobs))
+        except RuntimeError as e:
+            print(f"Error: {e}", file=sys.stderr)
+            return 1
+        finally:
+            server.shutdown()
+        wall_seconds = time.perf_counter() - start
+        calls = list(llm_metrics.read_log(metrics_log)) if metrics_log.exists() else []
+    print(format_report(results, wall_seconds, len(results), serial))
+    if calls:
+        print()
+        print(llm_metrics.format_report(llm_metrics.aggregate(calls, ["stage"]), ["stage"]))
+    stats = server.mock.stats()
+    print(f"mock LLM: {stats['requests']} requests, {stats['latency_seconds']:.1f}s simulated latency")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,9 @@
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def llm_metrics_log(tmp_path, monkeypatch):
+    """Keep LLM call records made during tests out of the default log in the source tree."""
+    path = tmp_path / "llm_metrics.jsonl"
+    monkeypatch.setenv("LLM_METRICS_LOG", str(path))
+    return path
@@ -1,7 +1,9 @@
 from pathlib import Path
 import yaml
 from mk_utils import mk_agent, get_single_prompt, OpenRouterAgent, extract_python_code, get_config, get_file
+from llm_metrics import llm_stage
 
+@llm_stage("main")
 def generate_main(graph_name, graph_spec):
     """Generate main code from graph spec and all dependencies using LLM"""
     print(f"generate_main called with graph_name='{graph_name}'", flush=True)
@@ -1,9 +1,167 @@
+import ast
+import json
+import time
+import asyncio
+import hashlib
 from pathlib import Path
 import yaml
-from mk_utils import mk_agent, get_single_prompt, OpenRouterAgent, extract_python_code, get_config, prepare_working_folder
+import re
+from mk_utils import mk_chat_agent, get_single_prompt, OpenRouterAgent, extract_python_code, get_config, prepare_working_folder
+from mk_utils import mock_llm_url
+from mk_utils import unit_generator, parse_transition
+from llm_cache import get_cache
+from llm_metrics import llm_stage
 
-def generate_node_code(graph_name, graph_spec):
-    """Generate node code from graph spec, state spec, state code, and node spec using LLM"""
+# Node functions generated at once, unless the config's code section sets 'concurrency'
+DEFAULT_CONCURRENCY = 8
+
+# node_hash() of what each node function was generated from
+MANIFEST_FILE = "node_code.manifest.json"
+
+HEADING = re.compile(r"^(#+)\s+`?([A-Za-z_][A-Za-z0-9_]*)`?\s*$", re.MULTILINE)
+
+
+def graph_nodes(graph_spec):
+    """
+    Node functions to generate, in graph order, each with the spec units
+    that mention it: ``{node: [(graph_line, comments), ...]}``.
+    """
+    nodes = {}
+    first_line = True
+    for line, comments in unit_generator(graph_spec.strip()):
+        if not line.strip():
+            continue
+        transition = parse_transition(line, is_first_line=first_line)
+        first_line = False
+        for node in transition.get_source_nodes() + transition.get_dest_nodes():
+            if node not in ("START", "END"):
+                nodes.setdefault(node, []).append((transition.line, comments))
+    return nodes
+
+
+def node_spec_section(node_spec, node):
+    """The part of node-spec.md under the heading naming ``node``, or all of it when there is none."""
+    for match in HEADING.finditer(node_spec):
+        if match.group(2) == node:
+            level = len(match.group(1))
+            end = len(node_spec)
+            for following in re.finditer(r"^(#+)\s", node_spec[match.end():], re.MULTILINE):
+                if len(following.group(1)) <= level:
+                    end = match.end() + following.start()
+                    break
+            return node_spec[match.start():end].strip()
+    return node_spec
+
+
+def format_units(units):
+    return "\n".join(
+        "".join(f"# {comment}\n" for comment in comments.splitlines()) + line for line, comments in units
+    )
+
+
+def node_hash(units, node_spec, context, llm_provider, llm_model, endpoint=None):
+    """
+    What a node function depends on: its own spec units, its section of
+    node-spec.md, the provider and model (and ``endpoint``, the mock server's
+    URL when one answers instead), and the texts every request is built from
+    (``context``: state code, state spec, prompt templates and examples).
+    Other nodes' lines and node specs are left out, so editing one line only
+    invalidates the nodes on it.
+    """
+    text = json.dumps([units, node_spec, [hashlib.sha256(c.encode()).hexdigest() for c in context],
+                       llm_provider, llm_model, endpoint])
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+def assemble_node_code(node_codes):
+    """
+    One module from per-node code, in the order given.
+
+    Top-level imports are hoisted and deduplicated; everything else is kept
+    in node order, so the result depends only on the graph, not on which
+    request finished first.
+    """
+    imports, bodies = [], []
+    for node, code in node_codes:
+        try:
+            tree = ast.parse(code)
+        except SyntaxError:
+            print(f"WARNING: code for {node} does not parse, keeping it as is", flush=True)
+            bodies.append(code.strip())
+            continue
+        lines = code.splitlines()
+        import_lines = set()
+        for statement in tree.body:
+            if isinstance(statement, (ast.Import, ast.ImportFrom)):
+                text = "\n".join(lines[statement.lineno - 1:statement.end_lineno])
+                if text not in imports:
+                    imports.append(text)
+                import_lines.update(range(statement.lineno - 1, statement.end_lineno))
+        bodies.append("\n".join(line for i, line in enumerate(lines) if i not in import_lines).strip())
+    return "\n".join(imports) + "\n\n\n" + "\n\n\n".join(bodies) + "\n"
+
+
+def generate_one_node(graph_name, node, units, node_spec, prompt, request_prompt, llm_provider, llm_model):
+    """Ask the LLM for a single node function; returns its code"""
+    # A chat agent, without FileTools: concurrent requests must not write node_code.py themselves.
+    # Agents keep conversation state, so each request gets its own.
+    agent = mk_chat_agent(llm_provider, llm_model, system_prompt=prompt)
+    request = request_prompt.format(node=node, transitions=format_units(units),
+                                    node_spec=node_spec_section(node_spec, node))
+    result = agent.run(request)
+    if isinstance(agent, OpenRouterAgent):
+        text = result.choices[0].message.content
+    else:
+        text = result.content
+    code = extract_python_code(text)
+    if not code.strip():
+        raise ValueError(f"No python code returned for node {node}")
+    return code
+
+
+async def generate_nodes_concurrently(graph_name, nodes, node_spec, prompt, request_prompt, llm_provider, llm_model,
+                                      concurrency=DEFAULT_CONCURRENCY, on_done=None):
+    """
+    Run one request per node, at most ``concurrency`` at a time; results are in ``nodes`` order.
+
+    ``on_done(node, code)`` is called as each request finishes.  When a request
+    fails, the others still run to the end before its exception is raised.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(node, units):
+        async with semaphore:
+            start = time.perf_counter()
+            code = await asyncio.to_thread(generate_one_node, graph_name, node, units, node_spec, prompt,
+                                           request_prompt, llm_provider, llm_model)
+            print(f"Generated {node} in {time.perf_counter() - start:.1f}s", flush=True)
+            if on_done:
+                on_done(node, code)
+            return node, code
+
+    results = await asyncio.gather(*(one(node, units) for node, units in nodes.items()), return_exceptions=True)
+    for result in results:
+        if isinstance(result, BaseException):
+            raise result
+    return results
+
+
+@llm_stage("node_code")
+def generate_node_code(graph_name, graph_spec, concurrency=None):
+    """
+    Generate node code from graph spec, state spec, state code, and node spec using LLM.
+
+    Each node function is its own LLM request, built from the config's
+    node_function_prompt (the system prompt) and node_function_request.  The
+    requests run concurrently (``concurrency`` at a time, default from the
+    config's code section) and the results are assembled into node_code.py
+    in graph order.
+
+    Generated functions are stored in the graph's response cache under
+    node_hash(), and node_code.manifest.json records each node's hash.  A node
+    whose spec units, node spec section, state and prompts are unchanged is
+    reused, not re-requested.
+    """
     print(f"generate_node_code called with graph_name='{graph_name}'", flush=True)
     
     # Prepare working folder and get config
@@ -70,10 +228,9 @@ def generate_node_code(graph_name, graph_spec):
     # Get LLM configuration for code generation (using 'code' section like mk_node_code.py)
     print("Getting LLM configuration...", flush=True)
     code_config = config.get('code', {})
-    agent_library = code_config.get('agent_library', 'agno')
     llm_provider = code_config.get('llm_provider', 'anthropic')
     llm_model = code_config.get('llm_model', 'claude-3-sonnet-20240229')
-    print(f"LLM config: library={agent_library}, provider={llm_provider}, model={llm_model}", flush=True)
+    print(f"LLM config: provider={llm_provider}, model={llm_model}", flush=True)
     
     # Get prompts from config
     print("Getting prompts from config...", flush=True)
@@ -84,21 +241,22 @@ def generate_node_code(graph_name, graph_spec):
         human_input_example = get_single_prompt(config, 'human_input_example')
         print(f"Got human_input_example: {human_input_example is not None}", flush=True)
         
-        node_code_prompt = get_single_prompt(config, 'node_code')
-        print(f"Got node_code_prompt: {node_code_prompt is not None}", flush=True)
-        
         node_code_example = get_single_prompt(config, 'node_code_example')
         print(f"Got node_code_example: {node_code_example is not None}", flush=True)
         
-        if node_code_prompt and graph_notation:
-            prompt = node_code_prompt.format(
+        # One function per request: a system prompt for the graph, a request per node
+        node_function_prompt = get_single_prompt(config, 'node_function')
+        print(f"Got node_function_prompt: {node_function_prompt is not None}", flush=True)
+        request_prompt = get_single_prompt(config, 'node_function_request')
+        print(f"Got node_function_request: {request_prompt is not None}", flush=True)
+        
+        if node_function_prompt and request_prompt and graph_notation:
+            prompt = node_function_prompt.format(
                 graph_notation=graph_notation,
                 graph_name=graph_name,
                 graph_spec=graph_spec,
                 state_spec=state_spec,
                 state_code=state_code,
-                node_spec=node_spec,
-                model_name=llm_model,
                 human_input_example=human_input_example,
                 node_code_example=node_code_example
             )
@@ -110,61 +268,49 @@ def generate_node_code(graph_name, graph_spec):
         print(f"ERROR getting prompts: {e}", flush=True)
         raise ValueError(f"Error getting prompts: {str(e)}")
     
-    # Create agent (using system_prompt like mk_node_code.py)
-    print("Creating agent...", flush=True)
-    try:
-        agent = mk_agent(graph_name, llm_provider, llm_model, agent_library, system_prompt=prompt)
-        print(f"Agent created successfully: {type(agent)}", flush=True)
-    except Exception as e:
-        print(f"ERROR creating agent: {e}", flush=True)
-        raise ValueError(f"Error creating agent: {str(e)}")
-    
-    # Run agent
-    print("Running agent...", flush=True)
-    try:
-        result = agent.run(prompt)
-        print(f"Agent run completed: {type(result)}", flush=True)
-    except Exception as e:
-        print(f"ERROR running agent: {e}", flush=True)
-        raise
-    
-    # Extract content based on agent type
-    print("Extracting content based on agent type...", flush=True)
+    nodes = graph_nodes(graph_spec)
+    if not nodes:
+        raise ValueError("No nodes found in graph spec")
+    if concurrency is None:
+        concurrency = code_config.get('concurrency', DEFAULT_CONCURRENCY)
+    cache = get_cache(str(Path(graph_name) / "llm_cache"))
+    context = [state_code, state_spec, node_function_prompt.template, request_prompt.template,
+               graph_notation or "", human_input_example or "", node_code_example or ""]
+    hashes = {node: node_hash(units, node_spec_section(node_spec, node), context, llm_provider, llm_model,
+                              mock_llm_url())
+              for node, units in nodes.items()}
+    manifest_file = Path(graph_name) / MANIFEST_FILE
+    previous = json.loads(manifest_file.read_text())["nodes"] if manifest_file.exists() else {}
+    reused = {}
+    for node in nodes:
+        code = cache.get(hashes[node])
+        if code is not None:
+            reused[node] = code
+    changed = [node for node in nodes if previous.get(node) != hashes[node]]
+    print(f"Changed since last generation: {', '.join(changed) or 'none'}", flush=True)
+    to_generate = {node: units for node, units in nodes.items() if node not in reused}
+    print(f"Reusing {len(reused)} cached node functions, generating {len(to_generate)}, "
+          f"{concurrency} at a time...", flush=True)
+
+    start = time.perf_counter()
     try:
-        node_code_file = Path(graph_name) / "node_code.py"
-        
-        if isinstance(agent, OpenRouterAgent):
-            print("Processing OpenRouterAgent result", flush=True)
-            code = extract_python_code(result.choices[0].message.content)
-            # Write to file
-            node_code_file.parent.mkdir(parents=True, exist_ok=True)
-            with open(node_code_file, "w") as f:
-                f.write(code)
-            print("OpenRouterAgent content written to file", flush=True)
-            content = code
-        else:
-            print("Processing Agno agent result", flush=True)
-            # Agno agent writes file directly
-            if node_code_file.exists():
-                with open(node_code_file, "r") as f:
-                    content = f.read()
-                print("Agno agent content read from file", flush=True)
-            else:
-                print("ERROR: Node code file was not created by Agno agent", flush=True)
-                raise ValueError("Node code file was not created")
-        
-        # Verify file exists and is not empty
-        if not node_code_file.exists():
-            print("ERROR: node_code.py does not exist", flush=True)
-            raise ValueError("node_code.py was not created")
-        
-        if node_code_file.stat().st_size == 0:
-            print("ERROR: node_code.py is empty", flush=True)
-            raise ValueError("node_code.py is empty")
-            
+        generated = asyncio.run(generate_nodes_concurrently(
+            graph_name, to_generate, node_spec, prompt, request_prompt, llm_provider, llm_model, concurrency,
+            # cached as each request finishes, so a failed run keeps the nodes that completed
+            on_done=lambda node, code: cache.put(hashes[node], code, llm_provider, llm_model)))
     except Exception as e:
-        print(f"ERROR extracting content: {e}", flush=True)
+        print(f"ERROR generating node code: {e}", flush=True)
         raise
-    
+    print(f"Node functions generated in {time.perf_counter() - start:.1f}s", flush=True)
+    generated = dict(generated)
+    node_codes = [(node, reused[node] if node in reused else generated[node]) for node in nodes]
+    manifest_file.write_text(json.dumps({"nodes": hashes}, indent=2) + "\n")
+
+    content = assemble_node_code(node_codes)
+    node_code_file = Path(graph_name) / "node_code.py"
+    node_code_file.parent.mkdir(parents=True, exist_ok=True)
+    with open(node_code_file, "w") as f:
+        f.write(content)
+
     print(f"Returning content ({len(content)} characters)", flush=True)
-    return content
\ No newline at end of file
+    return content
@@ -1,7 +1,9 @@
 from pathlib import Path
 import yaml
 from mk_utils import mk_agent, get_single_prompt, OpenRouterAgent, get_config
+from llm_metrics import llm_stage
 
+@llm_stage("node_spec")
 def generate_node_spec(graph_name, graph_spec):
     """Generate node specification from graph spec and state spec using LLM"""
     print(f"generate_node_spec called with graph_name='{graph_name}'", flush=True)
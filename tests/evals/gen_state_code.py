@@ -1,7 +1,9 @@
 from pathlib import Path
 import yaml
 from mk_utils import mk_agent, get_single_prompt, OpenRouterAgent, extract_python_code, get_config, get_tools
+from llm_metrics import llm_stage
 
+@llm_stage("state_code")
 def generate_state_code(graph_name, graph_spec):
     """Generate state code from graph spec and state spec using LLM"""
     print(f"generate_state_code called with graph_name='{graph_name}'", flush=True)
@@ -1,7 +1,9 @@
 from pathlib import Path
 import yaml
 from mk_utils import parse_graph, validate_graph, mk_agent, get_single_prompt, OpenRouterAgent, prepare_working_folder, get_tools
+from llm_metrics import llm_stage
 
+@llm_stage("state_spec")
 def generate_state_spec(graph_name, graph_spec):
     """Generate state specification from graph spec using LLM"""
     print(f"generate_state_spec called with graph_name='{graph_name}'", flush=True)
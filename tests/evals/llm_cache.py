@@ -1,47 +1,202 @@
 import os
+import time
+import zlib
 import pickle
+import sqlite3
 import hashlib
 import functools
-from typing import Callable, Any
+import threading
+from dataclasses import dataclass
+from typing import Callable, Any, Optional
 
-def cache_llm_response(cache_dir: str = None):
+try:
+    import llm_metrics
+except ImportError:  # a generated graph folder without llm_metrics.py
+    llm_metrics = None
+
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024  # compressed payload bytes kept before LRU eviction
+DEFAULT_TTL = 30 * 24 * 3600           # seconds an entry lives after it was written
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    provider TEXT NOT NULL,
+    model TEXT NOT NULL,
+    payload BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    created REAL NOT NULL,
+    accessed REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed);
+"""
+
+
+@dataclass
+class CacheStats:
+    """Hit/miss counters and time spent, for this process."""
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    hit_seconds: float = 0.0   # lookups that hit, including unpickling
+    miss_seconds: float = 0.0  # calls to the LLM on a miss
+
+    def __str__(self):
+        lookups = self.hits + self.misses
+        rate = f"{100 * self.hits / lookups:.0f}%" if lookups else "-"
+        return (f"{self.hits} hits, {self.misses} misses ({rate} hit rate), {self.evictions} evicted; "
+                f"{self.hit_seconds:.3f}s serving hits, {self.miss_seconds:.3f}s calling the LLM")
+
+
+class LLMCache:
+    """
+    LLM responses in one SQLite database, shared safely by several processes.
+
+    The database runs in WAL mode, so readers never block the writer, and
+    each write is a single transaction, so a crashed process never leaves a
+    half-written entry.  Payloads are zlib-compressed pickles.  Entries older
+    than ``ttl`` seconds are ignored and deleted; when the payloads exceed
+    ``max_bytes`` the least recently used entries are evicted.
+    """
+    def __init__(self, path: str, max_bytes: int = DEFAULT_MAX_BYTES, ttl: Optional[float] = DEFAULT_TTL):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.stats = CacheStats()
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with self._connection() as conn:
+            conn.executescript(SCHEMA)
+
+    def _connection(self):
+        # sqlite3 connections can't be shared between threads; one per thread
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def key(provider: str, model: str, prompt: str, endpoint: Optional[str] = None, **kwargs) -> str:
+        """``endpoint``: a base URL other than the provider's own, e.g. the mock server's."""
+        parts = [provider, model, prompt, repr(sorted(kwargs.items()))]
+        if endpoint:
+            parts.insert(2, endpoint)
+        return hashlib.sha256("\0".join(parts).encode()).hexdigest()
+
+    def get(self, key: str) -> Any:
+        """The cached response, or None."""
+        conn = self._connection()
+        now = time.time()
+        row = conn.execute("SELECT payload, created FROM responses WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        payload, created = row
+        if self.ttl is not None and now - created > self.ttl:
+            conn.execute("DELETE FROM responses WHERE key = ? AND created = ?", (key, created))
+            self.stats.evictions += 1
+            return None
+        conn.execute("UPDATE responses SET accessed = ? WHERE key = ?", (now, key))
+        return pickle.loads(zlib.decompress(payload))
+
+    def put(self, key: str, value: Any, provider: str = "unknown", model: str = "unknown"):
+        payload = zlib.compress(pickle.dumps(value))
+        now = time.time()
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute(
+                "INSERT OR REPLACE INTO responses (key, provider, model, payload, size, created, accessed) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, provider, model, payload, len(payload), now, now),
+            )
+            self._evict(conn, now)
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    def _evict(self, conn, now):
+        """Drop expired entries, then least recently used ones until under max_bytes."""
+        if self.ttl is not None:
+            self.stats.evictions += conn.execute(
+                "DELETE FROM responses WHERE created < ?", (now - self.ttl,)).rowcount
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        excess = total - self.max_bytes
+        victims = []
+        for key, size in conn.execute("SELECT key, size FROM responses ORDER BY accessed"):
+            victims.append((key,))
+            excess -= size
+            if excess <= 0:
+                break
+        conn.executemany("DELETE FROM responses WHERE key = ?", victims)
+        self.stats.evictions += len(victims)
+
+    def __len__(self):
+        return self._connection().execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+    def size(self) -> int:
+        """Total compressed payload bytes."""
+        return self._connection().execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+
+    def clear(self):
+        self._connection().execute("DELETE FROM responses")
+
+
+_caches = {}
+
+
+def get_cache(cache_dir: str = None, **options) -> LLMCache:
+    """The process-wide cache for ``cache_dir`` (default: ``llm_cache`` next to this file)."""
+    if cache_dir is None:
+        cache_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "llm_cache")
+    path = os.path.join(cache_dir, "responses.db")
+    if path not in _caches:
+        _caches[path] = LLMCache(path, **options)
+    return _caches[path]
+
+
+def cache_llm_response(cache_dir: str = None, **options):
     """
     Decorator for caching LLM responses.
-    
+
     Args:
-        cache_dir: Directory for storing cached responses. If None, will use 'llm_cache' 
-                  in the current working directory
+        cache_dir: Directory holding the cache database. If None, will use 'llm_cache'
+                  next to this file
+        options: max_bytes / ttl for the LLMCache
     """
     def decorator(func: Callable):
         @functools.wraps(func)
         def wrapper(self, prompt: str, **kwargs):
-            # Get provider and model from the instance
+            # Get provider, model and any endpoint override from the instance
             provider = getattr(self, 'provider', 'unknown')
             model = getattr(self, 'model', 'unknown')
-            
-            # Get the directory where this file (llm_cache.py) is located
-            current_dir = os.path.dirname(os.path.abspath(__file__))
-            # Create cache in the current directory
-            actual_cache_dir = os.path.join(current_dir, "llm_cache")
-            os.makedirs(actual_cache_dir, exist_ok=True)
-            
-            # Create a unique hash based on provider, model, and prompt
-            cache_key = f"{provider}_{model}_{prompt}"
-            prompt_hash = hashlib.md5(cache_key.encode()).hexdigest()
-            cache_file = os.path.join(actual_cache_dir, f"{prompt_hash}.pickle")
-            
-            # Check if we have a cached response
-            if os.path.exists(cache_file):
-                print(f"Cache hit for {provider}/{model} in {os.path.basename(os.path.dirname(actual_cache_dir))}: {prompt_hash}")
-                with open(cache_file, 'rb') as f:
-                    return pickle.load(f)
-            
+            cache = get_cache(cache_dir, **options)
+            key = LLMCache.key(provider, model, prompt, getattr(self, 'base_url', None), **kwargs)
+
+            start = time.perf_counter()
+            response = cache.get(key)
+            if response is not None:
+                cache.stats.hits += 1
+                cache.stats.hit_seconds += time.perf_counter() - start
+                if llm_metrics:
+                    llm_metrics.record("invoke", provider, model, time.perf_counter() - start, response,
+                                       cache_hit=True)
+                print(f"Cache hit for {provider}/{model}: {key[:12]}")
+                return response
+
             # If no cache exists, call the original function and cache the result
+            start = time.perf_counter()
             response = func(self, prompt, **kwargs)
-            print(f"Cache miss for {provider}/{model} in {os.path.basename(os.path.dirname(actual_cache_dir))}: {prompt_hash}")
-            with open(cache_file, 'wb') as f:
-                pickle.dump(response, f)
-            
+            cache.stats.misses += 1
+            cache.stats.miss_seconds += time.perf_counter() - start
+            if llm_metrics:
+                llm_metrics.record("invoke", provider, model, time.perf_counter() - start, response)
+            print(f"Cache miss for {provider}/{model}: {key[:12]}")
+            cache.put(key, response, provider, model)
             return response
         return wrapper
     return decorator
@@ -53,8 +208,15 @@ class UnifiedLLM:
     def __init__(self, provider: str, model: str):
         self.provider = provider
         self.model = model
-        
-        if provider == "openai":
+
+        mock_url = os.environ.get("MOCK_LLM_BASE_URL")
+        # Part of the cache key, so mock responses never answer real requests
+        self.base_url = mock_url or None
+        if mock_url:
+            # mock_llm_server.py speaks the OpenAI API for every provider
+            from langchain_openai import ChatOpenAI
+            self._llm = ChatOpenAI(base_url=mock_url, api_key="mock", model=model)
+        elif provider == "openai":
             from langchain_openai import ChatOpenAI
             self._llm = ChatOpenAI(model=model)
         elif provider == "anthropic":
@@ -65,12 +227,12 @@ class UnifiedLLM:
             self._llm = ChatOpenAI(base_url="https://openrouter.ai/api/v1", model=model)
         else:
             raise ValueError(f"Unexpected provider, expected one of 'openai', 'anthropic', 'openrouter', got '{provider}'")
-    
+
     @cache_llm_response()
     def invoke(self, prompt: str, **kwargs):
         """Invoke the LLM with caching"""
         return self._llm.invoke(prompt, **kwargs)
-    
+
 
 def make_llm(provider: str, model: str):
-    return UnifiedLLM(provider, model)
\ No newline at end of file
+    return UnifiedLLM(provider, model)
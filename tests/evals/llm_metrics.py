@@ -0,0 +1,195 @@
+"""
+Per-call accounting for the LLM calls made by the eval pipeline.
+
+Every call through UnifiedLLM.invoke, OpenRouterAgent.run or an agent made
+by mk_agent appends one JSON line to the metrics log (LLM_METRICS_LOG, by
+default llm_metrics.jsonl next to this file):
+
+    {"time": ..., "stage": "node_code", "graph": "routing", "kind": "agent",
+     "provider": "anthropic", "model": "claude-sonnet-4-20250514", "cache_hit": false,
+     "latency": 12.4, "prompt_tokens": 5210, "response_tokens": 803, "cost": 0.0277}
+
+The stage and graph come from the gen_* function running the call (see
+llm_stage).  Lines are appended with a single write, so concurrent stages
+can share the log.  Summarize it with:
+
+    python llm_metrics.py report --by stage,model
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import functools
+import contextvars
+from pathlib import Path
+from contextlib import contextmanager
+
+LOG_ENV = "LLM_METRICS_LOG"
+DEFAULT_LOG = Path(__file__).resolve().parent / "llm_metrics.jsonl"
+
+# USD per million (prompt, response) tokens; calls to other models have no cost
+PRICES = {
+    "claude-sonnet-4-20250514": (3.0, 15.0),
+    "claude-3-7-sonnet-latest": (3.0, 15.0),
+    "gpt-4.1": (2.0, 8.0),
+    "gpt-4.1-mini": (0.4, 1.6),
+    "gpt-4.1-nano": (0.1, 0.4),
+}
+
+_stage = contextvars.ContextVar("llm_stage", default=(None, None))
+
+
+def log_path():
+    return Path(os.environ.get(LOG_ENV) or DEFAULT_LOG)
+
+
+@contextmanager
+def stage(name, graph=None):
+    """Attribute LLM calls made inside the block to ``name`` and ``graph``."""
+    token = _stage.set((name, graph))
+    try:
+        yield
+    finally:
+        _stage.reset(token)
+
+
+def llm_stage(name):
+    """Decorator for gen_* functions taking ``graph_name`` first: their calls count toward ``name``."""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(graph_name, *args, **kwargs):
+            with stage(name, graph_name):
+                return func(graph_name, *args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def _get(obj, name):
+    return obj.get(name) if isinstance(obj, dict) else getattr(obj, name, None)
+
+
+def _total(value):
+    # agno keeps per-message lists in its run metrics
+    if isinstance(value, (list, tuple)):
+        return sum(v or 0 for v in value)
+    return value
+
+
+def token_counts(result):
+    """``(prompt_tokens, response_tokens)`` from an OpenAI completion, agno run or LangChain message."""
+    usage = _get(result, "usage")  # OpenAI chat completion
+    if usage is not None:
+        return _get(usage, "prompt_tokens"), _get(usage, "completion_tokens")
+    metrics = _get(result, "metrics")  # agno RunResponse
+    if metrics:
+        return _total(_get(metrics, "input_tokens")), _total(_get(metrics, "output_tokens"))
+    usage = _get(result, "usage_metadata")  # LangChain AIMessage
+    if usage:
+        return _get(usage, "input_tokens"), _get(usage, "output_tokens")
+    return None, None
+
+
+def cost(model, prompt_tokens, response_tokens):
+    if model not in PRICES or prompt_tokens is None or response_tokens is None:
+        return None
+    prompt_price, response_price = PRICES[model]
+    return (prompt_tokens * prompt_price + response_tokens * response_price) / 1_000_000
+
+
+def record(kind, provider, model, latency, result=None, cache_hit=False):
+    """Append one call to the metrics log."""
+    prompt_tokens, response_tokens = token_counts(result) if result is not None else (None, None)
+    stage_name, graph = _stage.get()
+    entry = {
+        "time": time.time(), "stage": stage_name, "graph": graph, "kind": kind,
+        "provider": provider, "model": model, "cache_hit": cache_hit, "latency": latency,
+        "prompt_tokens": prompt_tokens, "response_tokens": response_tokens,
+        "cost": 0.0 if cache_hit else cost(model, prompt_tokens, response_tokens),
+    }
+    path = log_path()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # one O_APPEND write per line keeps lines from different processes whole
+    fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+    try:
+        os.write(fd, (json.dumps(entry) + "\n").encode())
+    finally:
+        os.close(fd)
+    return entry
+
+
+def timed(kind, provider, model, call, *args, **kwargs):
+    """Run ``call(*args, **kwargs)`` and record it."""
+    start = time.perf_counter()
+    result = call(*args, **kwargs)
+    record(kind, provider, model, time.perf_counter() - start, result)
+    return result
+
+
+def instrument_agent(agent, provider, model):
+    """Record every ``agent.run`` of an agno agent."""
+    run = agent.run
+
+    @functools.wraps(run)
+    def instrumented_run(*args, **kwargs):
+        return timed("agent", provider, model, run, *args, **kwargs)
+    agent.run = instrumented_run
+    return agent
+
+
+def read_log(path=None):
+    with open(path or log_path(), "r") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                yield json.loads(line)
+
+
+def aggregate(entries, by=("stage",)):
+    """``{group key tuple: totals}`` over calls, cache hits, tokens, latency and cost."""
+    groups = {}
+    for entry in entries:
+        key = tuple(str(entry.get(field)) for field in by)
+        totals = groups.setdefault(key, {"calls": 0, "cache_hits": 0, "prompt_tokens": 0,
+                                         "response_tokens": 0, "latency": 0.0, "cost": 0.0})
+        totals["calls"] += 1
+        totals["cache_hits"] += bool(entry.get("cache_hit"))
+        totals["prompt_tokens"] += entry.get("prompt_tokens") or 0
+        totals["response_tokens"] += entry.get("response_tokens") or 0
+        totals["latency"] += entry.get("latency") or 0.0
+        totals["cost"] += entry.get("cost") or 0.0
+    return groups
+
+
+def format_report(groups, by):
+    header = "".join(f"{field:28s}" for field in by)
+    lines = [f"{header}{'calls':>7s} {'hits':>5s} {'prompt tok':>11s} {'resp tok':>9s} "
+             f"{'total s':>9s} {'mean s':>7s} {'cost $':>9s}"]
+    for key, t in sorted(groups.items(), key=lambda item: -item[1]["latency"]):
+        lines.append("".join(f"{value[:27]:28s}" for value in key)
+                     + f"{t['calls']:7d} {t['cache_hits']:5d} {t['prompt_tokens']:11d} {t['response_tokens']:9d} "
+                       f"{t['latency']:9.1f} {t['latency'] / t['calls']:7.2f} {t['cost']:9.4f}")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="LLM call accounting for the eval pipeline")
+    commands = parser.add_subparsers(dest="command", required=True)
+    report = commands.add_parser("report", help="Aggregate the metrics log")
+    report.add_argument("--log", help=f"Metrics log (default ${LOG_ENV} or {DEFAULT_LOG.name})")
+    report.add_argument("--by", default="stage", help="Comma-separated fields: stage, graph, model, provider, kind")
+    report.add_argument("--graph", help="Only calls for this graph")
+    args = parser.parse_args(argv)
+
+    by = [field.strip() for field in args.by.split(",") if field.strip()]
+    try:
+        entries = [e for e in read_log(args.log) if not args.graph or e.get("graph") == args.graph]
+    except FileNotFoundError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    print(format_report(aggregate(entries, by), by))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
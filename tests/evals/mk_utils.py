@@ -3,7 +3,6 @@ import sys
 import re
 import yaml
 from colorama import init, Fore, Style
-from langsmith import Client
 from pathlib import Path
 from agno.agent import Agent
 from agno.tools.file import FileTools
@@ -15,6 +14,18 @@ from dataclasses import dataclass
 from typing import List, Set, Optional, Tuple
 from langchain_openai import ChatOpenAI
 import questionary
+from prompt_cache import default_prompt_cache
+import llm_metrics
+
+# When set, every provider is sent to this OpenAI-compatible URL (see mock_llm_server.py)
+MOCK_LLM_ENV = "MOCK_LLM_BASE_URL"
+DEFAULT_MOCK_LLM_URL = "http://127.0.0.1:8765/v1"
+
+# Prompts for per-node generation (gen_node_code.py), as in default.yaml
+DEFAULT_NODE_FUNCTION_PROMPTS = {
+    'node_function_prompt': "file:prompts/node-function-prompt.md",
+    'node_function_request': "file:prompts/node-function-request.md",
+}
 
 def get_tools(config, category):
     agent_library = config[category]['agent_library']
@@ -26,13 +37,13 @@ def get_tools(config, category):
     return agent_library, llm_provider, llm_model
 
 def get_prompt(prompt_name, template_only=False):
-    client = Client()
     if prompt_name.startswith("hub:"):
-        prompt = client.pull_prompt(prompt_name[4:])
+        # served from the local prompt cache, revalidated against the hub (see prompt_cache.py)
+        template, template_format = default_prompt_cache().get(prompt_name[4:])
         if template_only:
-            return prompt.messages[0].prompt.template
+            return template
         else:
-            return prompt.messages[0].prompt
+            return PromptTemplate.from_template(template, template_format=template_format)
     elif prompt_name.startswith("file:"):
         print(f"{Fore.CYAN}Reading: {Fore.BLUE}{prompt_name[5:]}{Style.RESET_ALL}")
         with open(prompt_name[5:], "r") as f:
@@ -56,6 +67,7 @@ def get_single_prompt(config, prompt_type):
             - 'state_code'
             - 'node_spec'
             - 'node_code'
+            - 'node_function', 'node_function_request' (one node function per request)
             - 'graph_spec'
             - 'graph_code'
             - 'main_code'
@@ -71,6 +83,8 @@ def get_single_prompt(config, prompt_type):
         'state_code': ('state_code_prompt', False),
         'node_spec': ('node_spec_prompt', False),
         'node_code': ('node_code_prompt', False),
+        'node_function': ('node_function_prompt', False),
+        'node_function_request': ('node_function_request', False),
         'graph_spec': ('graph_spec_prompt', False),
         'graph_code': ('graph_code_prompt', False),
         'main_code': ('main_code_prompt', False)
@@ -173,6 +187,10 @@ def get_config(graph_name):
     # read it
     with open(path_to_yaml, "r") as f:
         config = yaml.safe_load(f)
+        # exported so every agent, and the generated graph's UnifiedLLM, use the mock server
+        mock_llm = config.get('mock_llm') or {}
+        if mock_llm.get('enabled'):
+            os.environ.setdefault(MOCK_LLM_ENV, mock_llm.get('base_url', DEFAULT_MOCK_LLM_URL))
         # if that config doesn't have prompts, add the default prompts
         if 'prompts' not in config:
             config['prompts'] = {}
@@ -185,6 +203,9 @@ def get_config(graph_name):
             config['prompts']['node_code_prompt'] = "hub:johannes/lgcodegen-gen_node_code"
             config['prompts']['graph_spec_prompt'] = "hub:johannes/lgcodegen-gen_graph_spec"
             config['prompts']['graph_code_prompt'] = "hub:johannes/lgcodegen-gen_graph_code"
+        # graph configs copied from default.yaml before these prompts existed
+        for key, default in DEFAULT_NODE_FUNCTION_PROMPTS.items():
+            config['prompts'].setdefault(key, default)
     return config
 
 def read_file_and_get_subdir(file_path):
@@ -219,8 +240,10 @@ def read_file_and_get_subdir(file_path):
 from openai import OpenAI
 from types import SimpleNamespace
 class OpenRouterAgent:
-    def __init__(self, model_name, api_key, instructions=None):
-        self.client = OpenAI(base_url="https://openrouter.ai/api/v1", api_key=api_key)
+    def __init__(self, model_name, api_key, instructions=None, base_url="https://openrouter.ai/api/v1",
+                 provider="openrouter"):
+        self.client = OpenAI(base_url=base_url, api_key=api_key)
+        self.provider = provider
         self.model_name = model_name
         self.model = SimpleNamespace(id=model_name)
         self.instructions = instructions
@@ -228,7 +251,8 @@ class OpenRouterAgent:
         print(f"{Fore.CYAN}Running OpenRouter Agent with model {Fore.BLUE}{self.model_name}{Style.RESET_ALL}")
         print(f"Instructions: {Fore.BLUE}{self.instructions}{Style.RESET_ALL}")
         print(f"Prompt: {Fore.BLUE}{prompt}{Style.RESET_ALL}")
-        return self.client.chat.completions.create(
+        return llm_metrics.timed(
+            "openrouter", self.provider, self.model_name, self.client.chat.completions.create,
             model=self.model_name, 
             messages=[
                 {"role": "system", "content": self.instructions},
@@ -258,11 +282,22 @@ def extract_python_code(text):
 
 
 
+def mock_llm_url():
+    """Base URL of the mock LLM server when every provider should use it, else None"""
+    return os.environ.get(MOCK_LLM_ENV) or None
+
+
 def mk_agent(working_dir, llm_provider, llm_model, agent_library, system_prompt=None):
     print(f"  {Fore.CYAN}LLM Provider: {Fore.BLUE}{llm_provider}{Style.RESET_ALL}")
     print(f"  {Fore.CYAN}LLM Model: {Fore.BLUE}{llm_model}{Style.RESET_ALL}")
     print(f"  {Fore.CYAN}Agent Library: {Fore.BLUE}{agent_library}{Style.RESET_ALL}")
     system_prompt = system_prompt.replace("{", "{{").replace("}", "}}") if system_prompt else None
+
+    mock_url = mock_llm_url()
+    if mock_url:
+        # The mock server speaks the OpenAI API whatever the configured provider
+        print(f"{Fore.CYAN}Using mock LLM at {Fore.BLUE}{mock_url}{Style.RESET_ALL}")
+        return OpenRouterAgent(llm_model, "mock", instructions=system_prompt, base_url=mock_url, provider="mock")
     
     print(f"{Fore.CYAN}Writing files with Agno Agent + FileTools{Style.RESET_ALL}")
     if llm_provider == "anthropic":
@@ -284,9 +319,31 @@ def mk_agent(working_dir, llm_provider, llm_model, agent_library, system_prompt=
         agent = OpenRouterAgent(llm_model, os.getenv('OPENROUTER_API_KEY'))
     else:
         raise ValueError(f"Unsupported LLM provider: {llm_provider}")
+    if not isinstance(agent, OpenRouterAgent):  # OpenRouterAgent.run records its own calls
+        llm_metrics.instrument_agent(agent, llm_provider, llm_model)
     return agent
 
 
+def mk_chat_agent(llm_provider, llm_model, system_prompt=None):
+    """Like mk_agent, but without FileTools: the answer comes back as text and no files are written."""
+    mock_url = mock_llm_url()
+    if mock_url:
+        return OpenRouterAgent(llm_model, "mock", instructions=system_prompt, base_url=mock_url, provider="mock")
+    # agno formats its instructions, so braces in the prompt are escaped
+    instructions = [system_prompt.replace("{", "{{").replace("}", "}}")] if system_prompt else None
+    if llm_provider == "anthropic":
+        agent = Agent(model=Claude(id=llm_model), instructions=instructions)
+    elif llm_provider == "openai":
+        agent = Agent(model=OpenAIChat(id=llm_model), instructions=instructions)
+    elif llm_provider == "google":
+        agent = Agent(model=Gemini(id=llm_model), instructions=instructions)
+    elif llm_provider == 'openrouter':
+        return OpenRouterAgent(llm_model, os.getenv('OPENROUTER_API_KEY'), instructions=system_prompt)
+    else:
+        raise ValueError(f"Unsupported LLM provider: {llm_provider}")
+    return llm_metrics.instrument_agent(agent, llm_provider, llm_model)
+
+
 
 # solveit langgraph_DSL notebook
 def unit_generator(graph):
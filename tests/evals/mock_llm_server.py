@@ -0,0 +1,214 @@
+"""
+Local stand-in for an OpenAI-compatible LLM API.
+
+Serves POST /v1/chat/completions on localhost with canned or templated
+responses after a simulated latency, so the eval pipeline can run (and be
+benchmarked) without a live provider.  Turn it on for every stage with
+``mock_llm: enabled: true`` in the graph's yaml (see default.yaml), or by
+setting MOCK_LLM_BASE_URL.
+
+    python mock_llm_server.py --port 8765 --latency lognormal:0.5,0.4
+    python mock_llm_server.py --responses mock_responses.yaml --latency uniform:0.2,1.5
+
+Latency specs:
+    fixed:S                 always S seconds
+    uniform:LOW,HIGH        uniform between LOW and HIGH seconds
+    normal:MEAN,STDDEV      normal, clipped at 0
+    lognormal:MEDIAN,SIGMA  lognormal with the given median; long-tailed like real APIs
+
+A responses file is a list of ``{match: regex, response: text}``; the first
+rule whose regex matches the last user message wins.  In the response text
+{model}, {prompt_chars}, {request_number} and {prompt} (the last user
+message) are replaced; any other braces, such as those of a dict literal in
+canned code, are left as they are.  GET /stats returns request counts and the simulated
+latency served so far.
+"""
+import re
+import sys
+import json
+import math
+import time
+import random
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import yaml
+
+DEFAULT_PORT = 8765
+
+PLACEHOLDER = re.compile(r"\{(model|prompt_chars|request_number|prompt)\}")
+
+DEFAULT_RESPONSE = """Mock response from {model} to a {prompt_chars} character prompt.
+
+```python
+# mock code from {model}, request {request_number}
+```
+"""
+
+
+def parse_latency(spec):
+    """A function returning one latency sample in seconds, from a latency spec string."""
+    kind, _, args = spec.partition(":")
+    try:
+        values = [float(v) for v in args.split(",")] if args else []
+    except ValueError:
+        raise ValueError(f"Bad latency spec '{spec}'")
+    if kind == "fixed" and len(values) == 1:
+        return lambda: values[0]
+    if kind == "uniform" and len(values) == 2:
+        return lambda: random.uniform(*values)
+    if kind == "normal" and len(values) == 2:
+        return lambda: max(0.0, random.gauss(*values))
+    if kind == "lognormal" and len(values) == 2:
+        median, sigma = values
+        return lambda: random.lognormvariate(math.log(median), sigma)
+    raise ValueError(f"Bad latency spec '{spec}', expected fixed:S, uniform:LOW,HIGH, normal:MEAN,STDDEV "
+                     f"or lognormal:MEDIAN,SIGMA")
+
+
+def render(template, **values):
+    """Replace the {name} placeholders in one pass; the values themselves are never expanded."""
+    return PLACEHOLDER.sub(lambda match: str(values[match.group(1)]), template)
+
+
+def load_rules(path):
+    """Response rules from a yaml file: ``[(compiled regex, template), ...]``."""
+    if not path:
+        return []
+    with open(path, "r") as f:
+        rules = yaml.safe_load(f) or []
+    return [(re.compile(rule["match"], re.DOTALL), rule["response"]) for rule in rules]
+
+
+class MockLLM:
+    """Picks the response and latency for each request and keeps the counters for /stats."""
+    def __init__(self, latency="fixed:0", rules=(), default_response=DEFAULT_RESPONSE):
+        self.sample_latency = parse_latency(latency)
+        self.rules = list(rules)
+        self.default_response = default_response
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.latency_seconds = 0.0
+
+    def respond(self, body):
+        """Sleep for a latency sample, then return the completion for an OpenAI chat request body."""
+        messages = body.get("messages", [])
+        prompt = next((m.get("content") or "" for m in reversed(messages) if m.get("role") == "user"), "")
+        if isinstance(prompt, list):  # content parts
+            prompt = "".join(part.get("text", "") for part in prompt if isinstance(part, dict))
+        model = body.get("model", "mock")
+        with self.lock:
+            self.requests += 1
+            request_number = self.requests
+        template = next((response for pattern, response in self.rules if pattern.search(prompt)),
+                        self.default_response)
+        content = render(template, model=model, prompt_chars=len(prompt), request_number=request_number,
+                         prompt=prompt)
+        latency = self.sample_latency()
+        time.sleep(latency)
+        with self.lock:
+            self.latency_seconds += latency
+        prompt_tokens = sum(len(str(m.get("content") or "")) for m in messages) // 4
+        completion_tokens = len(content) // 4
+        return {
+            "id": f"mock-{request_number}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": "stop",
+            }],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens,
+            },
+        }
+
+    def stats(self):
+        with self.lock:
+            return {"requests": self.requests, "latency_seconds": self.latency_seconds}
+
+
+def make_handler(mock):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def _send_json(self, status, payload):
+            data = json.dumps(payload).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_GET(self):
+            if self.path.rstrip("/").endswith("/stats"):
+                self._send_json(200, mock.stats())
+            elif self.path.rstrip("/").endswith("/models"):
+                self._send_json(200, {"object": "list", "data": [{"id": "mock", "object": "model"}]})
+            else:
+                self._send_json(404, {"error": {"message": f"Unknown path {self.path}"}})
+
+        def do_POST(self):
+            length = int(self.headers.get("Content-Length", 0))
+            try:
+                body = json.loads(self.rfile.read(length) or b"{}")
+            except json.JSONDecodeError as e:
+                self._send_json(400, {"error": {"message": f"Bad JSON: {e}"}})
+                return
+            if not self.path.rstrip("/").endswith("/chat/completions"):
+                self._send_json(404, {"error": {"message": f"Unknown path {self.path}"}})
+                return
+            try:
+                completion = mock.respond(body)
+            except Exception as e:
+                # a bad rule or request shouldn't drop the client's connection
+                self._send_json(500, {"error": {"message": f"Mock response failed: {type(e).__name__}: {e}"}})
+                return
+            self._send_json(200, completion)
+
+        def log_message(self, format, *args):
+            pass  # one line per request drowns out the pipeline's own output
+
+    return Handler
+
+
+def start_server(port=0, latency="fixed:0", responses=None):
+    """Start the server on a background thread; returns ``(server, base_url)``.
+
+    With port 0 a free port is picked.  Stop it with ``server.shutdown()``.
+    """
+    mock = MockLLM(latency, load_rules(responses))
+    server = ThreadingHTTPServer(("127.0.0.1", port), make_handler(mock))
+    server.daemon_threads = True
+    server.mock = mock
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/v1"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="OpenAI-compatible mock LLM server")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--latency", default="fixed:0", help="Latency distribution, e.g. lognormal:0.5,0.4")
+    parser.add_argument("--responses", help="yaml list of {match: regex, response: template}")
+    args = parser.parse_args(argv)
+    try:
+        server, base_url = start_server(args.port, args.latency, args.responses)
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    print(f"Mock LLM serving {base_url} (latency {args.latency})", flush=True)
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,173 @@
+"""
+Run the eval pipeline for a graph in one process.
+
+The makefile starts a fresh interpreter per stage, and each one imports
+langchain, agno and langsmith again.  This runner imports them once and runs
+the stages as a DAG: each stage lists the files it reads and the file it
+writes, stages whose inputs are ready run concurrently, and a stage is
+skipped when its inputs hash the same as when its output was last written
+(and the output is unchanged since).  Hashes are kept in
+``{graph}/pipeline.manifest.json``.
+
+    python pipeline.py routing.txt
+    python pipeline.py routing.txt jokester.txt --jobs 2
+    python pipeline.py routing.txt --force node_code,main
+
+Dependencies (from what each gen_* function reads):
+
+    state_spec -> state_code -> node_spec -> node_code, graph_code -> main
+
+node_spec reads the state class from the graph folder, so it waits for
+state_code; node_code and graph_code then run side by side.
+"""
+import sys
+import json
+import time
+import hashlib
+import argparse
+import importlib
+import threading
+from pathlib import Path
+from dataclasses import dataclass
+from typing import Callable, List, Union
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+MANIFEST_FILE = "pipeline.manifest.json"
+
+
+@dataclass(frozen=True)
+class Stage:
+    name: str
+    generate: Union[str, Callable]  # generate(graph_name, graph_spec), or "module:function"
+    inputs: List[str]               # files in the graph folder it reads
+    output: str                     # file in the graph folder it writes
+
+    def function(self):
+        if callable(self.generate):
+            return self.generate
+        module, function = self.generate.split(":")
+        return getattr(importlib.import_module(module), function)
+
+
+STAGES = [
+    Stage("state_spec", "gen_state_spec:generate_state_spec", [], "state-spec.md"),
+    Stage("state_code", "gen_state_code:generate_state_code", ["state-spec.md"], "state_code.py"),
+    Stage("node_spec", "gen_node_spec:generate_node_spec", ["state-spec.md", "state_code.py"], "node-spec.md"),
+    Stage("node_code", "gen_node_code:generate_node_code",
+          ["state-spec.md", "state_code.py", "node-spec.md"], "node_code.py"),
+    Stage("graph_code", "gen_graph_code:generate_graph_code",
+          ["state-spec.md", "state_code.py", "node-spec.md"], "graph_code.py"),
+    Stage("main", "gen_main:generate_main",
+          ["state-spec.md", "state_code.py", "node-spec.md", "graph_code.py"], "main.py"),
+]
+
+
+def file_hash(path):
+    path = Path(path)
+    return hashlib.sha256(path.read_bytes()).hexdigest() if path.exists() else None
+
+
+class Pipeline:
+    """The stages for one graph; ``run()`` returns ``{stage: 'ran' | 'skipped'}``."""
+    def __init__(self, graph_name, graph_spec, stages=STAGES, jobs=4, force=()):
+        self.graph_name = graph_name
+        self.graph_spec = graph_spec
+        self.stages = list(stages)
+        self.jobs = jobs
+        self.force = set(force)
+        self.folder = Path(graph_name)
+        self.manifest_path = self.folder / MANIFEST_FILE
+        self.lock = threading.Lock()
+        producers = {stage.output: stage.name for stage in self.stages}
+        self.depends_on = {stage.name: {producers[f] for f in stage.inputs if f in producers}
+                           for stage in self.stages}
+        unknown = {f for stage in self.stages for f in stage.inputs if f not in producers}
+        if unknown:
+            raise ValueError(f"No stage writes {', '.join(sorted(unknown))}")
+
+    def _manifest(self):
+        try:
+            return json.loads(self.manifest_path.read_text())
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    def input_hashes(self, stage):
+        """Hashes of everything the stage reads: the spec, the graph's config and its input files."""
+        hashes = {"<spec>": hashlib.sha256(self.graph_spec.encode()).hexdigest(),
+                  "<config>": file_hash(self.folder / f"{self.graph_name}.yaml")}
+        hashes.update({name: file_hash(self.folder / name) for name in stage.inputs})
+        return hashes
+
+    def up_to_date(self, stage):
+        if stage.name in self.force:
+            return False
+        entry = self._manifest().get(stage.name)
+        return (entry is not None
+                and entry["inputs"] == self.input_hashes(stage)
+                and entry["output"] == file_hash(self.folder / stage.output))
+
+    def run_stage(self, stage):
+        if self.up_to_date(stage):
+            print(f"[pipeline] {self.graph_name}: {stage.name} is up to date", flush=True)
+            return "skipped"
+        inputs = self.input_hashes(stage)
+        start = time.perf_counter()
+        stage.function()(self.graph_name, self.graph_spec)
+        output = file_hash(self.folder / stage.output)
+        if output is None:
+            raise RuntimeError(f"{stage.name} did not write {stage.output}")
+        print(f"[pipeline] {self.graph_name}: {stage.name} took {time.perf_counter() - start:.1f}s", flush=True)
+        with self.lock:
+            manifest = self._manifest()
+            manifest[stage.name] = {"inputs": inputs, "output": output}
+            self.manifest_path.write_text(json.dumps(manifest, indent=2, sort_keys=True) + "\n")
+        return "ran"
+
+    def run(self):
+        self.folder.mkdir(parents=True, exist_ok=True)
+        results = {}
+        pending = {stage.name: stage for stage in self.stages}
+        running = {}
+        with ThreadPoolExecutor(self.jobs) as pool:
+            while pending or running:
+                for name, stage in list(pending.items()):
+                    if self.depends_on[name] <= results.keys():
+                        running[pool.submit(self.run_stage, stage)] = name
+                        del pending[name]
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    # an exception stops the run; stages already started finish first
+                    results[running.pop(future)] = future.result()
+        return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the eval pipeline for graph specs in one process")
+    parser.add_argument("specs", nargs="+", help="Spec .txt files, e.g. routing.txt")
+    parser.add_argument("--jobs", type=int, default=4, help="Stages run at once")
+    parser.add_argument("--force", default="", help="Comma-separated stages to rerun ('all' for every stage)")
+    args = parser.parse_args(argv)
+
+    from mk_utils import read_file_and_get_subdir
+    force = {s.strip() for s in args.force.split(",") if s.strip()}
+    if "all" in force:
+        force = {stage.name for stage in STAGES}
+    unknown = force - {stage.name for stage in STAGES}
+    if unknown:
+        print(f"Error: unknown stage {', '.join(sorted(unknown))}", file=sys.stderr)
+        return 1
+    for spec in args.specs:
+        graph_name, graph_spec = read_file_and_get_subdir(spec)
+        start = time.perf_counter()
+        try:
+            results = Pipeline(graph_name, graph_spec, jobs=args.jobs, force=force).run()
+        except Exception as e:
+            print(f"Error: {graph_name}: {e}", file=sys.stderr)
+            return 1
+        ran = [name for name, result in results.items() if result == "ran"]
+        print(f"[pipeline] {graph_name}: ran {', '.join(ran) or 'nothing'} in {time.perf_counter() - start:.1f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,140 @@
+"""
+Local, versioned cache of LangSmith hub prompts.
+
+Prompt templates are stored content-addressed under ``objects/<sha256>``
+and ``manifest.json`` maps each hub name to the commit it was pulled at,
+its object and when it was last revalidated:
+
+    {"johannes/lgcodegen-gen_node_code": {"commit": "a1b2c3d4", "object": "9f86...",
+                                          "template_format": "f-string", "checked": 1718000000.0}}
+
+A prompt revalidated less than ``ttl`` seconds ago is read straight from
+disk.  An older one costs one metadata call: the hub's latest commit is
+compared with the manifest's, and the prompt is pulled again only when it
+changed.  Names pinned to a commit (``name:commit``) never change, so they
+are never revalidated.  When the hub can't be reached, or PROMPT_CACHE_OFFLINE
+is set, the cached copy is used.
+"""
+import os
+import json
+import time
+import hashlib
+import tempfile
+import threading
+from pathlib import Path
+
+DEFAULT_CACHE_DIR = Path(__file__).resolve().parent / "prompt_cache"
+DEFAULT_TTL = 24 * 3600  # seconds before a cached prompt is revalidated against the hub
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def langsmith_client():
+    """One LangSmith Client per process."""
+    global _client
+    with _client_lock:
+        if _client is None:
+            from langsmith import Client
+            _client = Client()
+        return _client
+
+
+def _atomic_write(path, data):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.")
+    with os.fdopen(fd, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+class PromptCache:
+    def __init__(self, cache_dir=None, ttl=None, client=None, offline=None):
+        self.cache_dir = Path(cache_dir or os.environ.get("PROMPT_CACHE_DIR") or DEFAULT_CACHE_DIR)
+        self.ttl = float(os.environ.get("PROMPT_CACHE_TTL", DEFAULT_TTL)) if ttl is None else ttl
+        self.offline = bool(os.environ.get("PROMPT_CACHE_OFFLINE")) if offline is None else offline
+        self._client = client
+        self._memory = {}  # name -> (template, template_format), for repeat lookups in one process
+        self.pulls = 0
+
+    @property
+    def client(self):
+        return self._client or langsmith_client()
+
+    @property
+    def manifest_path(self):
+        return self.cache_dir / "manifest.json"
+
+    def _manifest(self):
+        try:
+            return json.loads(self.manifest_path.read_text())
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    def _update_manifest(self, name, entry):
+        # re-read first: other stages may have cached other prompts meanwhile
+        manifest = self._manifest()
+        manifest[name] = entry
+        _atomic_write(self.manifest_path, json.dumps(manifest, indent=2, sort_keys=True).encode())
+
+    def _read_object(self, entry):
+        return (self.cache_dir / "objects" / entry["object"]).read_text()
+
+    def _store(self, name, commit, template, template_format):
+        digest = hashlib.sha256(template.encode()).hexdigest()
+        object_path = self.cache_dir / "objects" / digest
+        if not object_path.exists():
+            _atomic_write(object_path, template.encode())
+        self._update_manifest(name, {"commit": commit, "object": digest,
+                                     "template_format": template_format, "checked": time.time()})
+
+    def _pull(self, name):
+        """Pull the prompt from the hub: ``(commit, template, template_format)``."""
+        self.pulls += 1
+        commit = self.client.pull_prompt_commit(name)
+        prompt = self.client.pull_prompt(name if ":" in name else f"{name}:{commit.commit_hash}")
+        template = prompt.messages[0].prompt
+        return commit.commit_hash, template.template, getattr(template, "template_format", "f-string")
+
+    def _latest_commit(self, name):
+        return self.client.get_prompt(name).last_commit_hash
+
+    def get(self, name):
+        """``(template, template_format)`` for a hub prompt name (without the ``hub:`` prefix)."""
+        if name in self._memory:
+            return self._memory[name]
+        entry = self._manifest().get(name)
+        result = None
+        if entry is not None:
+            fresh = ":" in name or self.offline or time.time() - entry["checked"] < self.ttl
+            try:
+                if not fresh and self._latest_commit(name) == entry["commit"]:
+                    self._update_manifest(name, {**entry, "checked": time.time()})
+                    fresh = True
+            except Exception:
+                # hub unreachable: the cached copy is the best we have
+                fresh = True
+            if fresh:
+                try:
+                    result = (self._read_object(entry), entry["template_format"])
+                except FileNotFoundError:
+                    result = None
+        if result is None:
+            if self.offline:
+                raise LookupError(f"Prompt {name} is not cached and PROMPT_CACHE_OFFLINE is set")
+            commit, template, template_format = self._pull(name)
+            self._store(name, commit, template, template_format)
+            result = (template, template_format)
+        self._memory[name] = result
+        return result
+
+
+_default_cache = None
+
+
+def default_prompt_cache():
+    """The process-wide PromptCache (configured from PROMPT_CACHE_* environment variables)."""
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = PromptCache()
+    return _default_cache
@@ -34,6 +34,7 @@ mkdir "$base_name"
 # copy llm_cache to the base name directory
 cp -r llm_cache.py "$base_name"
 cp -r human_input.py "$base_name"
+cp -r llm_metrics.py "$base_name"
 
 # create the state spec
 python mk_state_spec.py "$selected_file"
@@ -0,0 +1,90 @@
+import os
+import sys
+import time
+from multiprocessing import Pool
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+from llm_cache import LLMCache, cache_llm_response
+
+
+class FakeLLM:
+    provider = "fake"
+    model = "echo"
+
+    def __init__(self):
+        self.calls = 0
+
+    def invoke(self, prompt, **kwargs):
+        self.calls += 1
+        return f"response to {prompt}"
+
+
+def test_decorator_hits_after_first_call(tmp_path):
+    class CachedLLM(FakeLLM):
+        @cache_llm_response(str(tmp_path))
+        def invoke(self, prompt, **kwargs):
+            return super().invoke(prompt, **kwargs)
+
+    llm = CachedLLM()
+    assert llm.invoke("hello") == llm.invoke("hello") == "response to hello"
+    llm.invoke("hello", temperature=0)  # different arguments, different entry
+    assert llm.calls == 2
+    assert (tmp_path / "responses.db").exists()
+
+
+def test_endpoint_is_part_of_the_key(tmp_path):
+    class CachedLLM(FakeLLM):
+        base_url = None
+
+        @cache_llm_response(str(tmp_path))
+        def invoke(self, prompt, **kwargs):
+            return super().invoke(prompt, **kwargs)
+
+    real, mock = CachedLLM(), CachedLLM()
+    mock.base_url = "http://127.0.0.1:8765/v1"
+    real.invoke("hello")
+    mock.invoke("hello")   # a mock response is stored separately...
+    real.invoke("hello")   # ...and never answers a real request
+    assert (real.calls, mock.calls) == (1, 1)
+    assert LLMCache.key("fake", "echo", "hello") != LLMCache.key("fake", "echo", "hello", mock.base_url)
+
+
+def test_lru_eviction_by_size(tmp_path):
+    cache = LLMCache(str(tmp_path / "cache.db"), max_bytes=2000, ttl=None)
+    for i in range(3):
+        cache.put(f"k{i}", os.urandom(600))  # random bytes don't compress
+    time.sleep(0.01)
+    cache.get("k0")  # k1 is now least recently used
+    cache.put("k3", os.urandom(600))
+    assert cache.size() <= 2000
+    assert cache.get("k1") is None
+    assert cache.get("k0") is not None and cache.get("k3") is not None
+    assert cache.stats.evictions == 1
+
+
+def test_ttl_expiry(tmp_path):
+    cache = LLMCache(str(tmp_path / "cache.db"), ttl=0.05)
+    cache.put("k", {"answer": 42})
+    assert cache.get("k") == {"answer": 42}
+    time.sleep(0.1)
+    assert cache.get("k") is None
+    assert len(cache) == 0
+
+
+def _write_many(args):
+    path, worker = args
+    cache = LLMCache(path)
+    for i in range(50):
+        cache.put(f"{worker}-{i}", [worker, i] * 100)
+        assert cache.get(f"{worker}-{i}") == [worker, i] * 100
+    return worker
+
+
+def test_processes_share_the_cache(tmp_path):
+    path = str(tmp_path / "cache.db")
+    with Pool(4) as pool:
+        assert sorted(pool.map(_write_many, [(path, w) for w in range(4)])) == [0, 1, 2, 3]
+    cache = LLMCache(path)
+    assert len(cache) == 200
+    assert cache.get("3-49") == [3, 49] * 100
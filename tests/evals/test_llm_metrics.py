@@ -0,0 +1,51 @@
+import sys
+import json
+from pathlib import Path
+from types import SimpleNamespace
+
+sys.path.insert(0, str(Path(__file__).parent))
+import llm_metrics
+
+
+def test_calls_are_logged_with_stage_and_tokens(tmp_path, monkeypatch):
+    log = tmp_path / "metrics.jsonl"
+    monkeypatch.setenv(llm_metrics.LOG_ENV, str(log))
+
+    @llm_metrics.llm_stage("state_code")
+    def generate(graph_name):
+        completion = SimpleNamespace(usage=SimpleNamespace(prompt_tokens=1000, completion_tokens=200))
+        return llm_metrics.timed("openrouter", "openai", "gpt-4.1", lambda: completion)
+
+    generate("routing")
+    agent = SimpleNamespace(run=lambda prompt: SimpleNamespace(metrics={"input_tokens": [10, 20], "output_tokens": [5]}))
+    llm_metrics.instrument_agent(agent, "anthropic", "unpriced-model").run("hi")
+    llm_metrics.record("invoke", "openai", "gpt-4.1", 0.001,
+                       SimpleNamespace(usage_metadata={"input_tokens": 7, "output_tokens": 3}), cache_hit=True)
+
+    first, second, third = [json.loads(line) for line in log.read_text().splitlines()]
+    assert (first["stage"], first["graph"], first["prompt_tokens"], first["response_tokens"]) == \
+        ("state_code", "routing", 1000, 200)
+    assert first["cost"] == (1000 * 2.0 + 200 * 8.0) / 1_000_000
+    assert (second["stage"], second["prompt_tokens"], second["response_tokens"], second["cost"]) == (None, 30, 5, None)
+    assert third["cache_hit"] and third["cost"] == 0.0 and third["prompt_tokens"] == 7
+
+
+def test_report_aggregates(tmp_path, capsys):
+    log = tmp_path / "metrics.jsonl"
+    entries = [
+        {"stage": "node_code", "graph": "a", "model": "m", "cache_hit": False, "latency": 2.0,
+         "prompt_tokens": 100, "response_tokens": 10, "cost": 0.5},
+        {"stage": "node_code", "graph": "b", "model": "m", "cache_hit": True, "latency": 0.0,
+         "prompt_tokens": 100, "response_tokens": 10, "cost": 0.0},
+        {"stage": "main", "graph": "a", "model": "m", "cache_hit": False, "latency": 1.0,
+         "prompt_tokens": None, "response_tokens": None, "cost": None},
+    ]
+    log.write_text("".join(json.dumps(e) + "\n" for e in entries))
+    groups = llm_metrics.aggregate(llm_metrics.read_log(log), ["stage"])
+    assert groups[("node_code",)]["calls"] == 2 and groups[("node_code",)]["cache_hits"] == 1
+    assert groups[("node_code",)]["prompt_tokens"] == 200 and groups[("main",)]["cost"] == 0.0
+
+    assert llm_metrics.main(["report", "--log", str(log), "--by", "graph,model", "--graph", "a"]) == 0
+    lines = capsys.readouterr().out.splitlines()
+    assert lines[0].split()[:2] == ["graph", "model"]
+    assert lines[1].split()[:3] == ["a", "m", "2"]
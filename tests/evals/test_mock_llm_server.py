@@ -0,0 +1,72 @@
+import sys
+import json
+import time
+import urllib.error
+import urllib.request
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent))
+from mock_llm_server import parse_latency, start_server
+
+
+def post(base_url, body):
+    request = urllib.request.Request(f"{base_url}/chat/completions", data=json.dumps(body).encode(),
+                                     headers={"Content-Type": "application/json"})
+    with urllib.request.urlopen(request) as response:
+        return json.loads(response.read())
+
+
+def test_latency_specs():
+    assert parse_latency("fixed:0.25")() == 0.25
+    assert all(0.1 <= parse_latency("uniform:0.1,0.2")() <= 0.2 for _ in range(100))
+    assert all(parse_latency("normal:0,1")() >= 0 for _ in range(100))
+    assert parse_latency("lognormal:0.5,0.4")() > 0
+    with pytest.raises(ValueError, match="Bad latency spec"):
+        parse_latency("gamma:1")
+
+
+def test_chat_completion(tmp_path):
+    rules = tmp_path / "responses.yaml"
+    rules.write_text('- match: "state code"\n  response: "```python\\nclass State: pass\\n```"\n')
+    server, base_url = start_server(latency="fixed:0.05", responses=str(rules))
+    try:
+        start = time.perf_counter()
+        completion = post(base_url, {"model": "gpt-x", "messages": [
+            {"role": "system", "content": "be brief"},
+            {"role": "user", "content": "write the state code"},
+        ]})
+        assert time.perf_counter() - start >= 0.05
+        assert completion["choices"][0]["message"]["content"] == "```python\nclass State: pass\n```"
+        assert completion["model"] == "gpt-x"
+        assert completion["usage"]["total_tokens"] > 0
+
+        fallback = post(base_url, {"model": "m", "messages": [{"role": "user", "content": "hello"}]})
+        assert "```python" in fallback["choices"][0]["message"]["content"]
+        assert "5 character prompt" in fallback["choices"][0]["message"]["content"]
+        assert server.mock.stats()["requests"] == 2
+    finally:
+        server.shutdown()
+
+
+def test_templates_keep_literal_braces(tmp_path):
+    rules = tmp_path / "responses.yaml"
+    rules.write_text('- match: "node"\n  response: "def node(state):\\n    return {\\"a\\": 1}  # {model}: {prompt}"\n')
+    server, base_url = start_server(responses=str(rules))
+    try:
+        completion = post(base_url, {"model": "m", "messages": [{"role": "user", "content": "node {model}"}]})
+        assert completion["choices"][0]["message"]["content"] == 'def node(state):\n    return {"a": 1}  # m: node {model}'
+    finally:
+        server.shutdown()
+
+
+def test_failed_response_is_a_500(tmp_path):
+    server, base_url = start_server()
+    try:
+        with pytest.raises(urllib.error.HTTPError) as error:
+            post(base_url, {"model": "m", "messages": ["not a message"]})
+        assert error.value.code == 500
+        assert "Mock response failed" in json.loads(error.value.read())["error"]["message"]
+    finally:
+        server.shutdown()
@@ -0,0 +1,83 @@
+import sys
+import time
+import threading
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent))
+from pipeline import Pipeline, Stage
+
+
+def make_stages(log, delay=0.0):
+    """state_spec -> state_code -> node_spec -> (node_code, graph_code), like the real DAG."""
+    def writer(name, output, inputs=()):
+        def generate(graph_name, graph_spec):
+            log.append(("start", name, time.perf_counter()))
+            time.sleep(delay)
+            text = graph_spec + "".join((Path(graph_name) / f).read_text() for f in inputs)
+            (Path(graph_name) / output).write_text(f"{name}:{len(text)}\n")
+            log.append(("end", name, time.perf_counter()))
+        return Stage(name, generate, list(inputs), output)
+    return [
+        writer("state_spec", "state-spec.md"),
+        writer("state_code", "state_code.py", ["state-spec.md"]),
+        writer("node_spec", "node-spec.md", ["state-spec.md", "state_code.py"]),
+        writer("node_code", "node_code.py", ["state_code.py", "node-spec.md"]),
+        writer("graph_code", "graph_code.py", ["state_code.py", "node-spec.md"]),
+    ]
+
+
+def test_dag_order_and_concurrency(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    log = []
+    results = Pipeline("demo", "a -> b", make_stages(log, delay=0.1), jobs=4).run()
+    assert set(results.values()) == {"ran"}
+    events = {(kind, name): t for kind, name, t in log}
+    assert events[("end", "state_spec")] <= events[("start", "state_code")]
+    assert events[("end", "state_code")] <= events[("start", "node_spec")]
+    assert events[("end", "node_spec")] <= min(events[("start", "node_code")], events[("start", "graph_code")])
+    # the two last stages overlap
+    assert events[("start", "graph_code")] < events[("end", "node_code")]
+    assert events[("start", "node_code")] < events[("end", "graph_code")]
+
+
+def test_unchanged_inputs_are_skipped(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    log = []
+    Pipeline("demo", "a -> b", make_stages(log)).run()
+    log.clear()
+    assert set(Pipeline("demo", "a -> b", make_stages(log)).run().values()) == {"skipped"}
+    assert log == []
+
+    # an edited output reruns its stage; the others stay skipped when their inputs hash the same
+    (tmp_path / "demo" / "node-spec.md").write_text("hand edited\n")
+    results = Pipeline("demo", "a -> b", make_stages(log)).run()
+    assert results == {"state_spec": "skipped", "state_code": "skipped", "node_spec": "ran",
+                       "node_code": "skipped", "graph_code": "skipped"}
+
+    # a changed state class makes node_spec stale
+    stages = make_stages(log)
+    stages[1] = Stage("state_code", lambda graph_name, graph_spec: (Path(graph_name) / "state_code.py").write_text(
+        "class State(BaseModel): ...\n"), ["state-spec.md"], "state_code.py")
+    results = Pipeline("demo", "a -> b", stages, force={"state_code"}).run()
+    assert results["state_code"] == "ran" and results["node_spec"] == "ran"
+
+    results = Pipeline("demo", "a -> b -> c", make_stages(log)).run()
+    assert set(results.values()) == {"ran"}
+    results = Pipeline("demo", "a -> b -> c", make_stages(log), force={"graph_code"}).run()
+    assert results["graph_code"] == "ran" and results["state_spec"] == "skipped"
+
+
+def test_failure_stops_the_run(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    stages = make_stages([])
+    stages[1] = Stage("state_code", lambda graph_name, graph_spec: None, ["state-spec.md"], "state_code.py")
+    with pytest.raises(RuntimeError, match="did not write state_code.py"):
+        Pipeline("demo", "a -> b", stages).run()
+    assert not (tmp_path / "demo" / "graph_code.py").exists()
+
+
+def test_unknown_input():
+    with pytest.raises(ValueError, match="No stage writes missing.md"):
+        Pipeline("demo", "", [Stage("x", print, ["missing.md"], "x.md")])
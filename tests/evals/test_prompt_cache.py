@@ -0,0 +1,69 @@
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent))
+from prompt_cache import PromptCache
+
+
+class FakeHub:
+    """Stands in for langsmith.Client: one prompt whose commit can change."""
+    def __init__(self):
+        self.commit = "c1"
+        self.template = "Write {thing}"
+        self.calls = []
+        self.down = False
+
+    def _call(self, name):
+        if self.down:
+            raise ConnectionError("hub unreachable")
+        self.calls.append(name)
+
+    def get_prompt(self, name):
+        self._call(("get_prompt", name))
+        return SimpleNamespace(last_commit_hash=self.commit)
+
+    def pull_prompt_commit(self, name):
+        self._call(("pull_prompt_commit", name))
+        return SimpleNamespace(commit_hash=self.commit)
+
+    def pull_prompt(self, name):
+        self._call(("pull_prompt", name))
+        template = SimpleNamespace(template=self.template, template_format="f-string")
+        return SimpleNamespace(messages=[SimpleNamespace(prompt=template)])
+
+
+def test_prompt_is_pulled_once(tmp_path):
+    hub = FakeHub()
+    assert PromptCache(tmp_path, client=hub).get("me/p") == ("Write {thing}", "f-string")
+    pulls = len(hub.calls)
+    # a new process reads from disk, without touching the hub
+    assert PromptCache(tmp_path, client=hub).get("me/p") == ("Write {thing}", "f-string")
+    assert len(hub.calls) == pulls
+    assert len(list((tmp_path / "objects").iterdir())) == 1
+
+
+def test_revalidation_pulls_only_on_new_commit(tmp_path):
+    hub = FakeHub()
+    PromptCache(tmp_path, client=hub).get("me/p")
+
+    cache = PromptCache(tmp_path, client=hub, ttl=0)
+    assert cache.get("me/p") == ("Write {thing}", "f-string")
+    assert cache.pulls == 0 and hub.calls[-1] == ("get_prompt", "me/p")
+
+    hub.commit, hub.template = "c2", "Write {thing} twice"
+    cache = PromptCache(tmp_path, client=hub, ttl=0)
+    assert cache.get("me/p") == ("Write {thing} twice", "f-string")
+    assert cache.pulls == 1
+    assert hub.calls[-1] == ("pull_prompt", "me/p:c2")
+
+
+def test_offline(tmp_path):
+    hub = FakeHub()
+    PromptCache(tmp_path, client=hub).get("me/p")
+    hub.down = True
+    assert PromptCache(tmp_path, client=hub, ttl=0).get("me/p") == ("Write {thing}", "f-string")
+    with pytest.raises(LookupError):
+        PromptCache(tmp_path, client=hub, offline=True).get("me/other")
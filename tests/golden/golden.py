@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""Golden-file regression harness for the generator.
+
+Every spec (the bundled examples and ``tests/golden/specs``) is paired with
+``tests/golden/expected/<name>.txt``, the output of ``lgcodegen <spec>
+--stdout``.  Each spec is parsed once, its sections are rendered from that
+parse, and the result is compared line by line with the expected file
+(ignoring trailing whitespace only; indentation must match).  Cases run
+in a process pool; the first differing section of each case is reported:
+
+    python tests/golden/golden.py
+    python tests/golden/golden.py --workers 8 --expected tests/expected_results
+    python tests/golden/golden.py --update            # rewrite the expected files
+
+Specs without an expected file are reported as missing and do not fail the run.
+"""
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List, Optional
+
+try:
+    from langgraph_codegen.project import GeneratedProject, SECTIONS
+    from langgraph_codegen.gen_graph import list_examples, get_example_path
+except ImportError:
+    sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src"))
+    from langgraph_codegen.project import GeneratedProject, SECTIONS
+    from langgraph_codegen.gen_graph import list_examples, get_example_path
+
+GOLDEN_DIR = Path(__file__).resolve().parent
+SPECS_DIR = GOLDEN_DIR / "specs"
+EXPECTED_DIR = GOLDEN_DIR / "expected"
+SPEC_SUFFIXES = ('.lgraph', '.graph', '.txt')
+
+
+@dataclass
+class Case:
+    name: str
+    spec: str
+    expected: str
+
+
+@dataclass
+class CaseResult:
+    name: str
+    status: str                     # 'ok', 'mismatch', 'missing', 'error' or 'updated'
+    section: Optional[str] = None   # first section that differs
+    line: int = 0                   # 1-based line in the expected file
+    expected: str = ""
+    actual: str = ""
+
+    def format(self) -> str:
+        if self.status == 'mismatch':
+            return (f"{self.name}: {self.section} differs at line {self.line}\n"
+                    f"  expected: {self.expected}\n"
+                    f"  actual:   {self.actual}")
+        if self.status == 'error':
+            return f"{self.name}: error: {self.actual}"
+        return f"{self.name}: {self.status}"
+
+
+def discover(spec_dirs=None, expected_dir=EXPECTED_DIR) -> List[Case]:
+    """Pair every spec with ``expected_dir/<name>.txt``; a spec in a later directory overrides an example."""
+    specs = {name: str(get_example_path(name)) for name in list_examples()}
+    for directory in spec_dirs or [SPECS_DIR]:
+        for path in sorted(Path(directory).iterdir()):
+            if path.suffix in SPEC_SUFFIXES:
+                specs[path.stem] = str(path)
+    return [Case(name, spec, str(Path(expected_dir) / f"{name}.txt")) for name, spec in sorted(specs.items())]
+
+
+def render(spec):
+    """``(output, section_starts)``: the ``--stdout`` output and the line each section starts on."""
+    project = GeneratedProject.from_file(spec, keep_text=())
+    parts, starts, line = [], [], 0
+    for name in SECTIONS:
+        text = project.section(name) + "\n\n"
+        parts.append(text)
+        starts.append((line, name))
+        line += text.count("\n")
+    return "".join(parts), starts
+
+
+def _lines(text):
+    lines = text.splitlines()
+    while lines and not lines[-1].strip():
+        lines.pop()
+    return lines
+
+
+def first_difference(expected, actual):
+    """Index of the first line that differs beyond trailing whitespace, or None.
+
+    Indentation is compared exactly: it is part of the generated Python.
+    """
+    expected, actual = _lines(expected), _lines(actual)
+    if expected == actual:
+        return None
+    for i, (e, a) in enumerate(zip(expected, actual)):
+        if e != a and e.rstrip() != a.rstrip():
+            return i
+    if len(expected) == len(actual):
+        return None
+    return min(len(expected), len(actual))
+
+
+def check(case, update=False):
+    try:
+        output, starts = render(case.spec)
+    except Exception as e:
+        return CaseResult(case.name, 'error', actual=f"{type(e).__name__}: {e}")
+    expected_path = Path(case.expected)
+    if update:
+        if not expected_path.exists() or expected_path.read_text() != output:
+            expected_path.write_text(output)
+            return CaseResult(case.name, 'updated')
+        return CaseResult(case.name, 'ok')
+    if not expected_path.exists():
+        return CaseResult(case.name, 'missing')
+    expected = expected_path.read_text()
+    index = first_difference(expected, output)
+    if index is None:
+        return CaseResult(case.name, 'ok')
+    section = next(name for start, name in reversed(starts) if start <= index)
+    expected_lines, actual_lines = _lines(expected), _lines(output)
+    return CaseResult(case.name, 'mismatch', section, index + 1,
+                      expected_lines[index] if index < len(expected_lines) else "<end of file>",
+                      actual_lines[index] if index < len(actual_lines) else "<end of file>")
+
+
+def _check_chunk(cases, update):
+    return [check(case, update) for case in cases]
+
+
+def run(cases, workers=None, update=False) -> List[CaseResult]:
+    """Check every case in ``workers`` processes (default: one per CPU); results are in case order."""
+    workers = min(workers or os.cpu_count() or 1, len(cases))
+    if workers <= 1:
+        return _check_chunk(cases, update)
+    size = -(-len(cases) // (workers * 4))
+    chunks = [cases[i:i + size] for i in range(0, len(cases), size)]
+    with ProcessPoolExecutor(workers) as pool:
+        return [result for chunk in pool.map(_check_chunk, chunks, [update] * len(chunks)) for result in chunk]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare generator output with the golden files")
+    parser.add_argument('--specs', action='append', help=f'Directory of extra specs (default {SPECS_DIR})')
+    parser.add_argument('--expected', default=str(EXPECTED_DIR), help='Directory of expected outputs')
+    parser.add_argument('--workers', type=int, help='Worker processes (default: one per CPU)')
+    parser.add_argument('--update', action='store_true', help='Write the current output as the expected output')
+    parser.add_argument('-k', dest='select', help='Only cases whose name contains this')
+    args = parser.parse_args(argv)
+
+    cases = discover(args.specs, args.expected)
+    if args.select:
+        cases = [case for case in cases if args.select in case.name]
+    Path(args.expected).mkdir(parents=True, exist_ok=True)
+    start = time.perf_counter()
+    results = run(cases, args.workers, args.update)
+    seconds = time.perf_counter() - start
+    for result in results:
+        if result.status != 'ok':
+            print(result.format())
+    counts = {}
+    for result in results:
+        counts[result.status] = counts.get(result.status, 0) + 1
+    print(f"{len(results)} cases in {seconds:.2f}s: "
+          + ", ".join(f"{count} {status}" for status, count in sorted(counts.items())))
+    return 1 if counts.get('mismatch') or counts.get('error') else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,134 @@
+"""Tests for the static graph analysis (reachability, SCCs, unbounded loops)."""
+
+import io
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+try:
+    from langgraph_codegen.analysis import analyze_graph, strongly_connected_components
+    from langgraph_codegen.gen_graph import parse_spec_stream, list_examples, get_example_path, parse_spec_file
+except ImportError:
+    sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+    from langgraph_codegen.analysis import analyze_graph, strongly_connected_components
+    from langgraph_codegen.gen_graph import parse_spec_stream, list_examples, get_example_path, parse_spec_file
+
+
+def _analyze(spec):
+    parsed = parse_spec_stream(io.StringIO(spec), "demo")
+    return analyze_graph(parsed.graph_dict, parsed.start_node)
+
+
+def _kinds(report):
+    return [(issue.severity, issue.kind) for issue in report.issues]
+
+
+def test_linear_graph_is_clean():
+    report = _analyze("START -> a -> b -> c -> END\n")
+    assert report.ok
+    assert report.nodes == ["a", "b", "c"]
+    assert report.loops == []
+
+
+def test_plan_and_execute_loop_is_flagged():
+    report = _analyze(
+        "START:PlanExecute -> plan_step -> execute_step -> replan_step\n"
+        "replan_step -> is_done ? END : execute_step\n"
+    )
+    assert _kinds(report) == [("warning", "unbounded_loop")]
+    loop = report.loops[0]
+    assert sorted(loop.nodes) == ["execute_step", "replan_step"]
+    assert loop.conditional
+    assert loop.exits == [
+        {"source": "replan_step", "condition": "is_done", "destination": "END", "conditional": True}
+    ]
+    assert "is_done" in report.issues[0].message
+
+
+def test_loop_without_conditional_exit_is_an_error():
+    report = _analyze("START -> a -> b -> a\n")
+    assert ("error", "loop_without_exit") in _kinds(report)
+    assert ("warning", "cannot_reach_end") in _kinds(report)
+    assert sorted(report.cannot_reach_end) == ["a", "b"]
+
+
+def test_unconditional_exit_does_not_stop_a_loop():
+    # b fans out to both c and a: the loop keeps running alongside the exit
+    report = _analyze("START -> a -> b\nb -> a, c\nc -> END\n")
+    assert [issue.kind for issue in report.errors] == ["loop_without_exit"]
+    assert report.loops[0].exits[0]["destination"] == "c"
+
+
+def test_self_loop():
+    report = _analyze("START -> a\na -> again ? a : END\n")
+    assert [loop.nodes for loop in report.loops] == [["a"]]
+    assert _kinds(report) == [("warning", "unbounded_loop")]
+
+
+def test_switch_exit():
+    report = _analyze("START -> a -> b\nb -> route(a, END)\n")
+    assert _kinds(report) == [("warning", "unbounded_loop")]
+    assert "route_END" in report.issues[0].message
+
+
+def test_unreachable_nodes():
+    report = _analyze("START -> a -> END\norphan -> a\n")
+    assert report.unreachable == ["orphan"]
+    assert _kinds(report) == [("warning", "unreachable")]
+
+
+def test_fan_in_node_keys_are_split():
+    report = _analyze("START -> a, b -> c\nc -> END\n")
+    assert report.ok
+    assert set(report.nodes) == {"a", "b", "c"}
+
+
+def test_sccs_reverse_topological():
+    successors = {"s": ["a"], "a": ["b"], "b": ["a", "c"], "c": []}
+    assert strongly_connected_components(successors) == [["c"], ["a", "b"], ["s"]]
+
+
+def test_deep_graph_does_not_recurse():
+    spec = "START -> " + " -> ".join(f"n{i}" for i in range(5000)) + "\nn4999 -> done ? END : n0\n"
+    report = _analyze(spec)
+    assert len(report.loops) == 1 and len(report.loops[0].nodes) == 5000
+
+
+def test_synthetic_graphs_have_no_errors(synthetic_spec):
+    report = _analyze(synthetic_spec(nodes=2000, seed=11))
+    assert not report.errors
+    assert not report.unreachable
+    assert report.loops and all(loop.conditional for loop in report.loops)
+
+
+@pytest.mark.parametrize("example", list_examples())
+def test_examples_have_no_errors(example):
+    parsed = parse_spec_file(get_example_path(example))
+    report = analyze_graph(parsed.graph_dict, parsed.start_node)
+    assert not report.errors, report.format()
+    assert report.to_dict()["start_node"] == parsed.start_node
+
+
+def _cli_stderr(tmp_path, spec, *flags):
+    spec_file = tmp_path / "plan.lgraph"
+    spec_file.write_text(spec)
+    result = subprocess.run(
+        [sys.executable, "-m", "langgraph_codegen.lgcodegen", str(spec_file), "--stdout", *flags],
+        capture_output=True, text=True, cwd=tmp_path,
+    )
+    assert result.returncode == 0, result.stderr
+    return result.stderr
+
+
+def test_cli_warns_about_conditional_loops_only_on_request(tmp_path):
+    spec = "START:PlanExecute -> plan -> execute -> replan\nreplan -> is_done ? END : execute\norphan -> END\n"
+    default = _cli_stderr(tmp_path, spec)
+    assert "orphan" in default and "loop through" not in default
+    assert "loop through" in _cli_stderr(tmp_path, spec, "--warn-loops")
+
+
+def test_cli_always_reports_loop_without_exit(tmp_path):
+    stderr = _cli_stderr(tmp_path, "START:S -> a -> b\nb -> a, END\n")
+    assert "Error: " in stderr and "loop through" in stderr
@@ -0,0 +1,81 @@
+"""Tests for the incremental symbol table in code_snippet_analyzer."""
+
+from code_snippet_analyzer import CodeSnippetAnalyzer
+
+STATE = """\
+class AgentState(TypedDict):
+    messages: Annotated[list, add_messages]
+"""
+
+NODE = """\
+def call_model(state: AgentState):
+    response = model.invoke(state["messages"])
+    return {"messages": [response]}
+"""
+
+MODEL = """\
+import os
+model = make_model(os.environ["MODEL"])
+"""
+
+
+def test_undefined_and_defined_elsewhere():
+    analyzer = CodeSnippetAnalyzer()
+    analyzer.add_snippet("node", NODE)
+    assert analyzer.undefined("node") == {"AgentState", "model"}
+
+    analyzer.add_snippet("state", STATE)
+    analyzer.add_snippet("model", MODEL)
+    assert analyzer.undefined("node") == set()
+    assert analyzer.defined_elsewhere("node") == {"AgentState", "model"}
+    assert analyzer.undefined("model") == {"make_model"}
+    assert analyzer.undefined("state") == {"TypedDict", "Annotated", "add_messages"}
+    assert analyzer.defining_snippets("model") == {"model"}
+
+
+def test_replacing_and_removing_snippets_updates_the_index():
+    analyzer = CodeSnippetAnalyzer()
+    analyzer.add_snippet("node", NODE)
+    analyzer.add_snippet("model", MODEL)
+    analyzer.add_snippet("model", "import os\n")
+    assert analyzer.undefined("node") == {"AgentState", "model"}
+    assert analyzer.defining_snippets("model") == set()
+
+    analyzer.add_snippet("state", STATE)
+    analyzer.remove_snippet("state")
+    assert "AgentState" in analyzer.undefined("node")
+    assert "AgentState" not in analyzer.definers
+
+
+def test_analysis_is_cached_by_content():
+    analyzer = CodeSnippetAnalyzer()
+    first = analyzer.add_snippet("a", NODE)
+    second = analyzer.add_snippet("b", NODE)
+    assert first["used"] is second["used"]
+    assert len(analyzer._cache) == 1
+
+
+def test_summaries_match_analyze_all_snippets():
+    analyzer = CodeSnippetAnalyzer()
+    for name, code in [("state", STATE), ("node", NODE), ("model", MODEL)]:
+        analyzer.add_snippet(name, code)
+    analyzer.analyze_all_snippets()
+    summary = analyzer.get_snippet_summary("node")
+    analysis = analyzer.snippets["node"]["analysis"]
+    assert summary[4] == analysis["undefined"] == set()
+    assert summary[5] == analysis["defined_elsewhere"] == {"AgentState", "model"}
+    assert analyzer.get_snippet_summary("missing") is None
+
+
+def test_instance_variables():
+    analyzer = CodeSnippetAnalyzer()
+    data = analyzer.add_snippet("cls", "class A:\n    def __init__(self):\n        self.count = 0\n")
+    assert data["class_instance_variables"] == {"count"}
+    assert data["defined"] == {"A", "__init__"}
+
+
+def test_syntax_error():
+    analyzer = CodeSnippetAnalyzer()
+    data = analyzer.add_snippet("bad", "def broken(:\n")
+    assert data["used"] == set() and data["imports"] == []
+    assert analyzer.undefined("bad") == set()
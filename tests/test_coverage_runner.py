@@ -0,0 +1,93 @@
+"""Tests for the generated coverage_runner.py."""
+
+import json
+import subprocess
+import sys
+import textwrap
+from pathlib import Path
+
+try:
+    from langgraph_codegen.gen_graph import condition_outcomes, parse_spec_file, list_examples, get_example_path
+    from langgraph_codegen.project import GeneratedProject
+except ImportError:
+    sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+    from langgraph_codegen.gen_graph import condition_outcomes, parse_spec_file, list_examples, get_example_path
+    from langgraph_codegen.project import GeneratedProject
+
+SPEC = """\
+START:DemoState -> plan
+plan -> pick(execute, END)
+execute -> replan
+replan -> is_done ? END : execute
+"""
+
+# Stands in for the LangGraph-compiled graph: same conditions, same routing
+FAKE_GRAPH = '''
+import random
+
+def random_one_or_zero():
+    return random.choice([False, True])
+
+def is_done(state):
+    return random_one_or_zero()
+
+def pick(state):
+    return random.choice(['execute', 'END'])
+
+class FakeGraph:
+    def stream(self, state, config=None, stream_mode=None):
+        yield {"plan": {}}
+        if pick(state) == "END":
+            return
+        while True:
+            yield {"execute": {}}
+            yield {"replan": {}}
+            if is_done(state):
+                return
+
+demo = FakeGraph()
+'''
+
+
+def test_condition_outcomes():
+    parsed = parse_spec_file(get_example_path("plan_and_execute"))
+    assert condition_outcomes(parsed) == {"is_done": [False, True]}
+
+
+def test_runner_is_opt_in(tmp_path):
+    spec = tmp_path / "demo.lgraph"
+    spec.write_text(SPEC)
+    assert "coverage_runner.py" not in dict(GeneratedProject.from_file(spec).files())
+    runner = dict(GeneratedProject.from_file(spec, coverage_runner=True).files())["coverage_runner.py"]
+    assert "CONDITIONS = {'is_done': [False, True], 'pick': ['execute', 'END']}" in runner
+    assert "NODES = ['plan', 'execute', 'replan']" in runner
+    compile(runner, "coverage_runner.py", "exec")
+
+
+def test_runner_enumerates_every_path(tmp_path):
+    spec = tmp_path / "demo.lgraph"
+    spec.write_text(SPEC)
+    (tmp_path / "coverage_runner.py").write_text(GeneratedProject.from_file(spec, coverage_runner=True).coverage_runner)
+    (tmp_path / "demo_graph.py").write_text(FAKE_GRAPH)
+    (tmp_path / "demo_state.py").write_text("def initialize_state():\n    return {}\n")
+
+    result = subprocess.run(
+        [sys.executable, "coverage_runner.py", "--depth", "4", "--workers", "2", "--json", "report.json"],
+        cwd=tmp_path, capture_output=True, text=True,
+    )
+    assert result.returncode == 0, result.stderr
+    report = json.loads((tmp_path / "report.json").read_text())
+    # pick=END; pick=execute then is_done True after 1..3 loops; 3 loops not done hits depth 4
+    assert report["paths"] == 5
+    assert report["statuses"] == {"complete": 4, "truncated": 1}
+    assert report["nodes_missed"] == []
+    assert (report["outcomes_covered"], report["outcomes_total"]) == (4, 4)
+    assert "Branch outcomes covered: 4/4 (100%)" in result.stdout
+    sequences = {tuple(value for _c, _i, _n, value in path["decisions"]) for path in report["slowest"]}
+    assert len(sequences) == 5
+
+
+def test_examples_generate_runner():
+    for example in list_examples():
+        project = GeneratedProject.from_file(get_example_path(example), coverage_runner=True)
+        compile(project.coverage_runner, "coverage_runner.py", "exec")
@@ -0,0 +1,123 @@
+"""Dispatch-table routers (--dispatch-routers) route exactly like the if/elif chains."""
+
+import io
+import itertools
+import sys
+from pathlib import Path
+
+import pytest
+
+try:
+    from langgraph_codegen.gen_graph import (
+        gen_switch_condition, mk_conditions, parse_spec_stream, parse_spec_file, list_examples, get_example_path,
+    )
+    from langgraph_codegen.project import GeneratedProject
+except ImportError:
+    sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+    from langgraph_codegen.gen_graph import (
+        gen_switch_condition, mk_conditions, parse_spec_stream, parse_spec_file, list_examples, get_example_path,
+    )
+    from langgraph_codegen.project import GeneratedProject
+
+SPEC = """\
+START:State -> a
+a
+  c1 => b
+  c2 => c, d
+  c1 => d
+  => e
+b => END
+c => END
+d => END
+e => END
+"""
+
+
+def _routers(parsed):
+    return [(node, d) for node, d in parsed.graph_dict.items() if mk_conditions(node, d, routing_functions={})]
+
+
+def _conditions(node_dict):
+    return list(dict.fromkeys(e["condition"] for e in node_dict["edges"] if e["condition"] != "true_fn"))
+
+
+def _router(node, node_dict, dispatch, truth, calls):
+    """Compile the router for ``node`` with stub conditions returning ``truth[name]``."""
+    namespace = {node_dict["state"]: dict}
+    for name in _conditions(node_dict):
+        def condition(state, name=name):
+            calls.append(name)
+            return truth[name]
+        namespace[name] = condition
+    exec(mk_conditions(node, node_dict, routing_functions={}, dispatch=dispatch), namespace)
+    return namespace[f"after_{node}"]
+
+
+def _truth_tables(names, limit=10):
+    """Every assignment for a few conditions; for many, each condition being the first true one."""
+    if len(names) <= limit:
+        for values in itertools.product([False, True], repeat=len(names)):
+            yield dict(zip(names, values))
+        return
+    yield dict.fromkeys(names, False)
+    for i in range(len(names)):
+        yield {name: j >= i for j, name in enumerate(names)}
+
+
+def assert_equivalent(parsed):
+    routers = _routers(parsed)
+    for node, node_dict in routers:
+        names = _conditions(node_dict)
+        for truth in _truth_tables(names):
+            chain_calls, table_calls = [], []
+            expected = _router(node, node_dict, False, truth, chain_calls)({})
+            assert _router(node, node_dict, True, truth, table_calls)({}) == expected, (node, truth)
+            # each condition runs at most once, and never more often than in the chain
+            assert len(table_calls) == len(set(table_calls)) <= len(chain_calls)
+    return len(routers)
+
+
+def test_dispatch_table():
+    parsed = parse_spec_stream(io.StringIO(SPEC), "demo")
+    code = mk_conditions("a", parsed.graph_dict["a"], routing_functions={}, dispatch=True)
+    assert "AFTER_A_ROUTES = (\n    (c1, 'b'),\n    (c2, ['c', 'd']),\n)" in code
+    assert code.rstrip().endswith("return 'e'")
+    assert assert_equivalent(parsed) == 1
+
+
+def test_without_default_routes_to_end():
+    parsed = parse_spec_stream(io.StringIO("START -> a\na -> done ? END : a\n"), "demo")
+    assert assert_equivalent(parsed) == 1
+
+
+@pytest.mark.parametrize("example", list_examples())
+def test_examples_route_the_same(example):
+    assert_equivalent(parse_spec_file(get_example_path(example)))
+
+
+def test_synthetic_routers_route_the_same(synthetic_spec):
+    parsed = parse_spec_stream(io.StringIO(synthetic_spec(nodes=300, seed=5)), "synthetic")
+    assert assert_equivalent(parsed) > 0
+
+
+def test_wide_supervisor():
+    workers = [f"worker_{i}" for i in range(60)]
+    spec = "START:State -> supervisor\nsupervisor\n" + "".join(
+        f"  to_{w} => {w}\n" for w in workers
+    ) + "".join(f"{w} => supervisor\n" for w in workers)
+    parsed = parse_spec_stream(io.StringIO(spec), "supervisor")
+    assert assert_equivalent(parsed) == 1
+
+
+def test_switch_choices_constant():
+    code = gen_switch_condition("route", ["w1", "w2", "END"], "State", dispatch=True)
+    assert "ROUTE_CHOICES = ('w1', 'w2', 'END')" in code
+    assert "random.choice(ROUTE_CHOICES)" in code
+    human = gen_switch_condition("route", ["w1", "END"], "State", human=True, dispatch=True)
+    assert "human_choice('route', [*ROUTE_CHOICES])" in human
+
+
+@pytest.mark.parametrize("example", list_examples())
+def test_generated_modules_compile(example):
+    project = GeneratedProject.from_file(get_example_path(example), dispatch_routers=True, loop_guard=3)
+    compile(project.graph_module, f"{project.basename}_graph.py", "exec")
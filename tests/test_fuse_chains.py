@@ -0,0 +1,120 @@
+"""Tests for --fuse-chains."""
+
+import io
+import subprocess
+import sys
+import typing
+from pathlib import Path
+
+try:
+    from langgraph_codegen.gen_graph import FUSE_HELPERS, parse_spec_stream, list_examples, get_example_path
+    from langgraph_codegen.project import GeneratedProject
+    from langgraph_codegen.transforms import fuse_chains
+except ImportError:
+    sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+    from langgraph_codegen.gen_graph import FUSE_HELPERS, parse_spec_stream, list_examples, get_example_path
+    from langgraph_codegen.project import GeneratedProject
+    from langgraph_codegen.transforms import fuse_chains
+
+import pytest
+
+SPEC = """\
+STATE: Demo
+counter: int
+nodes_visited: list[str]
+
+NODES:
+a: latency=1 tokens=100
+b: latency=2
+c: latency=3 tokens=50
+
+START -> a -> b -> c
+c -> again ? a : END
+"""
+
+
+def _parse(spec):
+    return parse_spec_stream(io.StringIO(spec), "demo")
+
+
+def test_fuse_router_chain():
+    parsed, transformations = fuse_chains(_parse(SPEC))
+    assert [str(t) for t in transformations] == ["fuse: a -> b -> c  =>  a__b__c"]
+    assert parsed.fused_nodes == {"a__b__c": ["a", "b", "c"]}
+    assert parsed.graph_dict["START"]["edges"][0]["destination"] == "a__b__c"
+    assert [e["destination"] for e in parsed.graph_dict["a__b__c"]["edges"]] == ["a__b__c", "END"]
+    assert parsed.routing_functions["a__b__c"] == "after_c"
+    assert parsed.node_hints["a__b__c"] == {"latency": "6", "tokens": "150"}
+
+
+def test_chain_heads_keep_external_entries():
+    # b is entered from a and from d, so the chains are [b, c] and [d, e]
+    parsed, _ = fuse_chains(_parse("START -> a -> b -> c\nc -> ok ? d : END\nd -> e -> b\n"))
+    assert set(parsed.fused_nodes) == {"b__c", "d__e"}
+    assert parsed.graph_dict["a"]["edges"][0]["destination"] == "b__c"
+    assert parsed.graph_dict["d__e"]["edges"][0]["destination"] == "b__c"
+
+
+def test_nothing_to_fuse():
+    parsed = _parse("START -> a, b -> c\nc -> END\n")
+    assert fuse_chains(parsed) == (parsed, [])
+
+
+def test_workers_are_not_fused():
+    spec = "START -> planner -> sections | writer -> reviewer -> publish -> END\n"
+    parsed, _ = fuse_chains(_parse(spec))
+    assert all("writer" not in members for members in parsed.fused_nodes.values())
+    assert "reviewer__publish" in parsed.fused_nodes
+
+
+def test_fused_node_matches_sequential_run():
+    project = GeneratedProject.from_spec(SPEC, "demo", fuse_chains=True)
+    namespace = {"Optional": typing.Optional, "RunnableConfig": object}
+    exec(project.state, namespace)
+    exec(project.nodes, namespace)
+    exec(FUSE_HELPERS, namespace)
+    reducers = namespace["_reducers"](namespace["Demo"])
+
+    def apply(state, update):
+        state = dict(state)
+        for key, value in update.items():
+            state[key] = reducers[key][0](state[key], value) if key in reducers else value
+        return state
+
+    start = {"counter": 4, "nodes_visited": ["START"]}
+    sequential = start
+    for name in ("a", "b", "c"):
+        sequential = apply(sequential, namespace[name](sequential))
+    fused = namespace["fuse_nodes"](namespace["Demo"], namespace["a"], namespace["b"], namespace["c"])
+    assert fused.__name__ == "a__b__c"
+    assert apply(start, fused(start, config=None)) == sequential
+    assert sequential == {"counter": 7, "nodes_visited": ["START", "a", "b", "c"]}
+
+
+def test_generated_code():
+    project = GeneratedProject.from_spec(SPEC, "demo", fuse_chains=True, loop_guard=3)
+    graph = project.graph
+    assert "add_node('a__b__c', count_iterations(fuse_nodes(Demo, a, b, c), 'a__b__c_iterations'))" in graph
+    assert "def after_c(state: Demo):" in graph
+    assert project.import_node_names == ["a", "b", "c"]
+    assert "def a(" in project.nodes and "def c(" in project.nodes
+    compile(project.graph_module, "demo_graph.py", "exec")
+
+
+def test_cli_prints_fusion(tmp_path):
+    spec_file = tmp_path / "demo.lgraph"
+    spec_file.write_text(SPEC)
+    result = subprocess.run(
+        [sys.executable, "-m", "langgraph_codegen.lgcodegen", str(spec_file), "--fuse-chains", "--graph", "--stdout"],
+        capture_output=True, text=True,
+    )
+    assert result.returncode == 0, result.stderr
+    assert "fuse: a -> b -> c  =>  a__b__c" in result.stderr
+    assert "fuse_nodes(Demo, a, b, c)" in result.stdout
+
+
+@pytest.mark.parametrize("example", list_examples())
+def test_fused_examples_compile(example):
+    project = GeneratedProject.from_file(get_example_path(example), fuse_chains=True)
+    compile(project.graph_module, f"{project.basename}_graph.py", "exec")
+    assert set(project.import_node_names) <= set(GeneratedProject.from_file(get_example_path(example)).import_node_names)
@@ -0,0 +1,49 @@
+"""Golden-file tests: generator output for every spec in tests/golden (see tests/golden/golden.py)."""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent / "golden"))
+import golden
+
+
+def test_golden_suite():
+    results = golden.run(golden.discover(), workers=2)
+    assert results and all(result.status == "ok" for result in results), \
+        "\n".join(result.format() for result in results if result.status != "ok")
+
+
+def test_first_difference():
+    assert golden.first_difference("a\nb\n", "a\nb\n\n") is None
+    assert golden.first_difference("a = 1  \n", "a = 1\n") is None
+    # indentation and whitespace inside lines are significant
+    assert golden.first_difference("if x:\n    return 1\n", "if x:\nreturn 1\n") == 1
+    assert golden.first_difference("s = 'a  b'\n", "s = 'a b'\n") == 0
+    assert golden.first_difference("a\nb\nc\n", "a\nx\nc\n") == 1
+    assert golden.first_difference("a\nb\n", "a\n") == 1
+
+
+def test_mismatch_reports_first_differing_section(tmp_path):
+    specs, expected = tmp_path / "specs", tmp_path / "expected"
+    specs.mkdir()
+    expected.mkdir()
+    (specs / "tiny.lgraph").write_text("START:TinyState -> first -> second -> END\n")
+    output, starts = golden.render(str(specs / "tiny.lgraph"))
+    lines = output.split("\n")
+    graph_start = dict((name, start) for start, name in starts)["graph"]
+    lines[graph_start + 3] = "changed"
+    (expected / "tiny.txt").write_text("\n".join(lines))
+
+    cases = [case for case in golden.discover([specs], expected) if case.name == "tiny"]
+    [result] = golden.run(cases, workers=1)
+    assert (result.status, result.section, result.line) == ("mismatch", "graph", graph_start + 4)
+    assert result.expected == "changed"
+
+    [result] = golden.run(cases, workers=1, update=True)
+    assert result.status == "updated"
+    assert golden.run(cases, workers=1)[0].status == "ok"
+
+
+def test_missing_expected_file(tmp_path):
+    cases = [case for case in golden.discover([tmp_path], tmp_path) if case.name == "rag"]
+    assert golden.run(cases, workers=1)[0].status == "missing"
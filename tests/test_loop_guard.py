@@ -0,0 +1,110 @@
+"""Tests for recursion_limit derivation and generated loop guards."""
+
+import io
+import sys
+from pathlib import Path
+
+import pytest
+
+try:
+    from langgraph_codegen.analysis import (
+        DEFAULT_RECURSION_LIMIT, longest_superstep_path, recommended_recursion_limit,
+    )
+    from langgraph_codegen.gen_graph import (
+        LOOP_GUARD_HELPERS, gen_main, parse_spec_stream, list_examples, get_example_path,
+    )
+    from langgraph_codegen.project import GeneratedProject
+except ImportError:
+    sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+    from langgraph_codegen.analysis import (
+        DEFAULT_RECURSION_LIMIT, longest_superstep_path, recommended_recursion_limit,
+    )
+    from langgraph_codegen.gen_graph import (
+        LOOP_GUARD_HELPERS, gen_main, parse_spec_stream, list_examples, get_example_path,
+    )
+    from langgraph_codegen.project import GeneratedProject
+
+PLAN_AND_EXECUTE = """\
+START:PlanExecute -> plan_step -> execute_step -> replan_step
+replan_step -> is_done ? END : execute_step
+"""
+
+
+def _graph(spec):
+    parsed = parse_spec_stream(io.StringIO(spec), "demo")
+    return parsed.graph_dict, parsed.start_node
+
+
+def test_longest_path_counts_supersteps():
+    assert longest_superstep_path(*_graph("START -> a -> b -> c -> END\n")) == 3
+    # parallel branches share supersteps
+    assert longest_superstep_path(*_graph("START -> a -> b, c -> d\nd -> END\n")) == 3
+
+
+def test_loops_are_weighted_by_iterations():
+    graph, start = _graph(PLAN_AND_EXECUTE)
+    # plan_step + 2-node loop taken 4 times
+    assert longest_superstep_path(graph, start, loop_iterations=4) == 1 + 2 * 4
+    assert recommended_recursion_limit(graph, start, loop_iterations=4) == DEFAULT_RECURSION_LIMIT
+    assert recommended_recursion_limit(graph, start, loop_iterations=40) == 1 + 2 * 40 + 40
+
+
+def test_gen_main_recursion_limit():
+    assert '"recursion_limit"' not in gen_main("demo", "State")
+    assert '{"configurable": {"thread_id": "1"}, "recursion_limit": 31}' in gen_main("demo", "State", 31)
+
+
+def test_main_gets_recommended_limit():
+    project = GeneratedProject.from_spec(PLAN_AND_EXECUTE, "plan_and_execute")
+    assert f'"recursion_limit": {project.recursion_limit}' in project.main
+    assert project.loop_guards == {}
+    assert "loop_guard" not in project.graph
+
+
+def test_loop_guard_code():
+    project = GeneratedProject.from_spec(PLAN_AND_EXECUTE, "plan_and_execute", loop_guard=3)
+    assert project.loop_guards == {"replan_step": "END"}
+    assert "replan_step_iterations: Annotated[int, add_int]" in project.state
+    assert "'replan_step_iterations': 0" in project.state
+    graph = project.graph
+    assert "add_node('replan_step', count_iterations(replan_step, 'replan_step_iterations'))" in graph
+    assert "loop_guard(after_replan_step, 'replan_step_iterations', 3, 'END')" in graph
+    assert "add_node('execute_step', execute_step)" in graph
+    compile(project.graph_module, "plan_and_execute_graph.py", "exec")
+
+
+def test_loop_guard_helpers_force_exit():
+    namespace = {}
+    exec(LOOP_GUARD_HELPERS, namespace)
+
+    def replan_step(state, *, config=None):
+        return {"counter": state["counter"] + 1}
+
+    def after_replan_step(state):
+        return "execute_step"
+
+    node = namespace["count_iterations"](replan_step, "replan_step_iterations")
+    router = namespace["loop_guard"](after_replan_step, "replan_step_iterations", 2, "END")
+    assert node.__wrapped__ is replan_step  # signature (and config kwarg) visible to LangGraph
+
+    state = {"counter": 0}
+    routes = []
+    for _ in range(3):
+        state.update(node(state, config={}))
+        routes.append(router(state))
+    assert routes == ["execute_step", "END", "END"]
+    assert state == {"counter": 3, "replan_step_iterations": 3}
+
+
+def test_worker_routers_are_not_guarded():
+    spec = "START -> planner -> sections | writer -> reviewer\nreviewer -> ok ? END : planner\n"
+    project = GeneratedProject.from_spec(spec, "demo", loop_guard=5)
+    assert project.loop_guards == {"reviewer": "END"}
+
+
+@pytest.mark.parametrize("example", list_examples())
+def test_guarded_examples_compile(example):
+    project = GeneratedProject.from_file(get_example_path(example), loop_guard=5)
+    compile(project.graph_module, f"{project.basename}_graph.py", "exec")
+    compile(project.state, f"{project.basename}_state.py", "exec")
+    assert project.recursion_limit >= DEFAULT_RECURSION_LIMIT
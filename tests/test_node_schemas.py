@@ -0,0 +1,132 @@
+"""Tests for per-node input/output schemas (--node-schemas)."""
+
+import subprocess
+import sys
+import typing
+from pathlib import Path
+
+import pytest
+
+try:
+    from langgraph_codegen.gen_graph import gen_node_schemas, node_schema_names, list_examples, get_example_path
+    from langgraph_codegen.project import GeneratedProject
+    from langgraph_codegen.transforms import NodeAccess
+except ImportError:
+    sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+    from langgraph_codegen.gen_graph import gen_node_schemas, node_schema_names, list_examples, get_example_path
+    from langgraph_codegen.project import GeneratedProject
+    from langgraph_codegen.transforms import NodeAccess
+
+SPEC = """\
+STATE: BriefingState
+topic: str
+city: str
+news: str
+weather: str
+summary: str
+messages: list[str]
+
+NODES:
+fetch_news: reads=topic writes=news,messages
+fetch_weather: reads=city writes=weather
+summarize: reads=news,weather writes=summary
+
+START -> fetch_news -> fetch_weather -> summarize -> END
+"""
+
+
+def _exec_state(project):
+    namespace = {}
+    exec(project.state, namespace)
+    return namespace
+
+
+def test_schema_names():
+    assert node_schema_names("fetch_news") == ("FetchNewsInput", "FetchNewsOutput")
+    assert node_schema_names("planStep") == ("PlanStepInput", "PlanStepOutput")
+
+
+def test_schemas_keep_state_order_and_reducers():
+    code = gen_node_schemas(
+        [("a", "str"), ("b", "list[str]")],
+        {"n": NodeAccess(frozenset({"b", "a"}), frozenset())},
+    )
+    assert "class NInput(TypedDict):\n    a: str\n    b: Annotated[list[str], add_to_list]\n" in code
+    assert "class NOutput(TypedDict):\n    pass\n" in code
+    with pytest.raises(ValueError, match="zz"):
+        gen_node_schemas([("a", "str")], {"n": NodeAccess(frozenset({"zz"}), frozenset())})
+
+
+def test_state_module_schemas():
+    namespace = _exec_state(GeneratedProject.from_spec(SPEC, "briefing", node_schemas=True))
+    hints = typing.get_type_hints(namespace["SummarizeInput"])
+    assert list(hints) == ["news", "weather"]
+    assert list(typing.get_type_hints(namespace["FetchNewsOutput"])) == ["news", "messages"]
+    # graph input: read but never written; output: written but never read
+    assert list(typing.get_type_hints(namespace["BriefingStateInput"])) == ["topic", "city"]
+    assert list(typing.get_type_hints(namespace["BriefingStateOutput"])) == ["summary", "messages"]
+
+
+def test_nodes_and_graph_use_schemas():
+    project = GeneratedProject.from_spec(SPEC, "briefing", node_schemas=True)
+    assert ("def summarize(state: SummarizeInput, *, config:Optional[RunnableConfig] = None)"
+            " -> SummarizeOutput:") in project.nodes
+    assert "return { 'news': '', 'messages': [] }" in project.nodes
+    graph = project.graph
+    assert "StateGraph(BriefingState, input_schema=BriefingStateInput, output_schema=BriefingStateOutput)" in graph
+    assert "add_node('summarize', summarize, input_schema=SummarizeInput)" in graph
+    files = dict(project.files())
+    assert "SummarizeInput,\n" in files["briefing_graph.py"]
+    assert "SummarizeOutput,\n" in files["briefing_nodes.py"]
+    for name, code in files.items():
+        if name.endswith(".py"):
+            compile(code, name, "exec")
+
+
+def test_partial_declarations():
+    # an undeclared node keeps the full state, and the graph keeps its schema
+    spec = SPEC.replace("summarize: reads=news,weather writes=summary\n", "")
+    project = GeneratedProject.from_spec(spec, "briefing", node_schemas=True)
+    assert project.graph_schemas == (None, None)
+    assert "StateGraph(BriefingState)" in project.graph
+    assert "add_node('summarize', summarize)" in project.graph
+    assert "def summarize(state: BriefingState" in project.nodes
+
+
+def test_off_by_default():
+    project = GeneratedProject.from_spec(SPEC, "briefing")
+    assert project.node_access == {}
+    assert "input_schema" not in project.graph
+    assert "Node Schemas" not in project.state
+
+
+def test_guarded_and_fused_nodes():
+    spec = SPEC.replace("summarize -> END", "summarize\nsummarize -> done ? END : fetch_news")
+    project = GeneratedProject.from_spec(spec, "briefing", node_schemas=True, fuse_chains=True, loop_guard=2)
+    fused = "fetch_news__fetch_weather__summarize"
+    assert project.parsed.fused_nodes == {fused: ["fetch_news", "fetch_weather", "summarize"]}
+    namespace = _exec_state(project)
+    fused_input = node_schema_names(fused)[0]
+    assert set(typing.get_type_hints(namespace[fused_input])) == {
+        "topic", "city", "news", "weather", f"{fused}_iterations",
+    }
+    assert f"input_schema={fused_input}" in project.graph
+    assert "def fetch_news(state: FetchNewsInput" in project.nodes
+
+
+def test_cli(tmp_path):
+    spec_file = tmp_path / "briefing.lgraph"
+    spec_file.write_text(SPEC)
+    result = subprocess.run(
+        [sys.executable, "-m", "langgraph_codegen.lgcodegen", str(spec_file), "--node-schemas", "--graph", "--stdout"],
+        capture_output=True, text=True,
+    )
+    assert result.returncode == 0, result.stderr
+    assert "input_schema=FetchNewsInput" in result.stdout
+
+
+@pytest.mark.parametrize("example", list_examples())
+def test_examples_unchanged_without_declarations(example):
+    plain = GeneratedProject.from_file(get_example_path(example))
+    with_schemas = GeneratedProject.from_file(get_example_path(example), node_schemas=True)
+    assert with_schemas.files() == plain.files()
@@ -0,0 +1,153 @@
+"""Tests for read/write declarations and --parallelize."""
+
+import io
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+try:
+    from langgraph_codegen.gen_graph import parse_spec_stream
+    from langgraph_codegen.project import GeneratedProject
+    from langgraph_codegen.transforms import NodeAccess, linear_chains, node_access, parallelize_chains
+except ImportError:
+    sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+    from langgraph_codegen.gen_graph import parse_spec_stream
+    from langgraph_codegen.project import GeneratedProject
+    from langgraph_codegen.transforms import NodeAccess, linear_chains, node_access, parallelize_chains
+
+STATE = """\
+STATE: BriefingState
+topic: str
+city: str
+news: str
+weather: str
+summary: str
+"""
+
+SPEC = STATE + """
+NODES:
+fetch_news: reads=topic writes=news latency=3
+fetch_weather: reads=city writes=weather latency=2
+summarize: reads=news,weather writes=summary latency=1
+
+START -> fetch_news -> fetch_weather -> summarize -> END
+"""
+
+
+def _parse(spec):
+    return parse_spec_stream(io.StringIO(spec), "briefing")
+
+
+def _edges(graph_dict):
+    return {node: [e["destination"] for e in d["edges"]] for node, d in graph_dict.items()}
+
+
+def test_node_access():
+    access = node_access(_parse(SPEC))
+    assert access["summarize"] == NodeAccess(frozenset({"news", "weather"}), frozenset({"summary"}))
+    assert access["fetch_news"].independent_of(access["fetch_weather"])
+    assert not access["fetch_news"].independent_of(access["summarize"])   # write/read
+    assert not access["summarize"].independent_of(access["fetch_news"])   # read/write
+
+
+def test_unknown_field_is_rejected():
+    spec = STATE + "\nNODES:\nfetch_news: reads=topik writes=news\n\nSTART -> fetch_news -> END\n"
+    with pytest.raises(ValueError, match="topik"):
+        node_access(_parse(spec))
+
+
+def test_linear_chains():
+    parsed = _parse("START -> a -> b -> c\nc -> ok ? d : a\nd -> e -> END\n")
+    # a has two entries (START and c), so it can only head a chain
+    assert linear_chains(parsed.graph_dict) == [["a", "b", "c"], ["d", "e"]]
+
+
+def test_parallelize_independent_pair():
+    parsed, transformations = parallelize_chains(_parse(SPEC))
+    assert [str(t) for t in transformations] == [
+        "parallelize: START -> fetch_news -> fetch_weather -> summarize  =>  "
+        "START -> fetch_news, fetch_weather -> summarize"
+    ]
+    assert _edges(parsed.graph_dict) == {
+        "START": ["fetch_news", "fetch_weather"],
+        "fetch_news": ["summarize"],
+        "fetch_weather": ["summarize"],
+        "summarize": ["END"],
+    }
+
+
+def test_dependent_nodes_stay_sequential():
+    spec = STATE + (
+        "\nNODES:\nfetch_news: reads=topic writes=news\nsummarize: reads=news writes=summary\n\n"
+        "START -> fetch_news -> summarize -> END\n"
+    )
+    parsed = _parse(spec)
+    assert parallelize_chains(parsed) == (parsed, [])
+
+
+def test_undeclared_nodes_are_not_moved():
+    spec = STATE + "\nNODES:\nfetch_news: reads=topic writes=news\n\nSTART -> fetch_news -> fetch_weather -> END\n"
+    assert parallelize_chains(_parse(spec))[1] == []
+
+
+def test_chain_head_is_not_grouped():
+    # fetch_news is entered from a routing branch, so it heads its chain
+    spec = STATE + (
+        "\nNODES:\nfetch_news: reads=topic writes=news\nfetch_weather: reads=city writes=weather\n\n"
+        "START -> check\ncheck -> is_ready ? fetch_news : END\n"
+        "fetch_news -> fetch_weather -> summarize -> END\n"
+    )
+    assert parallelize_chains(_parse(spec))[1] == []
+
+
+def test_consecutive_groups_use_join_as_fan_out():
+    spec = STATE + """
+NODES:
+a: reads=topic writes=news
+b: reads=city writes=weather
+join: reads=news,weather writes=summary
+c: reads=summary writes=topic
+d: reads=summary writes=city
+
+START -> a -> b -> join -> c -> d -> END
+"""
+    parsed, transformations = parallelize_chains(_parse(spec))
+    assert len(transformations) == 2
+    assert _edges(parsed.graph_dict) == {
+        "START": ["a", "b"], "a": ["join"], "b": ["join"],
+        "join": ["c", "d"], "c": ["END"], "d": ["END"],
+    }
+
+
+def test_project_uses_parallel_graph():
+    project = GeneratedProject.from_spec(SPEC, "briefing", parallelize=True)
+    assert project.original.graph_dict != project.parsed.graph_dict
+    assert "builder_briefing.add_edge(START, 'fetch_weather')" in project.graph
+    assert project.schedule.supersteps == [["fetch_news", "fetch_weather"], ["summarize"]]
+    assert project.schedule.schedule_latency == 4
+
+
+def test_cli_prints_transformation(tmp_path):
+    spec_file = tmp_path / "briefing.lgraph"
+    spec_file.write_text(SPEC)
+    result = subprocess.run(
+        [sys.executable, "-m", "langgraph_codegen.lgcodegen", str(spec_file), "--parallelize", "--analyze", "json"],
+        capture_output=True, text=True,
+    )
+    assert result.returncode == 0, result.stderr
+    assert "parallelize: START -> fetch_news -> fetch_weather -> summarize" in result.stderr
+    assert json.loads(result.stdout)["schedule"]["max_width"] == 2
+
+
+def test_cli_reports_bad_declaration(tmp_path):
+    spec_file = tmp_path / "briefing.lgraph"
+    spec_file.write_text(SPEC.replace("reads=topic", "reads=topik"))
+    result = subprocess.run(
+        [sys.executable, "-m", "langgraph_codegen.lgcodegen", str(spec_file), "--parallelize", "--stdout"],
+        capture_output=True, text=True,
+    )
+    assert result.returncode == 1
+    assert "Error: NODES: fetch_news uses topik" in result.stderr
@@ -0,0 +1,144 @@
+"""Tests for stage-level generator profiling."""
+
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+try:
+    from langgraph_codegen.gen_graph import (
+        gen_graph, parse_spec, expand_chains, preprocess_start_syntax,
+    )
+    from langgraph_codegen.profiling import StageProfiler, profile_iter, stage
+except ImportError:
+    sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+    from langgraph_codegen.gen_graph import (
+        gen_graph, parse_spec, expand_chains, preprocess_start_syntax,
+    )
+    from langgraph_codegen.profiling import StageProfiler, profile_iter, stage
+
+
+SPEC = """\
+START:PlanExecute -> plan_step -> execute_step -> replan_step
+replan_step -> is_done ? END : execute_step
+"""
+
+
+def _generate():
+    spec = preprocess_start_syntax(expand_chains(SPEC), "test")
+    parsed = parse_spec(spec)
+    return gen_graph("test", spec, parsed=parsed)
+
+
+def test_records_pipeline_stages():
+    with StageProfiler() as profiler:
+        _generate()
+    for name in ("expand_chains", "preprocess_start_syntax", "normalize_spec",
+                 "parse_graph_spec", "parse_spec", "gen_graph"):
+        assert name in profiler.stages, name
+        assert profiler.stages[name].calls >= 1
+        assert profiler.stages[name].wall_time >= 0
+
+
+def test_peak_allocation_tracked():
+    with StageProfiler() as profiler:
+        with stage("allocate"):
+            data = [0] * 100_000
+        del data
+    assert profiler.stages["allocate"].peak_bytes >= 100_000 * 8
+
+
+def test_nested_stage_peak_includes_child():
+    with StageProfiler() as profiler:
+        with stage("outer"):
+            with stage("inner"):
+                data = bytearray(1_000_000)
+            del data
+    assert profiler.stages["outer"].peak_bytes >= profiler.stages["inner"].peak_bytes
+
+
+def test_streaming_stages_report_their_own_time():
+    def slow(items):
+        for item in items:
+            time.sleep(0.02)
+            yield item
+
+    with StageProfiler(trace_memory=False) as profiler:
+        stream = profile_iter("slow", slow(range(5)))
+        stream = profile_iter("fast", (item * 2 for item in stream))
+        with stage("sink", streaming=True):
+            assert list(stream) == [0, 2, 4, 6, 8]
+    assert list(profiler.stages) == ["slow", "fast", "sink"]
+    assert [t.calls for t in profiler.stages.values()] == [1, 1, 1]
+    assert profiler.stages["slow"].wall_time >= 0.1
+    assert profiler.stages["fast"].wall_time < 0.02
+    assert profiler.stages["sink"].wall_time < 0.02
+
+
+def test_inactive_profiler_is_noop():
+    with stage("ignored"):
+        pass
+    profiler = StageProfiler()
+    assert profiler.stages == {}
+    # Output is unchanged whether or not profiling is active
+    plain = _generate()
+    with StageProfiler():
+        profiled = _generate()
+    assert plain == profiled
+
+
+def test_repeated_stage_accumulates_calls():
+    with StageProfiler(trace_memory=False) as profiler:
+        for _ in range(3):
+            with stage("step"):
+                pass
+    assert profiler.stages["step"].calls == 3
+    assert profiler.stages["step"].peak_bytes == 0
+
+
+def test_report_and_dict():
+    with StageProfiler() as profiler:
+        _generate()
+    report = profiler.report()
+    assert report.splitlines()[0].startswith("stage")
+    assert "gen_graph" in report
+    names = [entry["name"] for entry in profiler.to_dict()]
+    assert names == list(profiler.stages)
+
+
+def test_pstats_dump(tmp_path):
+    import pstats
+    stats_file = tmp_path / "gen.pstats"
+    with StageProfiler(pstats_path=str(stats_file)):
+        _generate()
+    assert stats_file.exists()
+    pstats.Stats(str(stats_file))
+
+
+def test_cli_profile(tmp_path):
+    spec_file = tmp_path / "plan.lgraph"
+    spec_file.write_text(SPEC)
+    result = subprocess.run(
+        [sys.executable, "-m", "langgraph_codegen.lgcodegen", str(spec_file),
+         "-o", str(tmp_path / "out"), "--profile"],
+        capture_output=True, text=True,
+    )
+    assert result.returncode == 0, result.stderr
+    stages = [line.split()[0] for line in result.stderr.splitlines()[1:] if line.strip()]
+    for name in ("parse_state_section", "parse_nodes_section", "expand_chains", "preprocess_start_syntax",
+                 "normalize_spec", "parse_graph_spec", "parse_spec_stream", "gen_graph", "write_files"):
+        assert name in stages, name
+
+
+def test_cli_profile_stats_implies_profile(tmp_path):
+    spec_file = tmp_path / "plan.lgraph"
+    spec_file.write_text(SPEC)
+    stats_file = tmp_path / "gen.pstats"
+    result = subprocess.run(
+        [sys.executable, "-m", "langgraph_codegen.lgcodegen", str(spec_file),
+         "-o", str(tmp_path / "out"), "--profile-stats", str(stats_file)],
+        capture_output=True, text=True,
+    )
+    assert result.returncode == 0, result.stderr
+    assert "gen_graph" in result.stderr
+    assert stats_file.exists()
@@ -0,0 +1,96 @@
+"""Tests for GeneratedProject: lazy artifacts and write() skipping unchanged files."""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+try:
+    from langgraph_codegen import project as project_module
+    from langgraph_codegen.project import GeneratedProject
+except ImportError:
+    sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+    from langgraph_codegen import project as project_module
+    from langgraph_codegen.project import GeneratedProject
+
+SPEC = """\
+STATE: PlanState
+plan: list[str]
+done: bool
+
+START -> planner -> sections | writer -> reviewer
+reviewer -> is_done ? END : planner
+"""
+
+
+def _project(tmp_path, name="plan"):
+    spec_file = tmp_path / f"{name}.lgraph"
+    spec_file.write_text(SPEC)
+    return GeneratedProject.from_file(spec_file)
+
+
+def test_artifacts_are_rendered_lazily(tmp_path, monkeypatch):
+    project = _project(tmp_path)
+    calls = []
+    real_gen_graph = project_module.gen_graph
+
+    def counting_gen_graph(*args, **kwargs):
+        calls.append(args[0])
+        return real_gen_graph(*args, **kwargs)
+
+    monkeypatch.setattr(project_module, "gen_graph", counting_gen_graph)
+    assert "class PlanState(TypedDict):" in project.state
+    assert calls == []
+    assert "builder_plan = StateGraph(PlanState)" in project.graph
+    assert project.graph is project.graph
+    assert calls == ["plan"]
+
+
+def test_sections(tmp_path):
+    project = _project(tmp_path)
+    assert project.node_names == ["planner", "writer", "reviewer"]
+    assert project.import_node_names == ["planner", "reviewer"]
+    assert "def writer(item):" in project.workers
+    assert "def assign_workers_writer(state: PlanState):" in project.assignments
+    assert "def is_done(state: PlanState) -> bool:" in project.conditions
+    module = project.graph_module
+    assert module.index("def is_done") < module.index("def writer") < module.index("builder_plan")
+    assert "from plan_graph import plan" in project.main
+    assert project.lgraphx.splitlines()[1:3] == ["START -> planner", "planner -> sections | writer"]
+
+
+def test_files_match_requested_sections(tmp_path):
+    project = _project(tmp_path)
+    assert [name for name, _ in project.files()] == [
+        "plan.lgraphx", "plan_state.py", "plan_nodes.py", "plan_graph.py", "main.py", "README.md",
+    ]
+    assert [name for name, _ in project.files(["graph"])] == ["plan.lgraphx", "plan_graph.py"]
+    graph_file = dict(project.files())["plan_graph.py"]
+    assert graph_file.startswith("from plan_state import PlanState\nfrom plan_nodes import planner, reviewer\n")
+
+
+def test_write_skips_unchanged_files(tmp_path):
+    out = tmp_path / "out"
+    first = _project(tmp_path).write(out)
+    assert all(written for _path, written in first)
+    mtimes = {path: path.stat().st_mtime_ns for path, _ in first}
+
+    (out / "main.py").write_text("# edited\n")
+    second = _project(tmp_path).write(out)
+    assert [path.name for path, written in second if written] == ["main.py"]
+    for path, written in second:
+        if not written:
+            assert path.stat().st_mtime_ns == mtimes[path]
+
+
+def test_text_forms_required_for_readme(tmp_path):
+    spec_file = tmp_path / "plan.lgraph"
+    spec_file.write_text(SPEC)
+    project = GeneratedProject.from_file(spec_file, keep_text=())
+    assert "builder_plan" in project.graph
+    with pytest.raises(ValueError, match="expanded_spec"):
+        project.lgraphx
+
+
+def test_from_spec_matches_from_file(tmp_path):
+    assert GeneratedProject.from_spec(SPEC, "plan").files() == _project(tmp_path).files()
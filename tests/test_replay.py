@@ -0,0 +1,203 @@
+"""Tests for the generated replay.py and the graph code that uses it."""
+
+import importlib.util
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+try:
+    from langgraph_codegen.gen_graph import gen_replay, list_examples, get_example_path
+    from langgraph_codegen.project import GeneratedProject
+except ImportError:
+    sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+    from langgraph_codegen.gen_graph import gen_replay, list_examples, get_example_path
+    from langgraph_codegen.project import GeneratedProject
+
+SPEC = """\
+START:DemoState -> plan
+plan -> pick(execute, END)
+execute -> replan
+replan -> is_done ? END : execute
+"""
+
+# Stands in for the LangGraph-compiled graph, wrapped the way gen_graph wraps it
+FAKE_GRAPH = '''
+import random
+import replay
+
+def plan(state):
+    return {"steps": 0}
+
+def execute(state):
+    return {"steps": state["steps"] + 1}
+
+def replan(state):
+    return {}
+
+def pick(state):
+    return random.choice(["execute", "END"])
+
+def is_done(state):
+    return random.random() < 0.3
+
+NODES = {name: replay.node(name, fn) for name, fn in
+         [("plan", plan), ("execute", execute), ("replan", replan)]}
+ROUTERS = {"plan": replay.router("plan", pick), "replan": replay.router("replan", is_done)}
+
+class FakeGraph:
+    def invoke(self, state, config=None):
+        state.update(NODES["plan"](state))
+        if ROUTERS["plan"](state) == "END":
+            return state
+        while True:
+            state.update(NODES["execute"](state))
+            state.update(NODES["replan"](state))
+            if ROUTERS["replan"](state):
+                return state
+
+demo = FakeGraph()
+'''
+
+
+@pytest.fixture
+def replay_module(tmp_path, monkeypatch):
+    path = tmp_path / "replay.py"
+    path.write_text(gen_replay("demo", 25))
+    spec = importlib.util.spec_from_file_location("replay", path)
+    module = importlib.util.module_from_spec(spec)
+    monkeypatch.setitem(sys.modules, "replay", module)
+    spec.loader.exec_module(module)
+    yield module
+    module.stop()
+
+
+def test_replay_is_opt_in(tmp_path):
+    spec = tmp_path / "demo.lgraph"
+    spec.write_text(SPEC)
+    plain = GeneratedProject.from_file(spec)
+    assert "replay.py" not in dict(plain.files())
+    assert "import replay" not in plain.graph
+
+    project = GeneratedProject.from_file(spec, replay=True)
+    graph = project.graph
+    assert "import replay" in graph
+    assert "add_node('plan', replay.node('plan', plan))" in graph
+    assert "replay.router('replan', after_replan)" in graph
+    assert "replay.router('plan', pick)" in graph
+    assert "replay.py" in dict(project.files())
+    compile(project.replay, "replay.py", "exec")
+
+
+def test_guarded_and_worker_routers_are_wrapped():
+    spec = "START -> planner -> sections | writer -> reviewer\nreviewer -> ok ? END : planner\n"
+    graph = GeneratedProject.from_spec(spec, "demo", loop_guard=3, replay=True).graph
+    assert "replay.node('reviewer', count_iterations(reviewer, 'reviewer_iterations'))" in graph
+    assert "replay.router('reviewer', loop_guard(after_reviewer, 'reviewer_iterations', 3, 'END'))" in graph
+    assert "replay.router('planner:assign_workers_writer', assign_workers_writer)" in graph
+    assert "replay.node('writer', writer)" in graph
+
+
+def test_wrappers_call_through_without_a_session(replay_module):
+    def node(state, *, config=None):
+        return {"seen": config}
+
+    wrapped = replay_module.node("n", node)
+    assert wrapped({}, config={"x": 1}) == {"seen": {"x": 1}}
+    assert replay_module.node("w", lambda item: {"item": item})("a") == {"item": "a"}
+    assert replay_module.router("r", lambda state: "END")({}) == "END"
+
+
+def test_log_round_trip(replay_module, tmp_path):
+    log = tmp_path / "run.replay"
+    with open(log, "wb") as fp:
+        fp.write(replay_module.MAGIC)
+        replay_module.write_record(fp, replay_module.DECISION, "plan", 0, 0.0, b"d", "execute")
+        replay_module.write_record(fp, replay_module.NODE, "execute", 0, 0.25, None, {"steps": 1})
+    assert list(replay_module.read_log(log)) == [
+        (replay_module.DECISION, "plan", 0, 0.0, b"d", "execute"),
+        (replay_module.NODE, "execute", 0, 0.25, None, {"steps": 1}),
+    ]
+    assert replay_module.timings(log) == {"execute": [0.25]}
+
+    (tmp_path / "bad.replay").write_bytes(b"not a log")
+    with pytest.raises(ValueError, match="not a replay log"):
+        list(replay_module.read_log(tmp_path / "bad.replay"))
+
+
+def test_format_timings(replay_module):
+    before = {"execute": [0.002, 0.004], "plan": [0.001]}
+    assert "new mean ms" not in replay_module.format_timings(before)
+    # --stub '*': nothing re-ran, so there are no new samples
+    header, execute, plan = replay_module.format_timings(before, {}).splitlines()
+    assert header.split()[-1] == "ratio"
+    assert execute.split() == ["execute", "2", "3.000", "-", "-"]
+    _, execute, plan = replay_module.format_timings(before, {"execute": [0.006]}).splitlines()
+    assert execute.split() == ["execute", "2", "3.000", "6.000", "2.00"]
+    assert plan.split()[-2:] == ["-", "-"]
+
+
+def test_replay_reproduces_decisions(replay_module, tmp_path):
+    calls = []
+
+    def node(state):
+        calls.append(state["i"])
+        return {"out": state["i"] * 2}
+
+    flip = iter([True, False, True])
+    wrapped_node = replay_module.node("n", node)
+    wrapped_router = replay_module.router("r", lambda state: next(flip))
+
+    replay_module.start(output=tmp_path / "run.replay")
+    recorded = [(wrapped_node({"i": i}), wrapped_router({"i": i})) for i in range(3)]
+    replay_module.stop()
+
+    # Decisions come from the log; live routing is never called
+    wrapped_router = replay_module.router("r", lambda state: pytest.fail("router ran during replay"))
+    session = replay_module.start(replay_from=tmp_path / "run.replay")
+    assert [(wrapped_node({"i": i}), wrapped_router({"i": i})) for i in range(3)] == recorded
+    assert calls == [0, 1, 2, 0, 1, 2]
+    assert [name for name, _seconds, stubbed in session.timings] == ["n", "n", "n"]
+    with pytest.raises(replay_module.ReplayDivergence):
+        wrapped_router({"i": 3})
+    replay_module.stop()
+
+    # Stubbed nodes return the recorded output without running
+    replay_module.start(replay_from=tmp_path / "run.replay", stub=["n"])
+    assert wrapped_node({"i": 1}) == {"out": 2}
+    assert calls == [0, 1, 2, 0, 1, 2]
+
+
+def test_record_and_replay_cli(tmp_path):
+    spec = tmp_path / "demo.lgraph"
+    spec.write_text(SPEC)
+    (tmp_path / "replay.py").write_text(GeneratedProject.from_file(spec, replay=True).replay)
+    (tmp_path / "demo_graph.py").write_text(FAKE_GRAPH)
+    (tmp_path / "demo_state.py").write_text("def initialize_state():\n    return {}\n")
+
+    def run(*args):
+        result = subprocess.run([sys.executable, "replay.py", *args], cwd=tmp_path, capture_output=True, text=True)
+        assert result.returncode == 0, result.stderr
+        return result.stdout
+
+    # Record until the run takes the loop at least once
+    for _ in range(50):
+        run("record", "run.replay")
+        if "execute" in run("timings", "run.replay"):
+            break
+    recorded = run("timings", "run.replay")
+    assert recorded.splitlines()[0].split() == ["node", "runs", "mean", "ms"]
+
+    # New node code, same control flow: every node runs as often as before
+    (tmp_path / "demo_graph.py").write_text(FAKE_GRAPH.replace('return {"steps": 0}', 'return {"steps": 10}'))
+    output = run("replay", "run.replay", "--stub", "replan", "--output", "new.replay")
+    assert "ratio" in output.splitlines()[0]
+    runs = lambda text: {line.split()[0]: line.split()[1] for line in text.splitlines()[1:]}
+    assert runs(run("timings", "new.replay")) == runs(recorded)
+
+
+@pytest.mark.parametrize("example", list_examples())
+def test_examples_with_replay_compile(example):
+    project = GeneratedProject.from_file(get_example_path(example), replay=True)
+    compile(project.graph_module, f"{project.basename}_graph.py", "exec")
@@ -0,0 +1,130 @@
+"""Tests for NODES hints and the superstep / critical-path schedule (--analyze)."""
+
+import io
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+try:
+    from langgraph_codegen.analysis import schedule_graph
+    from langgraph_codegen.gen_graph import (
+        parse_nodes_section, parse_state_section, parse_spec_stream, list_examples, get_example_path,
+        parse_spec_file,
+    )
+except ImportError:
+    sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+    from langgraph_codegen.analysis import schedule_graph
+    from langgraph_codegen.gen_graph import (
+        parse_nodes_section, parse_state_section, parse_spec_stream, list_examples, get_example_path,
+        parse_spec_file,
+    )
+
+SPEC = """\
+STATE: ResearchState
+topic: str
+NODES:
+plan: latency=2 tokens=1000
+# parallel research
+research_a: latency=5 tokens=3000
+research_b: latency=3 tokens=2000
+write: latency=6 tokens=4000
+
+START -> plan -> research_a, research_b -> write
+write -> good ? END : plan
+"""
+
+
+def _parse(spec):
+    return parse_spec_stream(io.StringIO(spec), "research")
+
+
+def test_nodes_section_parsed_and_stripped():
+    parsed = _parse(SPEC)
+    assert parsed.node_hints == {
+        "plan": {"latency": "2", "tokens": "1000"},
+        "research_a": {"latency": "5", "tokens": "3000"},
+        "research_b": {"latency": "3", "tokens": "2000"},
+        "write": {"latency": "6", "tokens": "4000"},
+    }
+    assert parsed.state_fields == [("topic", "str")]
+    assert set(parsed.graph_dict) == {"START", "plan", "research_a", "research_b", "write"}
+
+
+def test_text_parse_matches_stream():
+    _class_name, fields, spec = parse_state_section(SPEC)
+    node_hints, spec = parse_nodes_section(spec)
+    assert fields == [("topic", "str")]
+    assert node_hints == _parse(SPEC).node_hints
+    assert "NODES" not in spec and "latency" not in spec
+    assert parse_nodes_section("START -> a\n") == ({}, "START -> a\n")
+
+
+def test_schedule():
+    parsed = _parse(SPEC)
+    schedule = schedule_graph(parsed.graph_dict, parsed.start_node, parsed.node_hints)
+    assert schedule.supersteps == [["plan"], ["research_a", "research_b"], ["write"]]
+    assert schedule.step_latency == [2, 5, 6]
+    assert schedule.schedule_latency == 13
+    assert schedule.critical_path == ["plan", "research_a", "write"]
+    assert schedule.critical_path_latency == 13
+    assert schedule.serial_latency == 16
+    assert schedule.speedup == pytest.approx(16 / 13)
+    assert schedule.max_width == 2
+    assert schedule.tokens == 10000
+    assert schedule.back_edges == [("write", "plan")]
+    assert schedule.unannotated == []
+
+
+def test_uneven_branches_wait_for_superstep():
+    spec = (
+        "NODES:\nfast_1: latency=1\nslow_1: latency=5\nfast_2: latency=1\nslow_2: latency=5\n\n"
+        "START -> fast_1, slow_1\nfast_1 -> slow_2\nslow_1 -> fast_2\nslow_2, fast_2 => END\n"
+    )
+    parsed = _parse(spec)
+    schedule = schedule_graph(parsed.graph_dict, parsed.start_node, parsed.node_hints)
+    # Each superstep waits for its slowest node, so supersteps cost more than the critical path
+    assert schedule.step_latency == [5, 5]
+    assert schedule.critical_path_latency == 6
+    assert schedule.schedule_latency == 10
+
+
+def test_router_destinations_are_alternatives():
+    spec = "NODES:\na: latency=1\nb: latency=4 tokens=10\nc: latency=2 tokens=30\n\nSTART -> a -> pick(b, c)\nb -> END\nc -> END\n"
+    parsed = _parse(spec)
+    schedule = schedule_graph(parsed.graph_dict, parsed.start_node, parsed.node_hints)
+    assert schedule.supersteps == [["a"], ["b", "c"]]
+    assert schedule.max_width == 1
+    assert schedule.serial_latency == 5
+    assert schedule.tokens == 30
+
+
+def test_bad_hint():
+    parsed = _parse("NODES:\na: latency=fast\n\nSTART -> a -> END\n")
+    with pytest.raises(ValueError, match="latency=fast"):
+        schedule_graph(parsed.graph_dict, parsed.start_node, parsed.node_hints)
+
+
+@pytest.mark.parametrize("example", list_examples())
+def test_examples_schedule(example):
+    parsed = parse_spec_file(get_example_path(example))
+    schedule = schedule_graph(parsed.graph_dict, parsed.start_node, parsed.node_hints)
+    assert schedule.supersteps
+    assert schedule.schedule_latency >= schedule.critical_path_latency
+    assert schedule.serial_latency >= schedule.schedule_latency
+
+
+def test_cli_analyze_json(tmp_path):
+    spec_file = tmp_path / "research.lgraph"
+    spec_file.write_text(SPEC)
+    result = subprocess.run(
+        [sys.executable, "-m", "langgraph_codegen.lgcodegen", str(spec_file), "--analyze", "json"],
+        capture_output=True, text=True, cwd=tmp_path,
+    )
+    assert result.returncode == 0, result.stderr
+    report = json.loads(result.stdout)
+    assert report["schedule"]["schedule_latency"] == 13
+    assert [issue["kind"] for issue in report["issues"]] == ["unbounded_loop"]
+    assert not (tmp_path / "research").exists()
@@ -0,0 +1,109 @@
+"""Tests for STATE retention directives (keep=N, ephemeral) and the checkpoint budget."""
+
+import io
+import sys
+from pathlib import Path
+
+import pytest
+
+try:
+    from langgraph_codegen.gen_graph import (
+        gen_state_class, parse_byte_size, parse_spec_stream, parse_state_section,
+        split_field_policy,
+    )
+    from langgraph_codegen.project import GeneratedProject
+except ImportError:
+    sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+    from langgraph_codegen.gen_graph import (
+        gen_state_class, parse_byte_size, parse_spec_stream, parse_state_section,
+        split_field_policy,
+    )
+    from langgraph_codegen.project import GeneratedProject
+
+SPEC = """\
+STATE: ChatState budget=64KB
+messages: list[str] keep=3
+scratch: dict[str, int] ephemeral
+counter: int
+
+START -> a -> b -> END
+"""
+
+
+def test_split_field_policy():
+    assert split_field_policy("list[str] keep=50") == ("list[str]", {"keep": 50})
+    assert split_field_policy("dict[str, int] ephemeral") == ("dict[str, int]", {"ephemeral": True})
+    assert split_field_policy("dict[str, int]") == ("dict[str, int]", {})
+    for bad in ("str keep=5", "list keep=0", "list keep=5 ephemeral"):
+        with pytest.raises(ValueError):
+            split_field_policy(bad)
+
+
+def test_parse_byte_size():
+    assert parse_byte_size("65536") == 65536
+    assert parse_byte_size("64KB") == 64 * 1024
+    assert parse_byte_size("1.5mb") == 1536 * 1024
+    assert parse_byte_size("64K") == 64 * 1024
+    assert parse_byte_size("2g") == 2 * 1024 ** 3
+    with pytest.raises(ValueError):
+        parse_byte_size("lots")
+    with pytest.raises(ValueError):
+        parse_byte_size("1.2.3K")
+
+
+def test_budget_with_bare_suffix():
+    parsed = parse_spec_stream(io.StringIO("STATE: S budget=64K\nitems: list\n\nSTART -> a -> END\n"), "s")
+    assert parsed.checkpoint_budget == 64 * 1024
+
+
+def test_stream_keeps_policies():
+    parsed = parse_spec_stream(io.StringIO(SPEC), "chat")
+    assert parsed.state_class_name == "ChatState"
+    assert parsed.state_fields == [("messages", "list[str]"), ("scratch", "dict[str, int]"), ("counter", "int")]
+    assert parsed.field_policies == {"messages": {"keep": 3}, "scratch": {"ephemeral": True}}
+    assert parsed.checkpoint_budget == 64 * 1024
+    assert parsed.graph_dict["START"]["state"] == "ChatState"
+
+
+def test_parse_state_section_drops_directives():
+    class_name, fields, _remaining = parse_state_section(SPEC)
+    assert class_name == "ChatState"
+    assert fields[0] == ("messages", "list[str]")
+
+
+def test_keep_reducer_trims():
+    code = gen_state_class("ChatState", [("messages", "list[str]")], policies={"messages": {"keep": 3}})
+    assert "messages: Annotated[list[str], add_to_list_keep_3]" in code
+    namespace = {}
+    exec(code, namespace)
+    messages = []
+    for i in range(5):
+        messages = namespace["add_to_list_keep_3"](messages, f"m{i}")
+    assert messages == ["m2", "m3", "m4"]
+    assert namespace["add_to_list_keep_3"](messages, ["x", "y"]) == ["m4", "x", "y"]
+
+
+def test_ephemeral_channel():
+    code = gen_state_class("ChatState", [("scratch", "dict")], policies={"scratch": {"ephemeral": True}})
+    assert "from langgraph.channels import EphemeralValue" in code
+    assert "scratch: Annotated[dict, EphemeralValue]" in code
+    assert "add_to_list" not in code
+    compile(code, "chat_state.py", "exec")
+
+
+def test_budgeted_checkpointer():
+    project = GeneratedProject.from_spec(SPEC, "chat")
+    assert "checkpoint_saver = BudgetedSaver(65536)" in project.graph
+    assert "class BudgetedSaver(MemorySaver):" in project.graph
+    plain = GeneratedProject.from_spec(SPEC.replace(" budget=64KB", ""), "chat")
+    assert "checkpoint_saver = MemorySaver()" in plain.graph
+    for filename, code in project.files():
+        if filename.endswith(".py"):
+            compile(code, filename, "exec")
+
+
+def test_node_schemas_match_state_annotations():
+    spec = SPEC.replace("\nSTART", "\nNODES:\na: reads=counter writes=messages,scratch\n\nSTART")
+    project = GeneratedProject.from_spec(spec, "chat", node_schemas=True)
+    assert "class AOutput(TypedDict):\n    messages: Annotated[list[str], add_to_list_keep_3]\n" \
+           "    scratch: Annotated[dict[str, int], EphemeralValue]\n" in project.state
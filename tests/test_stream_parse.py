@@ -0,0 +1,102 @@
+"""Tests for the streaming parse path (parse_spec_stream / parse_spec_file)."""
+
+import io
+import re
+import sys
+from pathlib import Path
+
+import pytest
+
+try:
+    from langgraph_codegen.gen_graph import (
+        parse_spec, parse_spec_stream, parse_spec_file, parse_state_section,
+        expand_chains, preprocess_start_syntax, normalize_spec, find_routing_functions,
+        gen_graph, list_examples, get_example_path,
+    )
+except ImportError:
+    sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+    from langgraph_codegen.gen_graph import (
+        parse_spec, parse_spec_stream, parse_spec_file, parse_state_section,
+        expand_chains, preprocess_start_syntax, normalize_spec, find_routing_functions,
+        gen_graph, list_examples, get_example_path,
+    )
+
+
+def _text_parse(text, name, expanded=False):
+    """The text pipeline, as lgcodegen ran it before streaming."""
+    class_name, fields, concise = parse_state_section(text)
+    spec = concise if expanded else expand_chains(concise)
+    expanded_spec = spec
+    spec = preprocess_start_syntax(spec, name)
+    if class_name:
+        spec = re.sub(r'START\([^)]*\)', f'START({class_name})', spec)
+    return class_name, fields, concise, expanded_spec, parse_spec(spec)
+
+
+def _assert_same(text, name, expanded=False):
+    class_name, fields, concise, expanded_spec, parsed = _text_parse(text, name, expanded)
+    streamed = parse_spec_stream(io.StringIO(text), name, expanded=expanded, keep_text=True)
+    assert streamed.graph_dict == parsed.graph_dict
+    assert streamed.start_node == parsed.start_node
+    assert streamed.state_class == parsed.state_class
+    assert streamed.worker_functions == parsed.worker_functions
+    assert streamed.assignment_functions == parsed.assignment_functions
+    assert streamed.switch_functions == parsed.switch_functions
+    assert streamed.routing_functions == parsed.routing_functions
+    assert streamed.state_class_name == class_name
+    assert streamed.state_fields == fields
+    assert streamed.concise_spec == concise
+    assert streamed.expanded_spec == expanded_spec
+    assert streamed.raw_spec == parsed.raw_spec
+    assert streamed.normalized_spec == parsed.normalized_spec
+    return streamed
+
+
+@pytest.mark.parametrize("example", list_examples())
+def test_stream_matches_text_parse_for_examples(example):
+    path = Path(get_example_path(example))
+    _assert_same(path.read_text(), path.stem, expanded=path.suffix == '.lgraphx')
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_stream_matches_text_parse_for_synthetic(synthetic_spec, seed):
+    _assert_same(synthetic_spec(nodes=400, seed=seed), "synthetic")
+    _assert_same(synthetic_spec(nodes=400, seed=seed, state_fields=0), "synthetic")
+
+
+def test_text_forms_are_optional(synthetic_spec):
+    text = synthetic_spec(nodes=100, seed=3)
+    bare = parse_spec_stream(io.StringIO(text), "synthetic")
+    assert bare.raw_spec is None and bare.normalized_spec is None
+    assert bare.concise_spec is None and bare.expanded_spec is None
+
+    some = parse_spec_stream(io.StringIO(text), "synthetic", keep_text=('expanded_spec',))
+    assert some.expanded_spec is not None and some.raw_spec is None
+    assert some.graph_dict == bare.graph_dict
+
+
+def test_gen_graph_from_stream_without_text(synthetic_spec):
+    text = synthetic_spec(nodes=200, seed=4)
+    _class_name, _fields, _concise, _expanded, parsed = _text_parse(text, "synthetic")
+    streamed = parse_spec_stream(io.StringIO(text), "synthetic")
+    expected = gen_graph("synthetic", parsed.raw_spec, parsed=parsed)
+    assert gen_graph("synthetic", None, parsed=streamed) == expected
+
+
+def test_parse_spec_file(synthetic_spec_file):
+    path = synthetic_spec_file(nodes=300, seed=5)
+    _assert_same(path.read_text(), path.stem)
+    assert parse_spec_file(path).graph_dict == _text_parse(path.read_text(), path.stem)[-1].graph_dict
+
+
+def test_state_section_after_start():
+    text = "START -> a\na -> END\n\nSTATE: Late\nitems: list[str]\n"
+    parsed = parse_spec_stream(io.StringIO(text), "demo")
+    assert parsed.state_class == "Late"
+    assert parsed.graph_dict["a"]["state"] == "Late"
+    assert parsed.state_fields == [("items", "list[str]")]
+
+
+def test_routing_functions_match_exact_node_names():
+    spec = "START(S) => n1\nn10 -> route(a, b)\nn1 -> pick(c, d)\nn1 -> later(e)\n"
+    assert find_routing_functions(spec) == {"n10": "route", "n1": "pick"}
@@ -0,0 +1,103 @@
+"""Tests for the synthetic spec generator."""
+
+import io
+import re
+import subprocess
+import sys
+from pathlib import Path
+
+try:
+    from langgraph_codegen.gen_graph import (
+        parse_spec, parse_state_section, expand_chains, preprocess_start_syntax,
+        gen_graph, gen_conditions, gen_state, gen_assignment_functions,
+    )
+    from langgraph_codegen.synthetic import SyntheticSpecConfig, iter_spec_lines, write_spec
+except ImportError:
+    sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+    from langgraph_codegen.gen_graph import (
+        parse_spec, parse_state_section, expand_chains, preprocess_start_syntax,
+        gen_graph, gen_conditions, gen_state, gen_assignment_functions,
+    )
+    from langgraph_codegen.synthetic import SyntheticSpecConfig, iter_spec_lines, write_spec
+
+
+def _parse(text, name="synthetic"):
+    class_name, fields, spec = parse_state_section(text)
+    spec = preprocess_start_syntax(expand_chains(spec), name)
+    if class_name:
+        spec = re.sub(r'START\([^)]*\)', f'START({class_name})', spec)
+    return spec, fields, parse_spec(spec)
+
+
+def test_same_seed_same_spec(synthetic_spec):
+    assert synthetic_spec(nodes=300, seed=7) == synthetic_spec(nodes=300, seed=7)
+    assert synthetic_spec(nodes=300, seed=7) != synthetic_spec(nodes=300, seed=8)
+
+
+def test_node_count(synthetic_spec):
+    _spec, _fields, parsed = _parse(synthetic_spec(nodes=500, seed=1))
+    nodes = {n for n in parsed.graph_dict if n.startswith("n")}
+    assert 500 <= len(nodes) < 520
+
+
+def test_edge_target(synthetic_spec):
+    _spec, _fields, parsed = _parse(synthetic_spec(edges=1000, seed=2))
+    edges = sum(len(node["edges"]) for node in parsed.graph_dict.values())
+    assert 1000 <= edges < 1030
+
+
+def test_all_segment_kinds_present(synthetic_spec):
+    text = synthetic_spec(nodes=2000, seed=3)
+    assert text.splitlines()[1] == "STATE: SyntheticState"
+    assert re.search(r"-> cond_\d+ \? n\d+ : n\d+", text)
+    assert re.search(r"-> route_\d+\((n\d+, )+END\)", text)
+    assert re.search(r"-> items_\d+ \| worker_\d+ -> n\d+", text)
+    assert re.search(r"-> done_\d+ \? n\d+ : n\d+", text)
+    assert re.search(r"-> n\d+, n\d+, n\d+ -> n\d+", text)
+
+
+def test_without_state_section(synthetic_spec):
+    text = synthetic_spec(nodes=50, state_fields=0, state_class="Plain")
+    assert "STATE:" not in text
+    assert "START:Plain -> n0" in text
+
+
+def test_every_node_has_outgoing_edges(synthetic_spec):
+    _spec, _fields, parsed = _parse(synthetic_spec(nodes=1000, seed=4))
+    graph = parsed.graph_dict
+    assert parsed.state_class == "SyntheticState"
+    destinations = {e["destination"] for node in graph.values() for e in node["edges"]}
+    for dest in destinations - {"END"}:
+        assert dest in graph, dest
+        assert graph[dest]["edges"], dest
+
+
+def test_fan_out_keeps_every_branch(synthetic_spec):
+    _spec, _fields, parsed = _parse("START:S -> a -> b, c, d -> e -> END\n")
+    assert [e["destination"] for e in parsed.graph_dict["a"]["edges"]] == ["b", "c", "d"]
+
+
+def test_generated_code_compiles(synthetic_spec):
+    spec, fields, parsed = _parse(synthetic_spec(nodes=400, seed=5))
+    compile(gen_graph("synthetic", spec, parsed=parsed), "graph", "exec")
+    compile(gen_conditions(spec, parsed=parsed), "conditions", "exec")
+    compile(gen_state(spec, state_fields=fields, parsed=parsed), "state", "exec")
+    compile(gen_assignment_functions(spec, parsed=parsed), "assignments", "exec")
+
+
+def test_write_spec_streams_lines():
+    config = SyntheticSpecConfig(nodes=5000, seed=6)
+    buffer = io.StringIO()
+    count = write_spec(buffer, config)
+    assert count == sum(1 for _ in iter_spec_lines(config))
+    assert buffer.getvalue().count("\n") == count
+
+
+def test_cli_writes_file(synthetic_spec_file, tmp_path):
+    out = tmp_path / "cli.lgraph"
+    result = subprocess.run(
+        [sys.executable, "-m", "langgraph_codegen.synthetic", "--nodes", "200", "--seed", "9", "-o", str(out)],
+        capture_output=True, text=True,
+    )
+    assert result.returncode == 0, result.stderr
+    assert out.read_text() == synthetic_spec_file(nodes=200, seed=9).read_text()
@@ -0,0 +1,136 @@
+"""Tests for the batch spec validator."""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+try:
+    from langgraph_codegen.gen_graph import list_examples, get_example_path
+    from langgraph_codegen.validate import validate_text, validate_file, validate_many, main
+except ImportError:
+    sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+    from langgraph_codegen.gen_graph import list_examples, get_example_path
+    from langgraph_codegen.validate import validate_text, validate_file, validate_many, main
+
+
+def kinds(result):
+    return [(issue.line, issue.kind) for issue in result.issues]
+
+
+@pytest.mark.parametrize("name", list_examples())
+def test_examples_are_valid(name):
+    result = validate_file(get_example_path(name))
+    assert result.ok, result.format()
+
+
+def test_synthetic_spec_is_valid(synthetic_spec):
+    result = validate_text(synthetic_spec(nodes=2000, seed=3))
+    assert result.ok, result.format()
+
+
+def test_all_edge_forms():
+    spec = """\
+STATE: DemoState budget=1MB
+items: list[str] keep=5
+scratch: dict ephemeral  # one step only
+
+NODES:
+plan: latency=2s
+
+START:DemoState -> plan -> a, b -> join
+join -> items | worker -> check
+check -> is_done ? END : route_node
+route_node -> pick(plan, END)
+worker -> check
+fan_in_a, fan_in_b => END
+a -> fan_in_a
+b → fan_in_b
+"""
+    assert validate_text(spec).issues == []
+
+
+def test_indented_fat_arrows():
+    spec = """
+    START(State) => first
+    first
+        is_done => END
+        => first
+    """
+    assert validate_text(spec).ok
+
+
+def test_missing_start():
+    result = validate_text("# comment\nnode1 => node2\n\nnode2\n    => END\n")
+    assert kinds(result) == [(2, "missing_start")]
+    assert kinds(validate_text("# only a comment\n")) == [(0, "missing_start")]
+
+
+def test_start_not_first():
+    result = validate_text("node1 => node2\nSTART:State -> node1\nnode2 -> END\n")
+    assert [kind for _, kind in kinds(result)] == ["missing_start", "missing_start"]
+
+
+def test_errors_have_line_numbers():
+    spec = """\
+START:State -> a
+a -> b ? c : d
+c -> x(y
+d -> END -> e
+f -> 1bad
+"""
+    assert kinds(validate_text(spec, path="bad.lgraph")) == [
+        (3, "syntax"), (4, "end_as_source"), (5, "syntax"), (4, "undefined_node"),
+    ]
+    assert validate_text(spec, path="bad.lgraph").format().startswith("bad.lgraph:3: error: syntax:")
+
+
+def test_routing_must_end_chain():
+    result = validate_text("START -> a -> is_done ? b : c -> d\nb -> END\nc -> END\nd -> END\n")
+    assert kinds(result) == [(1, "syntax")]
+
+
+def test_state_and_nodes_sections():
+    spec = """\
+STATE: State
+items: list keep=0
+broken line
+
+NODES:
+plan latency=2s
+
+START -> plan
+plan -> END
+"""
+    assert kinds(validate_text(spec)) == [(2, "state"), (3, "state"), (6, "nodes")]
+
+
+def test_class_name_first_edge():
+    # README START Form 2, and the eval specs' first line
+    spec = "MessagesState -> llm_call\nllm_call -> should_continue(environment, END)\nenvironment -> llm_call\n"
+    assert validate_text(spec).ok
+    assert validate_text("State.items -> router\nrouter -> END\n").ok
+    # a lowercase first edge is a node, not a state class
+    assert kinds(validate_text("first -> END\n")) == [(1, "missing_start")]
+
+
+def test_validate_many(tmp_path, synthetic_spec_file):
+    good = [synthetic_spec_file(f"spec{i}", nodes=50, seed=i) for i in range(6)]
+    bad = tmp_path / "bad.lgraph"
+    bad.write_text("node1 -> END\n")
+    paths = good[:3] + [bad, tmp_path / "missing.lgraph"] + good[3:]
+    for workers in (1, 3):
+        results = validate_many(paths, workers=workers)
+        assert [r.path for r in results] == [str(p) for p in paths]
+        assert [r.ok for r in results] == [True] * 3 + [False, False] + [True] * 3
+        assert results[4].issues[0].kind == "read_error"
+
+
+def test_main_exit_status(tmp_path, capsys):
+    good = tmp_path / "good.lgraph"
+    good.write_text("START -> a\na -> END\n")
+    bad = tmp_path / "bad.lgraph"
+    bad.write_text("START -> a\n")
+    assert main([str(good), "--workers", "1"]) == 0
+    assert main([str(good), str(bad), "--workers", "1"]) == 1
+    assert f"{bad}:1: error: undefined_node" in capsys.readouterr().out